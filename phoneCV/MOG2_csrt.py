@@ -2,73 +2,55 @@ import cv2
 import os
 import screeninfo
 
+from framestore import FRAME_STORE_EXT
+from roitracker import HybridTracker
+from videoslicer import STORE_FRAMES, iter_frames
+
+# MOG2 finds the drones, CSRT follows them inside a small ROI around each one, and MOG2
+# re-detects on the full frame every REDETECT_EVERY frames (or when a tracker loses its drone).
+
+REDETECT_EVERY = 10   # Frames between full-frame MOG2 re-detections
+TRACKER_TYPE = "csrt"  # "csrt", or "kcf" / "mosse" for cheaper trackers
+DETECT_SCALE = 0.5    # Re-detection runs MOG2 at this fraction of the (fit-to-screen) resolution
+
 # Paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
 frame_folder = os.path.join(current_dir, "frames_synced", "frames_saanvi_one_synced")
-
-# Initialize background subtractor
-fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+if STORE_FRAMES:
+    frame_folder += FRAME_STORE_EXT
 
 # Load first frame
-frame_files = sorted(os.listdir(frame_folder))
-first_frame = os.path.join(frame_folder, frame_files[0])
-frame = cv2.imread(first_frame)
+_, _, frame = next(iter_frames(frame_folder), (None, None, None))
 
 if frame is None:
-    print(f"Error loading first frame: {first_frame}")
+    print(f"Error loading first frame: {frame_folder}")
     exit()
 
 # Get screen width & height
 screen = screeninfo.get_monitors()[0]
 screen_width, screen_height = screen.width, screen.height
 
-# Resize the frame if it's too large
+# Work out the fit-to-screen scale once; the tracker uses it for every frame (MOG2, init and updates)
+scale = 1.0
 if frame.shape[1] > screen_width or frame.shape[0] > screen_height:
     scale_x = screen_width / frame.shape[1]
     scale_y = screen_height / frame.shape[0]
     scale = min(scale_x, scale_y) * 0.9  # Scale down slightly to fit
-    frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
-
-# Apply motion mask
-fgmask = fgbg.apply(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
-
-# Find contours of motion
-contours, _ = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-biggest_contour = max(contours, key=cv2.contourArea) if contours else None
 
-if biggest_contour is None:
-    print("No motion detected in the first frame.")
-    exit()
-
-# Get bounding box from motion
-x, y, w, h = cv2.boundingRect(biggest_contour)
-bbox = (x, y, w, h)
-
-# Initialize CSRT Tracker
-tracker = cv2.TrackerCSRT_create()
-tracker.init(frame, bbox)
+tracker = HybridTracker(TRACKER_TYPE, REDETECT_EVERY, scale=scale, detect_scale=DETECT_SCALE)
 
 # Process frames
-for frame_file in frame_files[1:]:  # Skip first frame
-    frame_path = os.path.join(frame_folder, frame_file)
-    frame = cv2.imread(frame_path)
-
-    if frame is None:
-        print(f"Error loading frame: {frame_file}")
-        continue
+for frame_idx, timestamp, frame in iter_frames(frame_folder):
+    tracks, redetected = tracker.update(frame)
 
-    # Apply motion detection
-    fgmask = fgbg.apply(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
-
-    # Update CSRT tracker
-    success, bbox = tracker.update(frame)
-
-    if success:
-        x, y, w, h = [int(v) for v in bbox]
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    # Draw in the same (scaled) space the tracker works in
+    frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
+    for track_id, bbox in tracks:
+        x, y, w, h = [int(v * scale) for v in bbox]
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255) if redetected else (0, 255, 0), 2)
+        cv2.putText(frame, str(track_id), (x, y - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
 
     # Show frame
-    cv2.imshow("Motion Mask", fgmask)
     cv2.imshow("CSRT Tracking", frame)
 
     if cv2.waitKey(30) & 0xFF == ord('q'):
@@ -1,96 +1,363 @@
 import cv2
 import os
-import shutil
-import screeninfo
-
-def clear_folder(folder):
-    """Deletes all files in a folder before processing."""
-    if os.path.exists(folder):
-        shutil.rmtree(folder)  # Deletes the entire folder
-    os.makedirs(folder, exist_ok=True)  # Recreate the empty folder
-
-def process_mog2_tracking(input_folder, output_folder):
-    """Applies MOG2 background subtraction and saves processed frames with contours."""
-    # Initialize background subtractor (MOG2)
-    fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
-
-    # Ensure output directory is clean
-    clear_folder(output_folder)
-
-    # Load frames
-    frame_files = sorted(os.listdir(input_folder))
-
-    for frame_file in frame_files:
-        frame_path = os.path.join(input_folder, frame_file)
-        frame = cv2.imread(frame_path)
-
-        if frame is None:
-            print(f"Error loading frame: {frame_file}")
-            continue
-
-        # Get screen width & height
-        screen = screeninfo.get_monitors()[0]
-        screen_width, screen_height = screen.width, screen.height
-
-        # Resize frame if it's too large
-        if frame.shape[1] > screen_width or frame.shape[0] > screen_height:
-            scale_x = screen_width / frame.shape[1]
-            scale_y = screen_height / frame.shape[0]
-            scale = min(scale_x, scale_y) * 0.9  # Scale down slightly to fit
-            frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
-
-        # Convert to grayscale and apply motion detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        fgmask = fgbg.apply(gray)
-
-        # Find contours of moving objects
-        contours, _ = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        if contours:
-            # Find the largest contour (biggest moving object)
-            largest_contour = max(contours, key=cv2.contourArea)
-
-            if cv2.contourArea(largest_contour) > 100:  # Ignore small objects
-                # Bounding Box
-                x, y, w, h = cv2.boundingRect(largest_contour)
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+import numpy as np
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-                # Bounding Ellipse (Optional)
-                if len(largest_contour) >= 5:  # Fit ellipse needs at least 5 points
-                    ellipse = cv2.fitEllipse(largest_contour)
-                    cv2.ellipse(frame, ellipse, (255, 0, 0), 2)
+from backgrounds import create_background_model
+from blobfinder import empty_blobs, find_blobs
+from detectionlog import DetectionLog
+from framesink import FrameSink
+from framesource import FrameSource
+from framestore import FRAME_STORE_EXT
+from framesync import DOWNSAMPLE_RATE, START_FRAME_N1, START_FRAME_S1, iter_synced_video_frames
+from motiongate import MotionGate
+from profiling import PROFILER
+from pyramid import downscale, refine_blobs, upscale_blobs, upscale_ellipse
+from triangulate import load_calibration, triangulate_detections
+from videoslicer import STORE_FRAMES, iter_frames
+
+def fit_to_screen_scale(frame):
+    """Scale that fits frame on the first monitor (0.9 margin), 1.0 if it already fits. Needs a display."""
+    import screeninfo  # Only needed with a display, headless runs and worker processes skip the import
+    # Get screen width & height
+    screen = screeninfo.get_monitors()[0]
+    screen_width, screen_height = screen.width, screen.height
 
-        # Save processed frame to output folder
-        output_path = os.path.join(output_folder, frame_file)
-        cv2.imwrite(output_path, frame)
+    if frame.shape[1] > screen_width or frame.shape[0] > screen_height:
+        scale_x = screen_width / frame.shape[1]
+        scale_y = screen_height / frame.shape[0]
+        return min(scale_x, scale_y) * 0.9  # Scale down slightly to fit
+    return 1.0
 
-        # Show results
+class WindowDisplay:
+    """Optional visualization sink for track_frames: imshow the mask + tracking windows, 'q' stops."""
+
+    def __init__(self, wait_ms=30):
+        self.wait_ms = wait_ms
+
+    def show(self, fgmask, frame):
+        """Shows one frame, returns False when the user pressed 'q'."""
         cv2.imshow("Motion Mask", fgmask)
         cv2.imshow("MOG2 Tracking", frame)
+        return cv2.waitKey(self.wait_ms) & 0xFF != ord('q')
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+def _lap(timings, stage, start):
+    """Adds the time since start to timings[stage] (and the profiler, if it's on) and returns the new start."""
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0.0) + now - start
+    PROFILER.record(stage, now - start)
+    return now
+
+def print_timing_report(timings, num_frames, title="Stage timings"):
+    """Prints ms/frame and share of the total for each stage filled in by track_frames."""
+    total = sum(timings.values())
+    if num_frames == 0 or total == 0:
+        print(f"{title}: no frames processed")
+        return
+
+    print(f"{title} ({num_frames} frames, {num_frames / total:.1f} fps overall)")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<10} {1000 * seconds / num_frames:8.3f} ms/frame  {100 * seconds / total:5.1f}%")
+
+def find_largest_contour(fgmask, min_area=100):
+    """The original single-target detector: biggest contour in the mask plus its fitted ellipse.
+
+    Returns (blobs, ellipses) in the same layout as blobfinder.find_blobs, with at most one row.
+    """
+    # Find contours of moving objects
+    contours, _ = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return empty_blobs(), []
+
+    # Find the largest contour (biggest moving object)
+    largest_contour = max(contours, key=cv2.contourArea)
+    area = cv2.contourArea(largest_contour)
+    if area <= min_area:  # Ignore small objects
+        return empty_blobs(), []
+
+    # Bounding Box + centroid
+    x, y, w, h = cv2.boundingRect(largest_contour)
+    moments = cv2.moments(largest_contour)
+    blobs = np.array([[x, y, w, h, area, moments["m10"] / moments["m00"], moments["m01"] / moments["m00"]]],
+                     dtype=np.float32)
+
+    # Bounding Ellipse (Optional)
+    ellipse = None
+    if len(largest_contour) >= 5:  # Fit ellipse needs at least 5 points
+        ellipse = cv2.fitEllipse(largest_contour)
+    return blobs, [ellipse]
+
+def track_frames(frames, output_folder=None, display=None, scale=None, timings=None, log=None, camera="",
+                 multi_target=False, min_area=100, process_scale=1.0, refine=False, background="mog2",
+                 output_format="png", motion_gate=None):
+    """Runs MOG2 + blob detection over (frame_idx, timestamp, frame) tuples.
+
+    Same as iter_track_frames (see there for the arguments) but collects everything into a list.
+    """
+    detections = list(iter_track_frames(frames, output_folder, display, scale, timings, log, camera,
+                                        multi_target, min_area, process_scale, refine, background,
+                                        output_format, motion_gate))
+    if output_folder is not None:
+        print(f"✅ Processed frames saved in {output_folder}")
+    return detections
+
+def iter_track_frames(frames, output_folder=None, display=None, scale=None, timings=None, log=None, camera="",
+                      multi_target=False, min_area=100, process_scale=1.0, refine=False, background="mog2",
+                      output_format="png", motion_gate=None):
+    """Generator stage: MOG2 + blob detection, yielding each frame's detections as soon as it's done.
+
+    Frames are processed in memory; annotated frames are only written when output_folder is given and
+    only shown when a display sink (e.g. WindowDisplay()) is given, so by default nothing waits on a
+    screen. scale resizes every frame by a fixed factor; left as None it is 1.0 headless, or worked out
+    once from the first frame with fit_to_screen_scale when displaying. Detections are in resized pixels.
+    timings, if given, is a dict that gets the seconds spent per stage added to it.
+    log, if given, is a DetectionLog that gets a row per detection (in original-resolution pixels).
+    multi_target=False keeps the original largest-contour detector; True returns every blob over
+    min_area via blobfinder.find_blobs (no ellipses in that mode).
+    process_scale runs MOG2 + blob extraction on a further downscaled copy (0.5, 0.25...) and maps the
+    detections back up; refine=True then re-measures them in small crops of the frame (pyramid.py).
+    min_area is always in frame pixels.
+    background picks the background model (backgrounds.py): "mog2" (default), "knn", or the cheaper
+    "running_average" / "frame_diff" for cameras on a tripod.
+    Annotated frames are written in the background by a FrameSink (framesink.py): output_folder ending in
+    .mp4 gets one video, otherwise a folder of output_format ("png" or "jpg") images.
+    frames can also be a FrameSource (framesource.py), which decodes, resizes and converts to gray ahead
+    on a worker thread into reused buffers; its scale is used then.
+    motion_gate, if given, is a MotionGate (motiongate.py): frames it finds static skip everything after
+    decode (no MOG2, contours, drawing or writing) and get the last processed frame's detections again.
+    Yields (frame_idx, timestamp, blobs, ellipses) where blobs is an (N, 7) array of
+    x, y, w, h, area, cx, cy and ellipses the matching list of fitEllipse results (or None).
+    """
+    # Initialize background subtractor (MOG2 unless asked otherwise)
+    fgbg = create_background_model(background)
+
+    # Ensure output directory is clean, the sink writes behind the loop from here on
+    sink = None
+    if output_folder is not None:
+        sink = FrameSink(output_folder, output_format, clear=True)
+
+    if timings is None:
+        timings = {}
+
+    if isinstance(frames, FrameSource):
+        # Decoded, resized and converted to gray ahead of time on the source's worker thread
+        scale = frames.scale
+        items = frames.iter_gray()
+    else:
+        items = ((frame_idx, timestamp, frame, None) for frame_idx, timestamp, frame in frames)
+    resized = gray_buffer = fgmask = None  # Reused from frame to frame instead of allocated every time
+    blobs, ellipses = empty_blobs(), []  # What a gated frame repeats until one gets processed
+
+    try:
+        t = time.perf_counter()
+        for frame_idx, timestamp, frame, gray in items:
+            t = _lap(timings, "decode", t)
+
+            # Static frame: nothing moved since the last processed one, so neither did the detections
+            if motion_gate is not None:
+                process = motion_gate.should_process(frame)
+                t = _lap(timings, "gate", t)
+                if not process:
+                    if log is not None:
+                        for blob, ellipse in zip(blobs, ellipses):
+                            log.add(camera, frame_idx, timestamp, blob[:4], blob[4], blob[5:7], ellipse, scale)
+                    yield frame_idx, timestamp, blobs, ellipses
+                    t = time.perf_counter()
+                    continue
+
+            if gray is None:
+                # Resize target is worked out once, not per frame
+                if scale is None:
+                    scale = fit_to_screen_scale(frame) if display is not None else 1.0
+                if scale != 1.0:
+                    frame = resized = cv2.resize(frame, (0, 0), resized, fx=scale, fy=scale)
+                    t = _lap(timings, "resize", t)
 
-        if cv2.waitKey(30) & 0xFF == ord('q'):
-            break
+                # Convert to grayscale
+                gray = gray_buffer = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, gray_buffer)
+                t = _lap(timings, "cvtColor", t)
 
-    cv2.destroyAllWindows()
-    print(f"✅ Processed frames saved in {output_folder}")
+            # Apply motion detection
+            if process_scale != 1.0:
+                small = downscale(gray, process_scale)
+                t = _lap(timings, "downscale", t)
+            else:
+                small = gray
+            fgmask = fgbg.apply(small, fgmask)
+            t = _lap(timings, "mog2", t)
+
+            # Pull the moving objects out of the mask
+            small_min_area = min_area * process_scale ** 2
+            if multi_target:
+                blobs = find_blobs(fgmask, small_min_area)
+                ellipses = [None] * len(blobs)
+            else:
+                blobs, ellipses = find_largest_contour(fgmask, small_min_area)
+
+            if process_scale != 1.0:
+                blobs = upscale_blobs(blobs, process_scale)
+                ellipses = [upscale_ellipse(ellipse, process_scale) for ellipse in ellipses]
+                if refine and len(blobs):
+                    t = _lap(timings, "contours", t)
+                    blobs = refine_blobs(gray, fgbg.getBackgroundImage(), blobs, process_scale)
+                    t = _lap(timings, "refine", t)
+
+            t = _lap(timings, "contours", t)
+
+            if log is not None:
+                for blob, ellipse in zip(blobs, ellipses):
+                    log.add(camera, frame_idx, timestamp, blob[:4], blob[4], blob[5:7], ellipse, scale)
+                t = _lap(timings, "log", t)
+
+            if output_folder is None and display is None:
+                yield frame_idx, timestamp, blobs, ellipses
+                t = time.perf_counter()  # Time spent by whoever consumes the detections isn't ours
+                continue  # Nobody looks at the annotated frame, don't draw it
+
+            for blob, ellipse in zip(blobs, ellipses):
+                x, y, w, h = blob[:4].astype(int)
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                if ellipse is not None:
+                    cv2.ellipse(frame, ellipse, (255, 0, 0), 2)
+            t = _lap(timings, "draw", t)
+
+            # Hand the processed frame to the sink (only waits if it's a full queue behind)
+            if sink is not None:
+                sink.write(frame_idx, timestamp, frame.copy())  # Our frame buffers get reused, the sink's copy doesn't
+                t = _lap(timings, "write", t)
+
+            # Show results
+            keep_going = True
+            if display is not None:
+                keep_going = display.show(fgmask, frame)
+                t = _lap(timings, "display", t)
+
+            yield frame_idx, timestamp, blobs, ellipses
+            t = time.perf_counter()
+            if not keep_going:
+                break
+    finally:
+        if sink is not None:
+            sink.close()  # Whatever is still queued gets written before we return
+        if display is not None:
+            display.close()
+
+def process_mog2_tracking(input_folder, output_folder, display=None, log_path=None, camera=""):
+    """Applies MOG2 background subtraction and saves processed frames with contours and/or a detection log."""
+    timings = {}
+    log = DetectionLog(log_path) if log_path is not None else None
+    detections = track_frames(iter_frames(input_folder), output_folder, display, timings=timings,
+                              log=log, camera=camera)
+    if log is not None:
+        log.close()
+    print_timing_report(timings, len(detections))
+    return detections
+
+def track_camera(name, camera, downsample_rate=DOWNSAMPLE_RATE):
+    """Process-pool worker: tracks one camera stream with its own MOG2 and no windows.
+
+    camera is a datasets entry with either "video" + "start"/"end" (synced straight from the video)
+    or "input" (an already synced frame store or folder, "start" needed to line up the frame index), plus an
+    optional fixed resize "scale", "process_scale" / "refine" for downscaled MOG2, "multi_target" flag,
+    "background" model, "motion_gate" flag (skip static frames, motiongate.py), detection "log" path and
+    annotated "output" (folder of "output_format" images, "png" or "jpg", or an .mp4).
+    Returns (name, detections, stage timings).
+    """
+    cv2.setNumThreads(1)  # One core per camera, the pool does the parallelism
+    PROFILER.reset()  # Only this camera's stages in this worker's report
+
+    if "video" in camera:
+        frames = iter_synced_video_frames(camera["video"], camera["start"], camera["end"], downsample_rate)
+    else:
+        frames = iter_frames(camera["input"])
+
+    timings = {}
+    log = DetectionLog(camera["log"]) if "log" in camera else None
+    gate = MotionGate() if camera.get("motion_gate") else None
+    detections = track_frames(frames, camera.get("output"), scale=camera.get("scale"), timings=timings,
+                              log=log, camera=name, multi_target=camera.get("multi_target", False),
+                              process_scale=camera.get("process_scale", 1.0), refine=camera.get("refine", False),
+                              background=camera.get("background", "mog2"),
+                              output_format=camera.get("output_format", "png"), motion_gate=gate)
+    if log is not None:
+        log.close()
+    if gate is not None:
+        print(f"⏩ {name}: {gate.summary()}")
+    PROFILER.write_report(f"track_camera_{name}_{os.getpid()}")  # Pool workers don't run atexit hooks
+    return name, detections, timings
+
+def merge_detections(camera_detections, camera_starts, downsample_rate=DOWNSAMPLE_RATE):
+    """Lines up per-camera detections by synced frame index.
+
+    downsample_rate can also be a {camera: rate} dict, for cameras filming at different fps.
+    Returns {synced_idx: {camera: (frame_idx, timestamp, blobs, ellipses)}} sorted by synced_idx.
+    """
+    merged = {}
+    for name, detections in camera_detections.items():
+        start = camera_starts[name]
+        rate = downsample_rate[name] if isinstance(downsample_rate, dict) else downsample_rate
+        for detection in detections:
+            synced_idx = (detection[0] - start) // rate
+            merged.setdefault(synced_idx, {})[name] = detection
+    return dict(sorted(merged.items()))
+
+def track_cameras(datasets, downsample_rate=DOWNSAMPLE_RATE, max_workers=None):
+    """Tracks every camera in datasets in parallel (one process each) and merges by synced frame index."""
+    if max_workers is None:
+        max_workers = min(len(datasets), os.cpu_count() or 1)
+
+    camera_detections = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(track_camera, name, camera, downsample_rate) for name, camera in datasets.items()]
+        for future in futures:
+            name, detections, timings = future.result()
+            camera_detections[name] = detections
+            print_timing_report(timings, len(detections), f"✅ {name}")
+
+    camera_starts = {name: camera.get("start", 0) for name, camera in datasets.items()}
+    return merge_detections(camera_detections, camera_starts, downsample_rate)
 
 # ========= MAIN EXECUTION =========
 if __name__ == "__main__":
+    SHOW_WINDOWS = False  # True = one camera at a time with the imshow windows (needs a display)
     current_dir = os.path.dirname(os.path.abspath(__file__))
 
     # Define input and output locations for both datasets
+    # (add an "output" folder or .mp4 to a dataset to also get annotated frames, or render the log with detectionlog.py)
     datasets = {
         "saanvi": {
             "input": os.path.join(current_dir, "frames_synced", "frames_saanvi_one_synced"),
-            "output": os.path.join(current_dir, "mog2_processed", "frames_saanvi_one_processed")
+            "start": START_FRAME_S1,
+            "log": os.path.join(current_dir, "detections", "saanvi_one.npz")
         },
         "nick": {
             "input": os.path.join(current_dir, "frames_synced", "frames_nick_one_synced"),
-            "output": os.path.join(current_dir, "mog2_processed", "frames_nick_one_processed")
+            "start": START_FRAME_N1,
+            "log": os.path.join(current_dir, "detections", "nick_one.npz")
         }
     }
 
-    # Run processing for each dataset
-    for name, paths in datasets.items():
-        print(f"\n🚀 Processing {name} dataset...")
-        process_mog2_tracking(paths["input"], paths["output"])
+    if STORE_FRAMES:  # framesync wrote frame stores instead of PNG folders
+        for paths in datasets.values():
+            paths["input"] += FRAME_STORE_EXT
+
+    if SHOW_WINDOWS:
+        # Run processing for each dataset, one at a time so the windows make sense
+        for name, paths in datasets.items():
+            print(f"\n🚀 Processing {name} dataset...")
+            process_mog2_tracking(paths["input"], paths.get("output"), WindowDisplay(), paths["log"], name)
+    else:
+        # Every camera gets its own worker process, detections come back lined up by synced frame
+        print(f"\n🚀 Processing {len(datasets)} datasets in parallel...")
+        synced_detections = track_cameras(datasets)
+        print(f"✅ {len(synced_detections)} synced frames with detections from {len(datasets)} cameras")
+
+        # 3D positions, once the phones have been calibrated (run triangulate.py on checkerboard footage)
+        calibration_path = os.path.join(current_dir, "calibration", "nick_saanvi.npz")
+        if os.path.exists(calibration_path):
+            positions = triangulate_detections(synced_detections, load_calibration(calibration_path), "nick", "saanvi")
+            print(f"✅ {sum(len(frame[1]) for frame in positions)} 3D positions over {len(positions)} synced frames")
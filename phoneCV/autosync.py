@@ -0,0 +1,150 @@
+import cv2
+import os
+import numpy as np
+
+from videoslicer import get_video_fps
+
+# Works out the time offset between two phones' videos instead of eyeballing PNGs for the spin-up frame.
+# Every frame gets boiled down to one number (how much the picture changed since the previous frame, or
+# how much the overall brightness changed), both signals get resampled onto the same time grid (so a
+# 30 fps .mp4 and a 29.97/60 fps .MOV line up), and the lag is the peak of their FFT cross-correlation,
+# refined to a fraction of a sample with a parabola through the peak.
+
+SIGNAL_WIDTH = 160    # Frames get shrunk to this width before computing the signal
+SAMPLE_RATE = 240.0   # Hz, common time grid both signals get resampled onto
+
+def frame_signal(video_path, kind="motion", max_frames=None):
+    """Per-frame sync signal of a video. Returns (timestamps, signal) arrays, or None if it can't be read.
+
+    kind="motion": mean absolute difference between consecutive (shrunk, grayscale) frames.
+    kind="brightness": change in mean brightness between consecutive frames (flashes, clouds, lights).
+    Timestamps come from the container when it has them (phone .MOVs are often variable frame rate).
+    """
+    if not os.path.exists(video_path):
+        print(f"Error: No such video as {video_path} exists.")
+        return None
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open {video_path}")
+        return None
+
+    fps = get_video_fps(cap)
+    timestamps, values = [], []
+    previous = None
+    try:
+        frame_idx = 0
+        while max_frames is None or frame_idx < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            timestamps.append(msec / 1000 if msec > 0 or frame_idx == 0 else frame_idx / fps)
+
+            scale = SIGNAL_WIDTH / frame.shape[1]
+            small = cv2.resize(frame, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            if kind == "motion":
+                values.append(0.0 if previous is None else cv2.absdiff(gray, previous).mean())
+                previous = gray
+            elif kind == "brightness":
+                brightness = gray.mean()
+                values.append(0.0 if previous is None else brightness - previous)
+                previous = brightness
+            else:
+                raise ValueError(f"Unknown sync signal {kind!r}, expected 'motion' or 'brightness'")
+            frame_idx += 1
+    finally:
+        cap.release()
+
+    # Each value is the change between two frames, so it belongs halfway between them
+    timestamps = np.array(timestamps)
+    timestamps[1:] = (timestamps[1:] + timestamps[:-1]) / 2
+    return timestamps, np.array(values)
+
+def resample_signal(timestamps, signal, sample_rate=SAMPLE_RATE):
+    """Linearly interpolates a signal onto a regular grid starting at t=0. Returns the resampled array."""
+    grid = np.arange(0, timestamps[-1], 1 / sample_rate)
+    resampled = np.interp(grid, timestamps, signal)
+    resampled -= resampled.mean()
+    std = resampled.std()
+    return resampled / std if std > 0 else resampled
+
+def estimate_offset(signal_a, signal_b, sample_rate=SAMPLE_RATE, max_lag=None):
+    """Lag (seconds) of signal_b behind signal_a, i.e. an event at time t in a shows up at t + lag in b.
+
+    Both signals are on the same regular grid (resample_signal). The cross-correlation is computed with
+    one rfft per signal, zero-padded so it doesn't wrap around. max_lag (seconds) limits the search.
+    Returns (lag, peak) where peak is the normalized correlation at the lag (~1 is a clean match).
+    """
+    n = len(signal_a) + len(signal_b) - 1
+    size = 1 << (n - 1).bit_length()
+    correlation = np.fft.irfft(np.conj(np.fft.rfft(signal_a, size)) * np.fft.rfft(signal_b, size), size)
+
+    # Lags 0, 1, 2, ... then the negative ones wrapped round to the end
+    lags = np.arange(size)
+    lags[lags >= len(signal_b)] -= size
+    valid = (lags > -len(signal_a)) & (lags < len(signal_b))
+    if max_lag is not None:
+        valid &= np.abs(lags) <= max_lag * sample_rate
+    scores = np.where(valid, correlation, -np.inf)
+    peak = int(np.argmax(scores))
+
+    # Sub-sample refinement: vertex of the parabola through the peak and its neighbours
+    shift = 0.0
+    left, right = scores[peak - 1], scores[(peak + 1) % size]
+    if np.isfinite(left) and np.isfinite(right):
+        denominator = left - 2 * scores[peak] + right
+        if denominator != 0:
+            shift = 0.5 * (left - right) / denominator
+
+    overlap = min(len(signal_a), len(signal_b))
+    return (lags[peak] + shift) / sample_rate, scores[peak] / overlap
+
+def video_offset(reference_path, video_path, kind="motion", max_lag=None, max_frames=None,
+                 sample_rate=SAMPLE_RATE):
+    """Seconds between the two videos: an event at time t in the reference is at t + offset in video_path.
+
+    Returns (offset, peak), or None if either video can't be read.
+    """
+    reference = frame_signal(reference_path, kind, max_frames)
+    other = frame_signal(video_path, kind, max_frames)
+    if reference is None or other is None:
+        return None
+    return estimate_offset(resample_signal(*reference, sample_rate), resample_signal(*other, sample_rate),
+                           sample_rate, max_lag)
+
+def synced_frame_range(offset, reference_start, reference_end, downsample_rate, reference_fps, fps):
+    """Maps the reference's (start, end, downsample rate) in frames onto another camera's frames.
+
+    The rate gets scaled by the fps ratio so both cameras keep frames the same time apart (rounded
+    to whole frames). Returns (start_frame, end_frame, downsample_rate, start_time) where start_time
+    is the exact (sub-frame) time of the reference start frame in the other video.
+    """
+    start_time = reference_start / reference_fps + offset
+    end_time = reference_end / reference_fps + offset
+    rate = max(1, int(round(downsample_rate * fps / reference_fps)))
+    return max(0, int(round(start_time * fps))), int(round(end_time * fps)), rate, start_time
+
+def auto_sync(reference_path, video_path, reference_start, reference_end, downsample_rate, kind="motion",
+              max_lag=None):
+    """Start/end frames and downsample rate in video_path that line up with the reference's.
+
+    Returns (start, end, downsample_rate, offset) or None if either video can't be read.
+    """
+    result = video_offset(reference_path, video_path, kind, max_lag)
+    if result is None:
+        return None
+    offset, peak = float(result[0]), float(result[1])
+
+    fps = []
+    for path in (reference_path, video_path):
+        cap = cv2.VideoCapture(path)
+        fps.append(get_video_fps(cap))
+        cap.release()
+
+    start, end, rate, start_time = synced_frame_range(offset, reference_start, reference_end, downsample_rate, *fps)
+    print(f"{os.path.basename(video_path)}: offset {offset:+.3f}s (correlation {peak:.2f}), "
+          f"frames {start}-{end} every {rate} (start at {start_time:.3f}s)")
+    return start, end, rate, offset
@@ -0,0 +1,109 @@
+import cv2
+import numpy as np
+
+# Pluggable background models. Anything with OpenCV's subtractor interface works: apply(gray, fgmask=None)
+# returns the 0/255 foreground mask (written into fgmask if one is passed), getBackgroundImage() the
+# current background. MOG2 (and KNN) keep a Gaussian mixture per pixel, which is more than a
+# tripod-mounted phone needs, so there are two cheap alternatives here that only do a handful of
+# whole-image passes into buffers allocated on the first frame (no allocations per frame after that;
+# the returned mask is one of those buffers, so use it before the next apply()).
+#   running_average: exponential running mean background + running mean absolute deviation per pixel,
+#                    foreground = |frame - background| > max(min_threshold, k * deviation). Like MOG2 the
+#                    learning rate starts at 1 and decays to 1/history, so whatever sat in the first frame
+#                    (a drone on the pad) fades out in a few frames instead of staying as a ghost.
+#   frame_diff:      |frame - frame `gap` frames ago| > threshold, with the old frames in a uint8 ring buffer.
+# bench_background compares them against MOG2 for speed and mask quality.
+
+BACKGROUND_MODELS = ("mog2", "knn", "running_average", "frame_diff")
+
+class RunningAverageBackground:
+    """Running mean background with a per-pixel adaptive threshold.
+
+    history: frames the background averages over (learning rate 1/history once that many have been seen).
+    k: how many mean absolute deviations a pixel has to be off to count as foreground.
+    min_threshold: gray levels a pixel always has to be off (so flat, noise-free areas don't fire).
+    """
+
+    def __init__(self, history=500, k=4.0, min_threshold=15):
+        self.history = history
+        self.k = k
+        self.min_threshold = min_threshold
+        self.shape = None
+
+    def _allocate(self, gray):
+        self.shape = gray.shape
+        self.num_frames = 0
+        self.background = gray.astype(np.float32)
+        self.deviation = np.full(gray.shape, self.min_threshold / self.k, np.float32)
+        self.background_u8 = gray.copy()
+        self.diff = np.empty_like(gray)
+        self.threshold = np.empty_like(gray)
+        self.mask = np.empty_like(gray)
+
+    def apply(self, gray, fgmask=None):
+        if gray.shape != self.shape:
+            self._allocate(gray)
+        mask = self.mask if fgmask is None or fgmask.shape != gray.shape else fgmask
+
+        cv2.absdiff(gray, self.background_u8, dst=self.diff)
+        cv2.convertScaleAbs(self.deviation, dst=self.threshold, alpha=self.k)
+        cv2.max(self.threshold, self.min_threshold, dst=self.threshold)
+        cv2.compare(self.diff, self.threshold, cv2.CMP_GT, dst=mask)
+
+        self.num_frames += 1
+        alpha = 1.0 / min(self.num_frames, self.history)
+        cv2.accumulateWeighted(gray, self.background, alpha)
+        cv2.accumulateWeighted(self.diff, self.deviation, alpha)
+        cv2.convertScaleAbs(self.background, dst=self.background_u8)
+        return mask
+
+    def getBackgroundImage(self):
+        return self.background_u8
+
+class FrameDiffBackground:
+    """Foreground = pixels that changed by more than threshold since `gap` frames ago (uint8 ring buffer)."""
+
+    def __init__(self, gap=3, threshold=25):
+        self.gap = gap
+        self.threshold = threshold
+        self.shape = None
+
+    def _allocate(self, gray):
+        self.shape = gray.shape
+        self.ring = np.repeat(gray[None], self.gap, axis=0)
+        self.position = 0
+        self.diff = np.empty_like(gray)
+        self.mask = np.empty_like(gray)
+
+    def apply(self, gray, fgmask=None):
+        if gray.shape != self.shape:
+            self._allocate(gray)
+        mask = self.mask if fgmask is None or fgmask.shape != gray.shape else fgmask
+
+        oldest = self.ring[self.position]
+        cv2.absdiff(gray, oldest, dst=self.diff)
+        cv2.threshold(self.diff, self.threshold, 255, cv2.THRESH_BINARY, dst=mask)
+        np.copyto(oldest, gray)  # The frame we just used is the oldest one, overwrite it
+        self.position = (self.position + 1) % self.gap
+        return mask
+
+    def getBackgroundImage(self):
+        return self.ring[self.position]
+
+def create_background_model(kind="mog2", history=500, threshold=None, **kwargs):
+    """Background model by name (BACKGROUND_MODELS). threshold is varThreshold for MOG2 (default 50),
+    dist2Threshold for KNN (400), min_threshold for running_average (15) and threshold for frame_diff (25).
+    """
+    if kind == "mog2":
+        return cv2.createBackgroundSubtractorMOG2(history=history,
+                                                  varThreshold=50 if threshold is None else threshold,
+                                                  detectShadows=False)
+    if kind == "knn":
+        return cv2.createBackgroundSubtractorKNN(history=history,
+                                                 dist2Threshold=400 if threshold is None else threshold,
+                                                 detectShadows=False)
+    if kind == "running_average":
+        return RunningAverageBackground(history, min_threshold=15 if threshold is None else threshold, **kwargs)
+    if kind == "frame_diff":
+        return FrameDiffBackground(threshold=25 if threshold is None else threshold, **kwargs)
+    raise ValueError(f"Unknown background model {kind!r}, expected one of {BACKGROUND_MODELS}")
@@ -0,0 +1,2 @@
+# Benchmarks for the phoneCV pipeline. Run them from the phoneCV folder, e.g.
+#   python -m benchmarks.bench_framesync
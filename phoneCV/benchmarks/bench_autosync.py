@@ -0,0 +1,27 @@
+import os
+import tempfile
+import time
+
+from autosync import video_offset
+from benchmarks.synthetic import write_scene_video
+
+# Automatic camera sync on two synthetic phones filming the same scene: one at 30 fps, one at 24 fps
+# that started recording TRUE_OFFSET seconds later. Reports how close the estimated offset gets (the
+# spin-up frames were picked by hand before, so anything under a frame is a win) and how long it takes.
+
+TRUE_OFFSET = 1.234    # seconds, scene time at which the second phone started recording
+DURATION = 60          # seconds of footage per phone
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        reference = write_scene_video(os.path.join(work_dir, "a.mp4"), 0.0, 30 * DURATION, 30)
+        other = write_scene_video(os.path.join(work_dir, "b.mp4"), TRUE_OFFSET, 24 * DURATION, 24)
+
+        print(f"{DURATION}s per phone, 30 fps vs 24 fps, true offset {-TRUE_OFFSET:+.3f}s")
+        for kind in ("motion", "brightness"):
+            start = time.perf_counter()
+            offset, peak = video_offset(reference, other, kind)
+            seconds = time.perf_counter() - start
+            error_frames = abs(offset + TRUE_OFFSET) * 30
+            print(f"{kind:<11} offset {offset:+.4f}s  correlation {peak:.2f}  "
+                  f"error {error_frames:.3f} frames @30fps  {seconds:.2f}s")
@@ -0,0 +1,56 @@
+import time
+
+import cv2
+import numpy as np
+
+from backgrounds import BACKGROUND_MODELS, create_background_model
+from benchmarks.synthetic import iter_synthetic_flight
+from blobfinder import find_blobs
+from sweep import score_boxes
+
+# Background models on a tripod flight (no pan, camera noise, several drones): ms per apply() and mask
+# quality against the ground-truth drone discs (pixel precision / recall / IoU), plus how many drones
+# come out of find_blobs. The first WARMUP frames are left out of the scores while the models settle.
+
+NUM_FRAMES = 200
+WIDTH, HEIGHT = 1280, 720
+NUM_DRONES = 5
+RADIUS = 6
+WARMUP = 30
+
+if __name__ == "__main__":
+    flight = list(iter_synthetic_flight(NUM_FRAMES, WIDTH, HEIGHT, num_drones=NUM_DRONES, radius=RADIUS,
+                                        pan_speed=0.0, noise=4.0))
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for _, _, frame, _ in flight]
+    labels = {frame_idx: boxes for frame_idx, _, _, boxes in flight}
+
+    truth = []
+    for _, _, _, boxes in flight:
+        mask = np.zeros((HEIGHT, WIDTH), np.uint8)
+        for x, y, _, _ in boxes.astype(int):
+            cv2.circle(mask, (x + RADIUS, y + RADIUS), RADIUS, 255, -1)
+        truth.append(mask > 0)
+
+    print(f"{NUM_FRAMES} frames @ {WIDTH}x{HEIGHT}, {NUM_DRONES} drones, static camera + noise")
+    print(f"{'model':<16} {'ms/frame':>8} {'pix prec':>8} {'pix rec':>8} {'pix IoU':>8} {'drone prec':>10} {'drone rec':>9}")
+    for kind in BACKGROUND_MODELS:
+        model = create_background_model(kind)
+        seconds = 0.0
+        hits = predicted = actual = union = 0
+        boxes = []
+        for gray, true_mask in zip(grays, truth):
+            start = time.perf_counter()
+            fgmask = model.apply(gray)
+            seconds += time.perf_counter() - start
+
+            boxes.append(find_blobs(fgmask, 20)[:, :4])
+            if len(boxes) > WARMUP:
+                fg = fgmask > 0
+                hits += np.count_nonzero(fg & true_mask)
+                predicted += np.count_nonzero(fg)
+                actual += np.count_nonzero(true_mask)
+                union += np.count_nonzero(fg | true_mask)
+
+        precision, recall, _ = score_boxes(boxes, labels, np.arange(NUM_FRAMES), skip_frames=WARMUP)
+        print(f"{kind:<16} {1000 * seconds / NUM_FRAMES:8.2f} {hits / max(predicted, 1):8.2f} "
+              f"{hits / max(actual, 1):8.2f} {hits / max(union, 1):8.2f} {precision:10.2f} {recall:9.2f}")
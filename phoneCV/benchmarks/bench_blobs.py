@@ -0,0 +1,40 @@
+import time
+
+import cv2
+
+from benchmarks.synthetic import make_blob_mask
+from blobfinder import find_blobs
+from MOG2_main import find_largest_contour
+
+# Per-frame cost of pulling blobs out of a foreground mask as the number of drones grows:
+# the old contour loop (contourArea + boundingRect per contour), the largest-contour detector
+# MOG2_main used, and the connected-components detector in blobfinder.
+
+WIDTH, HEIGHT = 1280, 720
+REPEATS = 100
+SPECKLE = 0.005  # Real MOG2 masks are full of single-pixel noise, which is what the contour loop chokes on
+
+def contour_loop(fgmask, min_area=100):
+    """cvmark1 / ballfinder style: one Python iteration per contour."""
+    boxes = []
+    contours, _ = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    for contour in contours:
+        if cv2.contourArea(contour) > min_area:
+            boxes.append(cv2.boundingRect(contour))
+    return boxes
+
+def ms_per_call(fn, fgmask):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn(fgmask)
+    return 1000 * (time.perf_counter() - start) / REPEATS, result
+
+if __name__ == "__main__":
+    print(f"{WIDTH}x{HEIGHT} mask with {100 * SPECKLE:.1f}% speckle, ms per frame")
+    print(f"{'drones':>6} {'contour loop':>13} {'largest only':>13} {'find_blobs':>11} {'found':>6}")
+    for num_blobs in (1, 5, 10, 25, 50, 100):
+        fgmask, _ = make_blob_mask(WIDTH, HEIGHT, num_blobs, speckle=SPECKLE)
+        loop_ms, _ = ms_per_call(contour_loop, fgmask)
+        largest_ms, _ = ms_per_call(find_largest_contour, fgmask)
+        blobs_ms, blobs = ms_per_call(find_blobs, fgmask)
+        print(f"{num_blobs:>6} {loop_ms:>13.3f} {largest_ms:>13.3f} {blobs_ms:>11.3f} {len(blobs):>6}")
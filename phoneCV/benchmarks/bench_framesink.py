@@ -0,0 +1,52 @@
+import os
+import tempfile
+import time
+
+import cv2
+
+from benchmarks.synthetic import iter_synthetic_flight
+from framesink import FrameSink
+from videoslicer import frame_filename
+
+# MOG2 loop that writes every annotated frame: blocking cv2.imwrite (the old MOG2_main / cvmark1 way)
+# against handing the frame to a FrameSink (png / jpg / mp4). Shows frames/sec of the whole run
+# (until the last frame is on disk) and how long the loop itself was blocked on writing.
+# The overlap needs a spare core: with one core the writer threads and the loop take turns.
+
+NUM_FRAMES = 150
+WIDTH, HEIGHT = 1280, 720
+
+def process(frames, write):
+    """MOG2 + a rectangle per frame, then write(frame_idx, timestamp, frame). Returns seconds spent in write."""
+    fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+    blocked = 0.0
+    for frame_idx, timestamp, frame, boxes in frames:
+        fgbg.apply(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        for x, y, w, h in boxes.astype(int):
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        start = time.perf_counter()
+        write(frame_idx, timestamp, frame)
+        blocked += time.perf_counter() - start
+    return blocked
+
+if __name__ == "__main__":
+    flight = list(iter_synthetic_flight(NUM_FRAMES, WIDTH, HEIGHT))
+    print(f"{NUM_FRAMES} frames @ {WIDTH}x{HEIGHT}, {os.cpu_count()} cores")
+    print(f"{'output':<18} {'fps':>6} {'loop blocked ms/frame':>22}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        def imwrite(frame_idx, timestamp, frame):
+            cv2.imwrite(os.path.join(work_dir, "sync", frame_filename(frame_idx, timestamp)), frame)
+
+        os.makedirs(os.path.join(work_dir, "sync"))
+        start = time.perf_counter()
+        blocked = process(((f[0], f[1], f[2].copy(), f[3]) for f in flight), imwrite)
+        seconds = time.perf_counter() - start
+        print(f"{'imwrite png (sync)':<18} {NUM_FRAMES / seconds:6.1f} {1000 * blocked / NUM_FRAMES:22.2f}")
+
+        for name, output, image_format in (("sink png", "png", "png"), ("sink jpg", "jpg", "jpg"),
+                                           ("sink mp4", "out.mp4", "png")):
+            start = time.perf_counter()
+            with FrameSink(os.path.join(work_dir, output), image_format) as sink:
+                blocked = process(((f[0], f[1], f[2].copy(), f[3]) for f in flight), sink.write)
+            seconds = time.perf_counter() - start
+            print(f"{name:<18} {NUM_FRAMES / seconds:6.1f} {1000 * blocked / NUM_FRAMES:22.2f}")
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import iter_synthetic_flight
+from framesource import FrameSource
+from framestore import write_frame_store
+from videoslicer import frame_filename, iter_video_frames
+
+# The per-frame loops as they were (MOG2_main: decode -> resize -> cvtColor -> MOG2, motiontracker:
+# imread -> cvtColor -> MOG2, each call returning a fresh array) against the same work through a
+# FrameSource (decode-ahead thread, reused buffers) with MOG2 writing into one mask.
+# Per loop: ms per frame (mean and p95 of the time from asking for a frame to having its mask) and
+# allocation churn, the MB allocated at peak within one frame over what was live before it
+# (tracemalloc sees numpy/OpenCV arrays; measured in a second, untimed pass).
+
+NUM_FRAMES = 120
+WIDTH, HEIGHT, FPS = 1920, 1080, 30
+SCALE = 0.5  # Like MOG2_main's fit-to-screen resize
+
+def mog2_main_loop(video_path):
+    fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+    for _, _, frame in iter_video_frames(video_path):
+        frame = cv2.resize(frame, (0, 0), fx=SCALE, fy=SCALE)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        yield fgbg.apply(gray)
+
+def motiontracker_loop(folder):
+    fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+    for frame_file in sorted(os.listdir(folder)):
+        frame = cv2.imread(os.path.join(folder, frame_file))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        yield fgbg.apply(gray)
+
+def source_loop(source):
+    fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+    fgmask = None
+    for _, _, _, gray in source.iter_gray():
+        fgmask = fgbg.apply(gray, fgmask)
+        yield fgmask
+
+def per_frame(loop):
+    """ms per frame: time from asking the loop for a mask to getting it."""
+    latencies = []
+    loop = iter(loop)
+    while True:
+        start = time.perf_counter()
+        if next(loop, None) is None:
+            break
+        latencies.append(time.perf_counter() - start)
+    return 1000 * np.array(latencies)
+
+def churn(loop):
+    """MB allocated at peak within each frame, over what was already live."""
+    tracemalloc.start()
+    loop = iter(loop)
+    per_frame_mb = []
+    while True:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        if next(loop, None) is None:
+            break
+        _, peak = tracemalloc.get_traced_memory()
+        per_frame_mb.append((peak - current) / 1e6)
+    tracemalloc.stop()
+    return np.median(per_frame_mb[1:])  # Not counting the first frame's one-off allocations
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        video_path = os.path.join(work_dir, "flight.mp4")
+        folder = os.path.join(work_dir, "frames")
+        store = os.path.join(work_dir, "flight.frames")
+        os.makedirs(folder)
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (WIDTH, HEIGHT))
+        for frame_idx, timestamp, frame, _ in iter_synthetic_flight(NUM_FRAMES, WIDTH, HEIGHT, FPS):
+            writer.write(frame)
+            cv2.imwrite(os.path.join(folder, frame_filename(frame_idx, timestamp)), frame)
+        writer.release()
+        write_frame_store(iter_video_frames(video_path), store)
+
+        loops = {
+            f"MOG2_main loop (video, x{SCALE})": lambda: mog2_main_loop(video_path),
+            f"FrameSource (video, x{SCALE})": lambda: source_loop(FrameSource(video_path, SCALE)),
+            "motiontracker loop (PNGs)": lambda: motiontracker_loop(folder),
+            "FrameSource (PNGs)": lambda: source_loop(FrameSource(folder)),
+            "FrameSource (raw store)": lambda: source_loop(FrameSource(store)),
+        }
+        print(f"{NUM_FRAMES} frames @ {WIDTH}x{HEIGHT}, {os.cpu_count()} cores")
+        print(f"{'loop':<30} {'ms/frame':>8} {'p95 ms':>7} {'MB churn/frame':>15}")
+        for name, make_loop in loops.items():
+            latencies = per_frame(make_loop())
+            print(f"{name:<30} {latencies.mean():8.2f} {np.percentile(latencies, 95):7.2f} "
+                  f"{churn(make_loop()):15.2f}")
@@ -0,0 +1,82 @@
+import os
+import random
+import tempfile
+import time
+
+import cv2
+
+from benchmarks.synthetic import iter_synthetic_flight
+from framestore import FrameStore, write_frame_store
+from videoslicer import frame_filename, parse_frame_filename
+
+# PNG-per-frame folder vs frame stores (raw / png / jpg) on a synthetic flight: time to write it, size on
+# disk, time to open it (listdir + sort vs reading the index), frames/sec reading everything in order,
+# reading RANDOM_READS frames in random order, and pulling every DOWNSAMPLE_RATE-th frame like framesync.
+# Reads run with the files in the page cache (written just before), i.e. the second-run case.
+
+NUM_FRAMES = 300
+WIDTH, HEIGHT, FPS = 1280, 720, 30
+RANDOM_READS = 100
+DOWNSAMPLE_RATE = 10
+
+def time_it(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def folder_size_mb(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder)) / 1e6
+
+class PngFolder:
+    """The old layout behind the same calls as FrameStore, for comparison."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.files = sorted(os.listdir(folder))
+        self.frame_ids = [parse_frame_filename(name)[0] for name in self.files]
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, position):
+        return cv2.imread(os.path.join(self.folder, self.files[position]))
+
+    def iter_frames(self, start_frame=None, end_frame=None, step=1):
+        for position, frame_idx in enumerate(self.frame_ids):
+            if frame_idx % step == 0:
+                yield frame_idx, None, self[position]
+
+def write_folder(frames, folder):
+    os.makedirs(folder)
+    for frame_idx, timestamp, frame in frames:
+        cv2.imwrite(os.path.join(folder, frame_filename(frame_idx, timestamp)), frame)
+
+if __name__ == "__main__":
+    frames = [(frame_idx, timestamp, frame) for frame_idx, timestamp, frame, _ in
+              iter_synthetic_flight(NUM_FRAMES, WIDTH, HEIGHT, FPS)]
+    order = random.Random(0).sample(range(NUM_FRAMES), RANDOM_READS)
+
+    print(f"{NUM_FRAMES} frames @ {WIDTH}x{HEIGHT} (noisy synthetic flight)")
+    print(f"{'layout':<12} {'write s':>8} {'MB':>7} {'open ms':>8} {'seq fps':>8} {'random fps':>10} "
+          f"{'every {}th fps'.format(DOWNSAMPLE_RATE):>14}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        layouts = {"PNG folder": None, "store raw": None, "store png": "png", "store jpg": "jpg"}
+        for name, compression in layouts.items():
+            path = os.path.join(work_dir, name.replace(" ", "_"))
+            if name == "PNG folder":
+                write_s, _ = time_it(lambda: write_folder(frames, path))
+                size_mb = folder_size_mb(path)
+                open_s, store = time_it(lambda: PngFolder(path))
+            else:
+                path += ".frames"
+                write_s, _ = time_it(lambda: write_frame_store(frames, path, compression))
+                size_mb = folder_size_mb(path)
+                open_s, store = time_it(lambda: FrameStore(path))
+
+            # .sum() touches every pixel, so a memory-mapped frame actually gets read
+            seq_s, _ = time_it(lambda: [store[i][::8, ::8].sum() for i in range(len(store))])
+            random_s, _ = time_it(lambda: [store[i][::8, ::8].sum() for i in order])
+            synced_s, synced = time_it(lambda: [frame[::8, ::8].sum() for _, _, frame in
+                                                store.iter_frames(0, None, DOWNSAMPLE_RATE)])
+            print(f"{name:<12} {write_s:8.2f} {size_mb:7.1f} {1000 * open_s:8.2f} {NUM_FRAMES / seq_s:8.1f} "
+                  f"{RANDOM_READS / random_s:10.1f} {len(synced) / synced_s:14.1f}")
@@ -0,0 +1,54 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_synthetic_video
+from framesync import iter_synced_video_frames, sync_and_downsample, sync_and_downsample_frames
+from videoslicer import extract_frames, iter_video_frames
+
+# Compares the old slice-then-filter path (videoslicer PNG dump + framesync re-read) against
+# decoding everything in memory and against the seek + grab/retrieve sync engine.
+
+NUM_FRAMES = 600
+START_FRAME = 150
+END_FRAME = 500
+DOWNSAMPLE_RATE = 10
+
+def time_it(fn):
+    """Returns (seconds, result) for one call of fn."""
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def slice_then_filter(video_path, work_dir):
+    frames_folder = os.path.join(work_dir, "frames")
+    synced_folder = os.path.join(work_dir, "synced")
+    os.makedirs(synced_folder, exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep the per-frame prints off the terminal
+        extract_frames(video_path, frames_folder)
+        sync_and_downsample_frames(frames_folder, synced_folder, START_FRAME, END_FRAME, DOWNSAMPLE_RATE)
+    return len(os.listdir(synced_folder))
+
+def decode_then_filter(video_path):
+    frames = sync_and_downsample(iter_video_frames(video_path), START_FRAME, END_FRAME, DOWNSAMPLE_RATE)
+    return sum(1 for _ in frames)
+
+def seek_and_grab(video_path):
+    return sum(1 for _ in iter_synced_video_frames(video_path, START_FRAME, END_FRAME, DOWNSAMPLE_RATE))
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        video_path = write_synthetic_video(os.path.join(work_dir, "flight.mp4"), NUM_FRAMES, 1280, 720)
+
+        results = {
+            "slice -> PNG -> filter": time_it(lambda: slice_then_filter(video_path, work_dir)),
+            "decode all -> filter": time_it(lambda: decode_then_filter(video_path)),
+            "seek + grab/retrieve": time_it(lambda: seek_and_grab(video_path)),
+        }
+
+    baseline = results["slice -> PNG -> filter"][0]
+    print(f"{NUM_FRAMES} frames @ 1280x720, keeping every {DOWNSAMPLE_RATE}th in [{START_FRAME}, {END_FRAME}]")
+    for name, (seconds, kept) in results.items():
+        print(f"{name:<24} {seconds:7.3f}s  {kept:4d} frames kept  {baseline / seconds:6.1f}x")
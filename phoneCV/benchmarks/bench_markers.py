@@ -0,0 +1,47 @@
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import make_marker_frame
+from markerfinder import RED_MARKERS
+
+# Red-marker detection per frame: the old cvmark1 path (HSV + two inRange added together + open/close
+# + Python loop over contours) vs markerfinder one frame at a time and in batches.
+
+WIDTH, HEIGHT = 1920, 1080
+NUM_MARKERS = 20
+BATCH = 8
+REPEATS = 10
+
+def old_cvmark1(frame):
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask = (cv2.inRange(hsv, np.array([0, 120, 70]), np.array([10, 255, 255]))
+            + cv2.inRange(hsv, np.array([170, 120, 70]), np.array([180, 255, 255])))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((5, 5), np.uint8))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    positions = []
+    for contour in contours:
+        if cv2.contourArea(contour) > 100:
+            x, y, w, h = cv2.boundingRect(contour)
+            positions.append((x + w // 2, y + h // 2))
+    return positions
+
+def ms_per_frame(fn, frames):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        found = fn(frames)
+    return 1000 * (time.perf_counter() - start) / (REPEATS * len(frames)), found
+
+if __name__ == "__main__":
+    frames = np.stack([make_marker_frame(WIDTH, HEIGHT, NUM_MARKERS, seed=i)[0] for i in range(BATCH)])
+
+    old_ms, old_found = ms_per_frame(lambda fs: [old_cvmark1(f) for f in fs], frames)
+    new_ms, new_found = ms_per_frame(lambda fs: [RED_MARKERS.detect(f) for f in fs], frames)
+    batch_ms, batch_found = ms_per_frame(RED_MARKERS.detect_batch, frames)
+
+    print(f"{WIDTH}x{HEIGHT}, {NUM_MARKERS} red markers per frame, batches of {BATCH}")
+    print(f"old cvmark1 path    {old_ms:7.2f} ms/frame  {sum(map(len, old_found)):4d} markers")
+    print(f"detect() per frame  {new_ms:7.2f} ms/frame  {sum(map(len, new_found)):4d} markers  {old_ms / new_ms:.1f}x")
+    print(f"detect_batch()      {batch_ms:7.2f} ms/frame  {sum(map(len, batch_found)):4d} markers  {old_ms / batch_ms:.1f}x")
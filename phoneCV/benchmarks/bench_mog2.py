@@ -0,0 +1,46 @@
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_synthetic_video
+from MOG2_main import print_timing_report, track_frames
+from videoslicer import iter_video_frames
+
+# Per-stage timings of the MOG2 tracker in headless mode vs. with the old PNG output and the old
+# waitKey(30) display floor (simulated, so this runs on servers without a screen).
+
+NUM_FRAMES = 200
+WIDTH, HEIGHT = 1280, 720
+
+class SleepDisplay:
+    """Stand-in for WindowDisplay that costs what waitKey(30) did, without needing a display."""
+
+    def show(self, fgmask, frame):
+        time.sleep(0.030)
+        return True
+
+    def close(self):
+        pass
+
+def run(video_path, **kwargs):
+    timings = {}
+    detections = track_frames(iter_video_frames(video_path), timings=timings, **kwargs)
+    return timings, len(detections)
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        video_path = write_synthetic_video(os.path.join(work_dir, "flight.mp4"), NUM_FRAMES, WIDTH, HEIGHT)
+        output_folder = os.path.join(work_dir, "processed")
+
+        runs = {
+            "headless": run(video_path),
+            "headless + PNG output": run(video_path, output_folder=output_folder),
+            "old loop (PNG + 30 ms display floor)": run(video_path, output_folder=output_folder,
+                                                        display=SleepDisplay(), scale=1.0),
+        }
+
+    baseline = sum(runs["old loop (PNG + 30 ms display floor)"][0].values())
+    for name, (timings, num_frames) in runs.items():
+        print()
+        print_timing_report(timings, num_frames, name)
+        print(f"  speedup vs old loop: {baseline / sum(timings.values()):.1f}x")
@@ -0,0 +1,70 @@
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import iter_synthetic_flight
+from MOG2_main import track_frames
+from motiongate import MotionGate
+from sweep import score_boxes
+
+# Motion gate on a flight that is mostly idle like the real ones: drones sitting on the pad, a bit of
+# flying, a long hover, more flying. Fresh camera noise on every frame, so a still frame isn't a
+# copy of the previous one. Runs MOG2_main's multi-target tracking at full rate and gated, and reports
+# frames skipped, speed, the gated run's precision/recall against the full-rate run's detections, and
+# both runs against the ground-truth boxes from take-off on (before that MOG2 can't see the drones
+# either). While hovering, full-rate MOG2 slowly learns the drones into the background and the gated
+# run keeps repeating the last boxes, so "vs full rate" counts some of the gated run's hits as misses.
+
+WIDTH, HEIGHT, FPS = 1280, 720, 30
+NUM_DRONES = 3
+NOISE = 4.0
+# (segment, frames): "pad" repeats the first flight frame, "hover" the last one flown, "fly" advances
+TIMELINE = [("pad", 120), ("fly", 60), ("hover", 150), ("fly", 60), ("hover", 60)]
+
+def idle_flight(timeline=TIMELINE, seed=0):
+    """(frames, labels, moving): frame tuples, {frame_idx: boxes} and which frames are in a fly segment."""
+    flown = sum(count for segment, count in timeline if segment == "fly")
+    flight = list(iter_synthetic_flight(flown, WIDTH, HEIGHT, FPS, num_drones=NUM_DRONES, pan_speed=0.0,
+                                        noise=0.0, seed=seed))
+    rng = np.random.default_rng(seed)
+    frames, labels, moving = [], {}, []
+    position = 0
+    for segment, count in timeline:
+        for _ in range(count):
+            if segment == "fly":
+                position += 1
+            _, _, frame, boxes = flight[max(position - 1, 0)]
+            grain = rng.normal(0, NOISE, frame.shape)
+            frame_idx = len(frames)
+            frames.append((frame_idx, frame_idx / FPS, np.clip(frame + grain, 0, 255).astype(np.uint8)))
+            labels[frame_idx] = boxes
+            moving.append(segment == "fly")
+    return frames, labels, np.array(moving)
+
+def run(frames, gate=None):
+    start = time.perf_counter()
+    detections = track_frames(iter(frames), multi_target=True, motion_gate=gate)
+    return time.perf_counter() - start, [blobs[:, :4] for _, _, blobs, _ in detections]
+
+if __name__ == "__main__":
+    cv2.setNumThreads(1)
+    frames, labels, moving = idle_flight()
+    frame_ids = np.arange(len(frames))
+    full_s, full = run(frames)
+    gate = MotionGate()
+    gated_s, gated = run(frames, gate)
+
+    flying = np.flatnonzero(moving)
+    airborne = np.arange(flying[0], len(frames))
+    full_labels = {i: boxes for i, boxes in enumerate(full)}
+
+    print(f"{len(frames)} frames @ {WIDTH}x{HEIGHT}, {NUM_DRONES} drones, {moving.sum()} of them flying")
+    print(f"full rate  {len(frames) / full_s:6.1f} fps")
+    print(f"gated      {len(frames) / gated_s:6.1f} fps  {gate.summary()}")
+    precision, recall, _ = score_boxes(gated, full_labels, frame_ids, skip_frames=10)
+    print(f"gated vs full-rate detections: precision {precision:.3f}, recall {recall:.3f}")
+    for name, boxes in (("full rate", full), ("gated", gated)):
+        for what, ids in (("flying", flying), ("since take-off", airborne)):
+            precision, recall, _ = score_boxes([boxes[i] for i in ids], labels, ids)
+            print(f"{name:<10} vs ground truth, {what:<14}: precision {precision:.3f}, recall {recall:.3f}")
@@ -0,0 +1,135 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import write_synthetic_flight
+from blobfinder import find_blobs
+from framesync import iter_synced_video_frames
+from roitracker import create_tracker
+from sweep import score_boxes
+from videoslicer import frame_filename, iter_video_frames
+
+# Regression baseline for the whole pipeline on a synthetic flight (panning background, several small
+# drones, camera noise, known boxes), one stage at a time: frames/sec and peak traced memory per stage
+# (stages don't hold on to their frames, so that's the per-frame working set), plus detection
+# precision/recall against the ground truth so a speedup that breaks detection shows up too.
+#   python -m benchmarks.bench_pipeline          compare against benchmarks/baseline.json if it's there
+#   python -m benchmarks.bench_pipeline --save   (re)write benchmarks/baseline.json
+# Baselines only mean something on the machine that wrote them.
+
+NUM_FRAMES = 150
+WIDTH, HEIGHT, FPS = 1280, 720, 30
+NUM_DRONES = 5
+DOWNSAMPLE_RATE = 10
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def measure(fn, num_frames):
+    """Runs fn twice: once timed, once under tracemalloc. Returns (frames/sec, peak MB, fn's result)."""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return num_frames / seconds, peak / 1e6, result
+
+def run_stages(video_path, labels, work_dir):
+    frames = [frame for _, _, frame in iter_video_frames(video_path)]
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    n = len(frames)
+
+    def decode():
+        return sum(1 for _ in iter_video_frames(video_path))
+
+    def slicer_write():
+        folder = os.path.join(work_dir, "frames")
+        os.makedirs(folder, exist_ok=True)
+        for frame_idx, frame in enumerate(frames):
+            cv2.imwrite(os.path.join(folder, frame_filename(frame_idx, frame_idx / FPS)), frame)
+
+    def framesync():
+        return sum(1 for _ in iter_synced_video_frames(video_path, 0, n - 1, DOWNSAMPLE_RATE))
+
+    def mog2(keep=False):
+        fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+        masks = []
+        for gray in grays:
+            fgmask = fgbg.apply(gray)
+            if keep:
+                masks.append(fgmask)
+        return masks
+
+    masks = mog2(keep=True)  # Input for the detect stage, made outside the measurement
+
+    def detect():
+        return [find_blobs(mask, 50)[:, :4] for mask in masks]
+
+    def csrt_update():
+        tracker = create_tracker("csrt")
+        tracker.init(frames[0], tuple(int(v) for v in labels[0][0]))
+        for frame in frames[1:]:
+            tracker.update(frame)
+
+    def imwrite():
+        folder = os.path.join(work_dir, "processed")
+        os.makedirs(folder, exist_ok=True)
+        for frame_idx, frame in enumerate(frames):
+            annotated = frame.copy()
+            for x, y, w, h in labels[frame_idx].astype(int):
+                cv2.rectangle(annotated, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            cv2.imwrite(os.path.join(folder, frame_filename(frame_idx, frame_idx / FPS)), annotated)
+
+    stages = {
+        "decode": (decode, n),
+        "videoslicer write": (slicer_write, n),
+        "framesync": (framesync, n),   # Source frames covered per second (grabs + retrieves)
+        "MOG2 apply": (mog2, n),
+        "detect": (detect, n),
+        "CSRT update": (csrt_update, n - 1),
+        "imwrite": (imwrite, n),
+    }
+    results = {}
+    for name, (fn, num_frames) in stages.items():
+        fps, peak_mb, result = measure(fn, num_frames)
+        results[name] = {"fps": fps, "peak_mb": peak_mb}
+        if name == "detect":
+            precision, recall, iou = score_boxes(result, labels, np.arange(n), skip_frames=10)
+            results[name].update(precision=precision, recall=recall, iou=iou)
+    return results
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        video_path = os.path.join(work_dir, "flight.mp4")
+        labels = write_synthetic_flight(video_path, NUM_FRAMES, WIDTH, HEIGHT, FPS, num_drones=NUM_DRONES)
+        results = run_stages(video_path, labels, work_dir)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    print(f"{NUM_FRAMES} frames @ {WIDTH}x{HEIGHT}, {NUM_DRONES} drones, camera noise + panning background")
+    print(f"{'stage':<18} {'frames/s':>9} {'peak MB':>8} {'vs baseline':>12}")
+    for name, result in results.items():
+        change = ""
+        if name in baseline:
+            change = f"{100 * (result['fps'] / baseline[name]['fps'] - 1):+.0f}%"
+        print(f"{name:<18} {result['fps']:9.1f} {result['peak_mb']:8.1f} {change:>12}")
+
+    detect = results["detect"]
+    print(f"detection: precision {detect['precision']:.2f}, recall {detect['recall']:.2f}, IoU {detect['iou']:.2f}")
+    if "detect" in baseline and detect["recall"] < baseline["detect"]["recall"] - 0.01:
+        print(f"⚠️ recall dropped from {baseline['detect']['recall']:.2f}")
+
+    if "--save" in sys.argv[1:]:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline saved to {BASELINE_PATH}")
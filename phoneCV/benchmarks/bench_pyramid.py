@@ -0,0 +1,34 @@
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import iter_synthetic_frames, synthetic_blob_center
+from MOG2_main import track_frames
+
+# Throughput and localization error of the MOG2 tracker at different processing scales, with and
+# without full-resolution refinement, on synthetic footage with known blob positions.
+
+WIDTH, HEIGHT = 3840, 2160
+NUM_FRAMES = 60
+WARMUP = 5  # MOG2 flags most of the first frames as foreground, leave them out of the error
+
+def run(frames, process_scale, refine):
+    start = time.perf_counter()
+    detections = track_frames(frames, process_scale=process_scale, refine=refine)
+    fps = len(frames) / (time.perf_counter() - start)
+
+    errors = []
+    for frame_idx, _, blobs, _ in detections[WARMUP:]:
+        if len(blobs):
+            tx, ty = synthetic_blob_center(frame_idx, NUM_FRAMES, WIDTH, HEIGHT)
+            errors.append(np.hypot(blobs[0, 5] - tx, blobs[0, 6] - ty))
+    return fps, np.mean(errors) if errors else float("nan"), len(errors)
+
+if __name__ == "__main__":
+    frames = list(iter_synthetic_frames(NUM_FRAMES, WIDTH, HEIGHT))
+    print(f"{NUM_FRAMES} frames @ {WIDTH}x{HEIGHT}")
+    print(f"{'scale':>6} {'refine':>7} {'fps':>7} {'centroid error':>15} {'detected':>9}")
+    for process_scale in (1.0, 0.5, 0.25):
+        for refine in ((False,) if process_scale == 1.0 else (False, True)):
+            fps, error, detected = run(frames, process_scale, refine)
+            print(f"{process_scale:>6} {str(refine):>7} {fps:>7.1f} {error:>13.2f}px {detected:>9}")
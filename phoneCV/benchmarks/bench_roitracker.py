@@ -0,0 +1,66 @@
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import iter_synthetic_frames, synthetic_blob_center
+from roitracker import HybridTracker, create_tracker
+
+# Per-frame cost of the old MOG2_csrt loop (MOG2 on every full frame + CSRT on the full frame) vs
+# the hybrid ROI tracker with CSRT / KCF / MOSSE (re-detecting at full and quarter resolution), on
+# synthetic 4K footage. Also reports the mean distance between the tracked box center and the ground truth.
+# Note a CSRT update costs about the same on a small ROI as on a full frame (it resamples its search
+# window to a fixed template size), so the big wins come from KCF/MOSSE and from cheaper re-detection.
+
+WIDTH, HEIGHT = 3840, 2160
+NUM_FRAMES = 120
+REDETECT_EVERY = 10
+
+def full_frame_csrt(frames):
+    """The MOG2_csrt.py approach: MOG2 apply + tracker.update on the whole frame, every frame."""
+    fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+    tracker = None
+    centers = {}
+    for frame_idx, _, frame in frames:
+        fgmask = fgbg.apply(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        if tracker is None:
+            if frame_idx == 0:
+                continue  # MOG2 flags the whole first frame as foreground
+            contours, _ = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if contours:
+                tracker = create_tracker("csrt")
+                tracker.init(frame, cv2.boundingRect(max(contours, key=cv2.contourArea)))
+            continue
+        ok, (x, y, w, h) = tracker.update(frame)
+        if ok:
+            centers[frame_idx] = (x + w / 2, y + h / 2)
+    return centers
+
+def hybrid(frames, tracker_type, detect_scale=1.0):
+    tracker = HybridTracker(tracker_type, REDETECT_EVERY, detect_scale=detect_scale)
+    centers = {}
+    for frame_idx, _, frame in frames:
+        tracks, _ = tracker.update(frame)
+        if tracks:
+            x, y, w, h = tracks[0][1]
+            centers[frame_idx] = (x + w / 2, y + h / 2)
+    return centers
+
+def run(name, fn, frames):
+    start = time.perf_counter()
+    centers = fn(frames)
+    ms = 1000 * (time.perf_counter() - start) / len(frames)
+    errors = [np.hypot(cx - tx, cy - ty) for frame_idx, (cx, cy) in centers.items()
+              for tx, ty in [synthetic_blob_center(frame_idx, NUM_FRAMES, WIDTH, HEIGHT)]]
+    error = f"{np.mean(errors):6.1f}px" if errors else "   n/a"
+    print(f"{name:<22} {ms:8.1f} ms/frame  {len(centers):4d} frames tracked  mean error {error}")
+    return ms
+
+if __name__ == "__main__":
+    frames = list(iter_synthetic_frames(NUM_FRAMES, WIDTH, HEIGHT))  # Decode cost out of the picture
+    print(f"{NUM_FRAMES} frames @ {WIDTH}x{HEIGHT}, re-detect every {REDETECT_EVERY} frames")
+    baseline = run("full-frame MOG2 + CSRT", full_frame_csrt, frames)
+    for detect_scale in (1.0, 0.25):
+        for tracker_type in ("csrt", "kcf", "mosse"):
+            ms = run(f"hybrid {tracker_type} @ {detect_scale}", lambda f: hybrid(f, tracker_type, detect_scale), frames)
+            print(f"{'':<22} {baseline / ms:8.1f}x faster")
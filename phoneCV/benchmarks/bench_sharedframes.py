@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import iter_synthetic_flight
+from framesource import FrameSource
+from MOG2_main import iter_track_frames
+from multitracker import MultiTracker
+from sharedframes import SharedFrameRing, iter_shared_detections
+
+# Frame handoff between processes: a frame pickled through a multiprocessing.Queue against the same frame
+# through a SharedFrameRing (one copy into shared memory, the slot number through the queue), per frame
+# at 1080p and 4K, next to what MOG2 costs on a frame that size. Then decode -> subtract -> track on a
+# synthetic flight in one process (FrameSource + iter_track_frames) and over three (iter_shared_detections),
+# and start-up time of the entry points now that the heavy imports are lazy.
+
+HANDOFF_FRAMES = 60
+SIZES = {"1080p": (1080, 1920, 3), "4K": (2160, 3840, 3)}
+FLIGHT_FRAMES, WIDTH, HEIGHT = 240, 1280, 720
+
+def send_pickled(frames, shape, count):
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    for _ in range(count):
+        frames.put(frame)
+    frames.put(None)
+
+def send_shared(ring, shape, count):
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    for frame_idx in range(count):
+        ring.put(frame_idx, 0.0, frame)
+    ring.finish()
+    ring.close()
+
+def time_pickled(shape, count):
+    frames = multiprocessing.Queue(maxsize=4)
+    sender = multiprocessing.Process(target=send_pickled, args=(frames, shape, count))
+    sender.start()
+    frames.get()  # Sender is up and the first frame is through, time the rest
+    start = time.perf_counter()
+    while frames.get() is not None:
+        pass
+    seconds = time.perf_counter() - start
+    sender.join()
+    return 1000 * seconds / (count - 1)
+
+def time_shared(shape, count):
+    ring = SharedFrameRing(shape, slots=4)
+    sender = multiprocessing.Process(target=send_shared, args=(ring, shape, count))
+    sender.start()
+    frames = ring.iter_frames((sender,))
+    next(frames)
+    start = time.perf_counter()
+    for _ in frames:
+        pass
+    seconds = time.perf_counter() - start
+    sender.join()
+    ring.close()
+    return 1000 * seconds / (count - 1)
+
+def time_mog2(shape, count=20):
+    gray = cv2.cvtColor(np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8), cv2.COLOR_BGR2GRAY)
+    fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
+    fgmask = fgbg.apply(gray)
+    start = time.perf_counter()
+    for _ in range(count):
+        fgmask = fgbg.apply(gray, fgmask)
+    return 1000 * (time.perf_counter() - start) / count
+
+def single_process(video_path):
+    tracker = MultiTracker()
+    return [(frame_idx, blobs, tracker.update(blobs[:, 5:7])) for frame_idx, _, blobs, _
+            in iter_track_frames(FrameSource(video_path), multi_target=True, min_area=20)]
+
+def three_processes(video_path):
+    return [(frame_idx, blobs, tracks) for frame_idx, _, blobs, tracks
+            in iter_shared_detections(video_path, min_area=20)]
+
+def startup_seconds(args, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == "__main__":
+    print(f"Handoff, {HANDOFF_FRAMES} frames, {os.cpu_count()} cores")
+    print(f"{'size':<6} {'MB/frame':>8} {'pickled Queue ms':>17} {'SharedFrameRing ms':>19} {'MOG2 ms':>8}")
+    for name, shape in SIZES.items():
+        print(f"{name:<6} {np.prod(shape) / 1e6:8.1f} {time_pickled(shape, HANDOFF_FRAMES):17.2f} "
+              f"{time_shared(shape, HANDOFF_FRAMES):19.2f} {time_mog2(shape):8.2f}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        video_path = os.path.join(work_dir, "flight.mp4")
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (WIDTH, HEIGHT))
+        for _, _, frame, _ in iter_synthetic_flight(FLIGHT_FRAMES, WIDTH, HEIGHT):
+            writer.write(frame)
+        writer.release()
+
+        print(f"\ndecode -> subtract -> track, {FLIGHT_FRAMES} frames @ {WIDTH}x{HEIGHT}")
+        results = {}
+        for name, run in (("one process", single_process), ("three processes", three_processes)):
+            start = time.perf_counter()
+            results[name] = run(video_path)
+            seconds = time.perf_counter() - start
+            print(f"  {name:<16} {len(results[name]) / seconds:7.1f} fps  ({seconds:.2f}s incl. process start-up)")
+        same = all(np.array_equal(a[1], b[1]) and np.array_equal(a[2], b[2])
+                   for a, b in zip(*results.values()))
+        print(f"  same detections and tracks: {same}")
+
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ["PYTHONPATH"] = here  # So the subprocesses find the phoneCV modules
+    print("\nStart-up (best of 3)")
+    for label, args in (("python pipeline.py --help", [os.path.join(here, "pipeline.py"), "--help"]),
+                        ("import sharedframes", ["-c", "import sharedframes"]),
+                        ("import MOG2_main", ["-c", "import MOG2_main"])):
+        print(f"  {label:<28} {1000 * startup_seconds(args):6.0f} ms")
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_blob_center, write_synthetic_video
+from sweep import SWEEP_GRID, expand_grid, print_sweep_report, run_config, sweep
+from videoslicer import iter_video_frames
+
+# Parameter sweep on a synthetic flight with known boxes: the shared-memory process pool vs the naive
+# way (decode the video again for every config and run them one after another).
+
+NUM_FRAMES = 150
+WIDTH, HEIGHT = 640, 360
+
+def synthetic_labels():
+    radius = max(3, min(WIDTH, HEIGHT) // 40)
+    labels = {}
+    for frame_idx in range(NUM_FRAMES):
+        cx, cy = synthetic_blob_center(frame_idx, NUM_FRAMES, WIDTH, HEIGHT)
+        labels[frame_idx] = np.array([[cx - radius, cy - radius, 2 * radius + 1, 2 * radius + 1]], np.float32)
+    return labels
+
+def decode_per_config(video_path, configs):
+    import cv2
+    for config in configs:
+        gray = np.stack([cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for _, _, frame in iter_video_frames(video_path)])
+        run_config(config, gray)
+
+if __name__ == "__main__":
+    configs = expand_grid(SWEEP_GRID)
+    with tempfile.TemporaryDirectory() as work_dir:
+        video_path = write_synthetic_video(os.path.join(work_dir, "flight.mp4"), NUM_FRAMES, WIDTH, HEIGHT)
+
+        start = time.perf_counter()
+        results = sweep(iter_video_frames(video_path), synthetic_labels(), configs)
+        pooled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decode_per_config(video_path, configs[:4])
+        naive = (time.perf_counter() - start) * len(configs) / 4  # Extrapolated from 4 configs
+
+    print_sweep_report(results, top=10)
+    print(f"\n{len(configs)} configs x {NUM_FRAMES} frames @ {WIDTH}x{HEIGHT}")
+    print(f"decode once + shared-memory pool  {pooled:7.2f}s")
+    print(f"decode per config, serial         {naive:7.2f}s (extrapolated)  {naive / pooled:.1f}x")
@@ -0,0 +1,62 @@
+import time
+
+import numpy as np
+
+import multitracker
+from benchmarks.synthetic import make_swarm_tracks
+from multitracker import MultiTracker
+
+# Synthetic swarm benchmark for the multi-object tracker: update cost per frame and identity
+# switches as the number of drones goes up. Detections are the ground truth plus pixel noise,
+# missed detections and random clutter blobs.
+
+WIDTH, HEIGHT = 1920, 1080
+NUM_FRAMES = 300
+NOISE_PX = 1.0
+MISS_RATE = 0.05
+CLUTTER_PER_FRAME = 2
+
+def make_detections(truth, rng):
+    """Per frame: (detections (N, 2), ground-truth target index per detection, -1 for clutter)."""
+    frames = []
+    for positions in truth:
+        seen = rng.random(len(positions)) > MISS_RATE
+        clutter = rng.uniform((0, 0), (WIDTH, HEIGHT), size=(rng.poisson(CLUTTER_PER_FRAME), 2))
+        centroids = np.concatenate([positions[seen] + rng.normal(0, NOISE_PX, (seen.sum(), 2)), clutter])
+        owners = np.concatenate([np.flatnonzero(seen), np.full(len(clutter), -1)])
+        order = rng.permutation(len(centroids))  # Detectors don't hand blobs back in a stable order
+        frames.append((centroids[order], owners[order]))
+    return frames
+
+def run(num_targets, rng):
+    truth = make_swarm_tracks(num_targets, NUM_FRAMES, WIDTH, HEIGHT, seed=num_targets)
+    frames = make_detections(truth, rng)
+    tracker = MultiTracker()
+
+    last_id = np.full(num_targets, -1)
+    switches = 0
+    elapsed = 0.0
+    for centroids, owners in frames:
+        start = time.perf_counter()
+        tracks = tracker.update(centroids)
+        elapsed += time.perf_counter() - start
+
+        # Identity switches: a target's matched track id changing from one frame to the next
+        matched = tracks[tracks[:, 5] >= 0]
+        targets = owners[matched[:, 5].astype(int)]
+        for target, track_id in zip(targets[targets >= 0], matched[targets >= 0, 0]):
+            if last_id[target] not in (-1, track_id):
+                switches += 1
+            last_id[target] = track_id
+
+    return 1e6 * elapsed / NUM_FRAMES, switches, len(tracker)
+
+if __name__ == "__main__":
+    solver = "scipy linear_sum_assignment" if multitracker.get_linear_sum_assignment() is not None else "greedy"
+    print(f"{NUM_FRAMES} frames, {NOISE_PX}px noise, {100 * MISS_RATE:.0f}% misses, "
+          f"{CLUTTER_PER_FRAME} clutter/frame, {solver}")
+    print(f"{'drones':>6} {'us/frame':>9} {'id switches':>12} {'live tracks':>12}")
+    rng = np.random.default_rng(0)
+    for num_targets in (1, 5, 10, 25, 50, 100, 200):
+        us_per_frame, switches, live = run(num_targets, rng)
+        print(f"{num_targets:>6} {us_per_frame:>9.1f} {switches:>12d} {live:>12d}")
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from trajectorystore import TrajectoryStore, load_trajectories
+
+# Trajectory store on a big synthetic swarm in 3D (NUM_DRONES random-walking drones in a 60 m cube):
+# streaming ingest (one add_frame per frame, like a tracker would), then neighbour ("within 1 m of a
+# point at frame f"), box and path ("drone 7 between frames 900 and 1200") queries, each checked
+# against a brute-force scan over every record and timed per call.
+
+NUM_DRONES = 300
+NUM_FRAMES = 2000
+SPACE = 60.0   # m
+RADIUS = 1.0   # m
+QUERIES = 500
+
+def time_calls(fn, args):
+    start = time.perf_counter()
+    results = [fn(*a) for a in args]
+    return 1e6 * (time.perf_counter() - start) / len(args), results
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, SPACE, (NUM_DRONES, 3))
+    store = TrajectoryStore(ndim=3, cell_size=RADIUS)
+    all_positions = np.empty((NUM_FRAMES, NUM_DRONES, 3))
+
+    ingest = 0.0
+    for frame_idx in range(NUM_FRAMES):
+        velocity = rng.normal(0, 0.1, (NUM_DRONES, 3))
+        positions = np.clip(positions + velocity, 0, SPACE)
+        all_positions[frame_idx] = positions
+        start = time.perf_counter()
+        store.add_frame(frame_idx, frame_idx / 30, np.arange(NUM_DRONES), positions, velocity)
+        ingest += time.perf_counter() - start
+
+    # Brute force over the flat columns, what you'd do without the indexes
+    columns = store.columns()
+    def brute_neighbors(point, radius, frame_idx):
+        rows = np.flatnonzero(columns["frame_idx"] == frame_idx)
+        distances = np.linalg.norm(columns["position"][rows] - point, axis=1)
+        return np.sort(columns["track_id"][rows[distances <= radius]])
+
+    def brute_path(track_id, start_frame, end_frame):
+        keep = ((columns["track_id"] == track_id) & (columns["frame_idx"] >= start_frame)
+                & (columns["frame_idx"] <= end_frame))
+        return columns["frame_idx"][keep]
+
+    frames = rng.integers(0, NUM_FRAMES, QUERIES)
+    # Query around real drones so there's something to find
+    points = [all_positions[f, rng.integers(NUM_DRONES)] + rng.normal(0, 0.5, 3) for f in frames]
+    neighbor_args = [(point, RADIUS, int(f)) for point, f in zip(points, frames)]
+    box_args = [(point - 2 * RADIUS, point + 2 * RADIUS, int(f)) for point, f in zip(points, frames)]
+    path_args = [(int(rng.integers(NUM_DRONES)), 900, 1200) for _ in range(QUERIES)]
+
+    store.grids.clear()
+    cold_us, _ = time_calls(store.neighbors, neighbor_args)  # Builds the grids of the frames it touches
+    warm_us, found = time_calls(store.neighbors, neighbor_args)
+    brute_us, expected = time_calls(brute_neighbors, neighbor_args)
+    assert all(np.array_equal(np.sort(ids), truth) for (ids, _, _), truth in zip(found, expected))
+    box_us, _ = time_calls(store.in_box, box_args)
+    path_us, paths = time_calls(store.path, path_args)
+    brute_path_us, expected_paths = time_calls(brute_path, path_args)
+    assert all(np.array_equal(path[0], truth) for path, truth in zip(paths, expected_paths))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "tracks.npz")
+        store.save(path)
+        size_mb = os.path.getsize(path) / 1e6
+        load_s, loaded = time_calls(load_trajectories, [(path,)])
+    assert len(loaded[0]) == len(store)
+
+    print(f"{NUM_DRONES} drones x {NUM_FRAMES} frames = {len(store)} records ({size_mb:.0f} MB saved)")
+    print(f"ingest          {1e6 * ingest / NUM_FRAMES:8.1f} us/frame")
+    print(f"neighbors (1 m) {cold_us:8.1f} us first time per frame, {warm_us:.1f} us after, "
+          f"brute force {brute_us:.1f} us, {np.mean([len(f[0]) for f in found]):.1f} drones found on average")
+    print(f"box (4 m)       {box_us:8.1f} us")
+    print(f"path (300 fr)   {path_us:8.1f} us, brute force {brute_path_us:.1f} us")
+    print(f"load            {load_s / 1e3:8.1f} ms")
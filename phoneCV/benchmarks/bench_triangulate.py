@@ -0,0 +1,46 @@
+import time
+
+import cv2
+import numpy as np
+
+from triangulate import Triangulator
+
+# Epipolar matching + batched DLT triangulation for two synthetic phones 3 m apart, looking at a swarm
+# 8-15 m away. Reports per-frame cost, how many drones come out, how many pairs were matched right and
+# the worst 3D error. With only two views, drones that sit on the same epipolar line can't be told
+# apart, so the correct-match rate drops once the swarm gets dense.
+
+SWARM_SIZES = (1, 10, 50, 100, 200)
+PIXEL_NOISE = 0.3
+REPEATS = 50
+
+def make_calibration():
+    K = np.array([[1000.0, 0, 960], [0, 1000.0, 540], [0, 0, 1]])
+    R = cv2.Rodrigues(np.array([0, -np.deg2rad(20), 0]))[0]
+    return {"K_a": K, "dist_a": np.zeros(5), "K_b": K, "dist_b": np.zeros(5), "R": R, "T": np.array([[-3.0], [0], [0.5]])}
+
+def project(P, positions):
+    projected = np.hstack([positions, np.ones((len(positions), 1))]) @ P.T
+    return projected[:, :2] / projected[:, 2:]
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    triangulator = Triangulator(make_calibration())
+
+    print("drones  ms/frame  triangulated  correct  max error (m)")
+    for num_drones in SWARM_SIZES:
+        positions = rng.uniform((-3, -2, 8), (3, 2, 15), (num_drones, 3))
+        order = rng.permutation(num_drones)  # Phone B sees the drones in a different order
+        blobs_a = np.zeros((num_drones, 7), np.float32)
+        blobs_b = np.zeros((num_drones, 7), np.float32)
+        blobs_a[:, 5:7] = project(triangulator.P_a, positions) + rng.normal(0, PIXEL_NOISE, (num_drones, 2))
+        blobs_b[:, 5:7] = project(triangulator.P_b, positions[order]) + rng.normal(0, PIXEL_NOISE, (num_drones, 2))
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            found, rows_a, rows_b, _ = triangulator.triangulate(blobs_a, blobs_b)
+        ms = 1000 * (time.perf_counter() - start) / REPEATS
+
+        correct = order[rows_b] == rows_a
+        error = np.linalg.norm(found[correct] - positions[rows_a[correct]], axis=1).max() if correct.any() else 0
+        print(f"{num_drones:6d}  {ms:8.2f}  {len(found):12d}  {correct.mean():7.0%}  {error:13.3f}")
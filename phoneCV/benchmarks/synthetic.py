@@ -0,0 +1,157 @@
+import cv2
+import numpy as np
+
+# Synthetic flight footage so the benchmarks can run without the real videos from the drive.
+
+def make_background(width, height, seed=0):
+    """Smooth random texture standing in for the static scene behind the drones."""
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), sigmaX=max(width, height) / 100)
+
+def synthetic_blob_center(frame_idx, num_frames, width, height):
+    """Ground-truth (cx, cy) of the blob in frame frame_idx of iter_synthetic_frames."""
+    radius = max(3, min(width, height) // 40)
+    t = frame_idx / max(num_frames - 1, 1)
+    return int(radius + t * (width - 2 * radius)), int(height / 2 + height / 4 * np.sin(2 * np.pi * t))
+
+def iter_synthetic_frames(num_frames=300, width=640, height=360, fps=30, seed=0):
+    """Yields (frame_idx, timestamp, frame) of a single dark blob flying across a static background."""
+    background = make_background(width, height, seed)
+    radius = max(3, min(width, height) // 40)
+
+    for frame_idx in range(num_frames):
+        frame = background.copy()
+        cv2.circle(frame, synthetic_blob_center(frame_idx, num_frames, width, height), radius, (20, 20, 20), -1)
+        yield frame_idx, frame_idx / fps, frame
+
+def write_synthetic_video(video_path, num_frames=300, width=640, height=360, fps=30, seed=0):
+    """Writes iter_synthetic_frames out as an .mp4."""
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for _, _, frame in iter_synthetic_frames(num_frames, width, height, fps, seed):
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+def make_blob_mask(width, height, num_blobs, radius=6, speckle=0.0, seed=0):
+    """Binary foreground mask with num_blobs non-overlapping discs, plus their (N, 2) centers.
+
+    speckle is the fraction of pixels turned on at random, like the single-pixel noise in a real MOG2 mask.
+    """
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((height, width), dtype=np.uint8)
+    centers = []
+    while len(centers) < num_blobs:
+        center = rng.uniform((2 * radius, 2 * radius), (width - 2 * radius, height - 2 * radius))
+        if all(np.hypot(*(center - other)) > 3 * radius for other in centers):
+            centers.append(center)
+            cv2.circle(mask, (int(center[0]), int(center[1])), radius, 255, -1)
+    mask[rng.random(mask.shape) < speckle] = 255
+    return mask, np.array(centers).reshape(-1, 2)
+
+def make_swarm_tracks(num_targets, num_frames, width, height, speed=4.0, turn_rate=0.1, seed=0):
+    """Ground-truth (num_frames, num_targets, 2) pixel positions of drones wandering around the frame.
+
+    Each drone flies at roughly `speed` px/frame, turns a little at random every frame and bounces
+    off the frame edges.
+    """
+    rng = np.random.default_rng(seed)
+    margin = 10
+    positions = np.empty((num_frames, num_targets, 2))
+    pos = rng.uniform((margin, margin), (width - margin, height - margin), size=(num_targets, 2))
+    heading = rng.uniform(0, 2 * np.pi, num_targets)
+    speeds = speed * rng.uniform(0.5, 1.5, num_targets)
+
+    for frame_idx in range(num_frames):
+        positions[frame_idx] = pos
+        heading += rng.normal(0, turn_rate, num_targets)
+        pos = pos + speeds[:, None] * np.stack([np.cos(heading), np.sin(heading)], axis=1)
+
+        # Bounce off the edges
+        out_x = (pos[:, 0] < margin) | (pos[:, 0] > width - margin)
+        out_y = (pos[:, 1] < margin) | (pos[:, 1] > height - margin)
+        heading[out_x] = np.pi - heading[out_x]
+        heading[out_y] = -heading[out_y]
+        pos = np.clip(pos, margin, (width - margin, height - margin))
+
+    return positions
+
+def make_marker_frame(width, height, num_markers, radius=10, seed=0):
+    """Background frame with num_markers red balls on it, plus their (N, 2) centers."""
+    rng = np.random.default_rng(seed)
+    frame = make_background(width, height, seed)
+    centers = rng.uniform((radius, radius), (width - radius, height - radius), size=(num_markers, 2))
+    for cx, cy in centers.astype(int):
+        cv2.circle(frame, (cx, cy), radius, (30, 30, 200), -1)
+    return frame, centers
+
+def write_scene_video(video_path, start_time, num_frames, fps, width=320, height=180, seed=0):
+    """Films one shared scene from start_time on, like a second phone that started recording at another time.
+
+    The blob flies in bursts (random speed every `segment` seconds) and the lighting flickers, both as
+    a function of absolute scene time, so two videos with different start_time/fps see the same events.
+    segment is deliberately not a whole number of frames, so the events don't land in lockstep with
+    either camera's frames.
+    """
+    segment = 0.4321
+    rng = np.random.default_rng(seed)
+    segments = rng.uniform(0, 1, 1000) ** 3  # Speed per segment, mostly slow with some bursts
+    lighting = rng.uniform(-20, 20, 1000)
+    background = make_background(width, height, seed)
+    radius = max(3, min(width, height) // 20)
+
+    def distance(t):
+        i = int(t / segment)
+        return segments[:i].sum() * segment + segments[i] * (t - i * segment)
+
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for frame_idx in range(num_frames):
+        t = start_time + frame_idx / fps
+        phase = distance(t) * 3
+        center = (int(width / 2 + width / 3 * np.cos(phase)), int(height / 2 + height / 3 * np.sin(2 * phase)))
+        frame = cv2.convertScaleAbs(background, beta=lighting[int(t / segment)])
+        cv2.circle(frame, center, radius, (20, 20, 20), -1)
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+def iter_synthetic_flight(num_frames=300, width=1280, height=720, fps=30, num_drones=3, radius=6,
+                          markers=False, pan_speed=0.5, noise=4.0, seed=0):
+    """Yields (frame_idx, timestamp, frame, boxes) of a whole synthetic flight with known ground truth.
+
+    num_drones small blobs (red balls if markers=True) wander around (make_swarm_tracks) on a background
+    that slowly pans by pan_speed px/frame (a tripod that isn't quite steady), with Gaussian camera
+    noise of std `noise` on every pixel. boxes is the (num_drones, 4) x, y, w, h ground truth.
+    """
+    rng = np.random.default_rng(seed)
+    pan = int(np.ceil(pan_speed * num_frames)) + 1
+    background = make_background(width + pan, height, seed)
+    tracks = make_swarm_tracks(num_drones, num_frames, width, height, seed=seed)
+    color = (30, 30, 200) if markers else (20, 20, 20)
+    grain = np.empty((height, width, 3), np.int16)
+    cv2.setRNGSeed(int(rng.integers(1 << 31)))
+
+    for frame_idx in range(num_frames):
+        offset = int(pan_speed * frame_idx)
+        frame = background[:, offset:offset + width].copy()
+        centers = np.round(tracks[frame_idx]).astype(int)
+        for cx, cy in centers:
+            cv2.circle(frame, (int(cx), int(cy)), radius, color, -1)
+        if noise > 0:
+            cv2.randn(grain, 0, noise)
+            frame = cv2.add(frame, grain, dtype=cv2.CV_8U)
+
+        boxes = np.empty((num_drones, 4), np.float32)
+        boxes[:, :2] = centers - radius
+        boxes[:, 2:] = 2 * radius + 1
+        yield frame_idx, frame_idx / fps, frame, boxes
+
+def write_synthetic_flight(video_path, num_frames=300, width=1280, height=720, fps=30, **kwargs):
+    """Writes iter_synthetic_flight out as an .mp4. Returns {frame_idx: (N, 4) ground-truth boxes}."""
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    labels = {}
+    for frame_idx, _, frame, boxes in iter_synthetic_flight(num_frames, width, height, fps, **kwargs):
+        writer.write(frame)
+        labels[frame_idx] = boxes
+    writer.release()
+    return labels
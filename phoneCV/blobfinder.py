@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+
+# Multi-target blob extraction from a foreground mask (e.g. the MOG2 fgmask).
+# connectedComponentsWithStats gives area/bbox/centroid for every blob at once, and the filters are
+# NumPy masks over those arrays, so there's no Python loop over contours and the cost per frame
+# barely moves whether there's 1 drone or 50.
+
+# Column layout of the blob arrays returned below
+BLOB_COLUMNS = ("x", "y", "w", "h", "area", "cx", "cy")
+
+def empty_blobs():
+    """Zero-row blob array."""
+    return np.empty((0, len(BLOB_COLUMNS)), dtype=np.float32)
+
+def find_blobs(fgmask, min_area=100, max_area=None, max_aspect=None, connectivity=8, max_bands=64):
+    """Returns every blob in fgmask as an (N, 7) float32 array of x, y, w, h, area, cx, cy.
+
+    Blobs need area > min_area (and <= max_area if given). max_aspect drops long thin blobs whose
+    long side is more than max_aspect times the short side (wires, edges of moving shadows...).
+    """
+    # Labelling costs per pixel it looks at, so only label the horizontal bands that have foreground
+    # in them (split on empty rows, so no blob can cross a band edge), each cropped to its own columns.
+    # Noisy masks with foreground nearly everywhere get one band for the whole foreground extent.
+    rows = cv2.reduce(fgmask, 1, cv2.REDUCE_MAX).ravel() > 0
+    edges = np.flatnonzero(np.diff(rows.astype(np.int8), prepend=0, append=0))
+    starts, ends = edges[::2], edges[1::2]
+    if len(starts) == 0:
+        return empty_blobs()
+    if len(starts) > max_bands or np.count_nonzero(rows) > len(rows) // 2:
+        starts, ends = starts[:1], ends[-1:]
+
+    stats, centroids = [], []
+    for y0, y1 in zip(starts, ends):
+        band = fgmask[y0:y1]
+        x0, _, w0, _ = cv2.boundingRect(band)
+        _, _, band_stats, band_centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+            band[:, x0:x0 + w0], connectivity, cv2.CV_32S, cv2.CCL_GRANA)
+        band_stats, band_centroids = band_stats[1:], band_centroids[1:]  # Label 0 is the background
+        band_stats[:, [cv2.CC_STAT_LEFT, cv2.CC_STAT_TOP]] += (x0, y0)
+        stats.append(band_stats)
+        centroids.append(band_centroids + (x0, y0))
+    stats, centroids = np.concatenate(stats), np.concatenate(centroids)
+
+    area = stats[:, cv2.CC_STAT_AREA]
+    keep = area > min_area  # Ignore small objects
+    if max_area is not None:
+        keep &= area <= max_area
+    if max_aspect is not None:
+        w, h = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+        keep &= np.maximum(w, h) <= max_aspect * np.minimum(w, h)
+
+    blobs = np.empty((np.count_nonzero(keep), len(BLOB_COLUMNS)), dtype=np.float32)
+    blobs[:, :5] = stats[keep]
+    blobs[:, 5:] = centroids[keep]
+    return blobs
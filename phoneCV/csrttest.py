@@ -2,17 +2,21 @@ import cv2
 import os
 import screeninfo
 
+from framestore import FRAME_STORE_EXT
+from videoslicer import STORE_FRAMES, iter_frames
+
 # Paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
 frame_folder = os.path.join(current_dir, "frames_synced", "frames_saanvi_one_synced")
+if STORE_FRAMES:
+    frame_folder += FRAME_STORE_EXT
 
 # Load first frame
-frame_files = sorted(os.listdir(frame_folder))
-first_frame = os.path.join(frame_folder, frame_files[0])
-frame = cv2.imread(first_frame)
+frames = iter_frames(frame_folder)
+_, _, frame = next(frames, (None, None, None))
 
 if frame is None:
-    print(f"Error loading first frame: {first_frame}")
+    print(f"Error loading first frame: {frame_folder}")
     exit()
 
 # Get screen width & height
@@ -35,14 +39,7 @@ tracker = cv2.legacy.TrackerCSRT_create()
 tracker.init(frame, bbox)
 
 # Process frames
-for frame_file in frame_files[1:]:  # Skip first frame (already used for selection)
-    frame_path = os.path.join(frame_folder, frame_file)
-    frame = cv2.imread(frame_path)
-
-    if frame is None:
-        print(f"Error loading frame: {frame_file}")
-        continue
-
+for frame_idx, timestamp, frame in frames:  # First frame already used for selection
     # Update tracker
     success, bbox = tracker.update(frame)
 
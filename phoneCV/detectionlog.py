@@ -0,0 +1,170 @@
+import cv2
+import numpy as np
+import os
+
+from framesink import FrameSink
+
+# Columnar detection log so downstream code can read detections instead of re-parsing annotated PNGs.
+# Rows are buffered and turned into column arrays every batch_size detections; .parquet logs write one
+# row group per batch (needs pyarrow), .npz logs are saved in one go on close.
+# Coordinates are in original (unscaled) frame pixels, ellipse columns are NaN when no ellipse was fit.
+
+DETECTION_COLUMNS = {
+    "frame_idx": np.int64,
+    "timestamp": np.float64,
+    "camera": np.str_,
+    "x": np.float32,
+    "y": np.float32,
+    "w": np.float32,
+    "h": np.float32,
+    "cx": np.float32,
+    "cy": np.float32,
+    "area": np.float32,
+    "ellipse_cx": np.float32,
+    "ellipse_cy": np.float32,
+    "ellipse_major": np.float32,
+    "ellipse_minor": np.float32,
+    "ellipse_angle": np.float32,
+}
+
+class DetectionLog:
+    """Batched writer for the detection log. Use as a context manager or call close()."""
+
+    def __init__(self, path, batch_size=1024):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = []
+        self.chunks = []
+        self.parquet_writer = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def add(self, camera, frame_idx, timestamp, bbox, area, centroid=None, ellipse=None, scale=1.0):
+        """Adds one detection. bbox/centroid/ellipse are in pixels of a frame resized by scale."""
+        x, y, w, h = bbox
+        if centroid is None:
+            centroid = (x + w / 2, y + h / 2)
+        if ellipse is None:
+            (ex, ey), (major, minor), angle = (np.nan, np.nan), (np.nan, np.nan), np.nan
+        else:
+            (ex, ey), (major, minor), angle = ellipse
+
+        self.rows.append((frame_idx, timestamp, camera, x / scale, y / scale, w / scale, h / scale,
+                          centroid[0] / scale, centroid[1] / scale, area / scale ** 2,
+                          ex / scale, ey / scale, major / scale, minor / scale, angle))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Turns the buffered rows into a column batch (and writes it out for parquet logs)."""
+        if not self.rows:
+            return
+        columns = list(zip(*self.rows))
+        batch = {name: np.asarray(values, dtype=dtype)
+                 for (name, dtype), values in zip(DETECTION_COLUMNS.items(), columns)}
+        self.rows = []
+
+        if self.path.endswith(".parquet"):
+            self._write_parquet(batch)
+        else:
+            self.chunks.append(batch)
+
+    def _write_parquet(self, batch):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Writing .parquet detection logs needs pyarrow (pip install pyarrow), "
+                              "or use a .npz path instead.")
+
+        table = pa.table(batch)
+        if self.parquet_writer is None:
+            self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        self.parquet_writer.write_table(table)
+
+    def close(self):
+        self.flush()
+        if self.path.endswith(".parquet"):
+            if self.parquet_writer is None:
+                self._write_parquet(empty_columns())
+            self.parquet_writer.close()
+        else:
+            np.savez(self.path, **concat_columns(self.chunks))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def empty_columns():
+    """Zero-row detection columns with the right dtypes."""
+    return {name: np.empty(0, dtype=dtype) for name, dtype in DETECTION_COLUMNS.items()}
+
+def concat_columns(chunks):
+    """Concatenates a list of column dicts into one column dict."""
+    if not chunks:
+        return empty_columns()
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in DETECTION_COLUMNS}
+
+def read_detection_log(*paths):
+    """Loads one or more .npz/.parquet detection logs into a single dict of column arrays."""
+    chunks = []
+    for path in paths:
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+            chunks.append({name: table[name].to_numpy().astype(dtype) for name, dtype in DETECTION_COLUMNS.items()})
+        else:
+            with np.load(path) as data:
+                chunks.append({name: data[name] for name in DETECTION_COLUMNS})
+    return concat_columns(chunks)
+
+def render_annotated_video(detections, frames, output_path, fps=10, camera=None):
+    """On-demand rendering: draws logged detections onto (frame_idx, timestamp, frame) tuples as an .mp4.
+
+    detections is a column dict from read_detection_log; camera picks one camera out of a merged log.
+    """
+    if camera is not None:
+        keep = detections["camera"] == camera
+        detections = {name: values[keep] for name, values in detections.items()}
+
+    # Row ranges per frame so each frame only looks at its own detections
+    order = np.argsort(detections["frame_idx"], kind="stable")
+    frame_ids = detections["frame_idx"][order]
+
+    sink = None
+    for frame_idx, timestamp, frame in frames:
+        if sink is None:
+            sink = FrameSink(output_path, fps=fps)  # Encodes on its own thread while we draw the next frame
+
+        lo, hi = np.searchsorted(frame_ids, [frame_idx, frame_idx + 1])
+        for row in order[lo:hi]:
+            x, y, w, h = (int(round(float(detections[c][row]))) for c in ("x", "y", "w", "h"))
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+            if not np.isnan(detections["ellipse_major"][row]):
+                ellipse = ((float(detections["ellipse_cx"][row]), float(detections["ellipse_cy"][row])),
+                           (float(detections["ellipse_major"][row]), float(detections["ellipse_minor"][row])),
+                           float(detections["ellipse_angle"][row]))
+                cv2.ellipse(frame, ellipse, (255, 0, 0), 2)
+
+        sink.write(frame_idx, timestamp, frame)
+
+    if sink is not None:
+        sink.close()
+        print(f"✅ Annotated video saved as {output_path}")
+
+# ========= MAIN EXECUTION =========
+if __name__ == "__main__":
+    from framestore import FRAME_STORE_EXT
+    from videoslicer import STORE_FRAMES, iter_frames
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Render the MOG2_main detection logs back onto the synced frames
+    for name, folder in (("saanvi", "frames_saanvi_one_synced"), ("nick", "frames_nick_one_synced")):
+        detections = read_detection_log(os.path.join(current_dir, "detections", f"{name}_one.npz"))
+        if STORE_FRAMES:
+            folder += FRAME_STORE_EXT
+        frames = iter_frames(os.path.join(current_dir, "frames_synced", folder))
+        render_annotated_video(detections, frames, os.path.join(current_dir, "mog2_processed", f"{name}_one.mp4"))
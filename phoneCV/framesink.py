@@ -0,0 +1,111 @@
+import cv2
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from framestore import FRAME_STORE_EXT, FrameStoreWriter
+from profiling import PROFILER
+from videoslicer import frame_filename
+
+# Write-behind output for annotated frames: write() queues the frame and returns straight away, a small
+# thread pool does the encoding + disk writes (OpenCV drops the GIL while it encodes, so this really runs
+# next to the processing loop). At most max_queue frames can be waiting; past that write() blocks until
+# one is done, so a slow disk slows the loop down instead of eating all the memory.
+# Where the frames go depends on the output path:
+#   something.mp4 / .avi   one video through cv2.VideoWriter (one writer thread, frames stay in order)
+#   something.frames       a frame store (framestore.py), also one thread
+#   anything else          a folder of frame_{idx}_{timestamp}.png / .jpg, encoded on `workers` threads
+# image_format picks png (lossless, png_compression 0-9, None = OpenCV's fastest) or jpg (quality 0-100).
+
+VIDEO_EXTS = (".mp4", ".avi")
+IMAGE_FORMATS = ("png", "jpg")
+
+class FrameSink:
+    """Asynchronous frame writer. write(frame_idx, timestamp, frame), then close() (or use it as a context manager).
+
+    The sink keeps a reference to the frame until it's written, so don't draw on it again after write()
+    (write a copy if you need to). Errors from the writer threads come back out of write()/close().
+    wait_seconds is how long write() spent blocked on a full queue.
+    """
+
+    def __init__(self, output, image_format="png", quality=90, png_compression=None, fps=10, workers=2,
+                 max_queue=8, clear=False):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format {image_format!r}, expected one of {IMAGE_FORMATS}")
+        self.output = output
+        self.image_format = image_format
+        self.fps = fps
+        if clear and os.path.isdir(output):
+            shutil.rmtree(output)
+        elif clear and os.path.exists(output):
+            os.remove(output)
+
+        ext = os.path.splitext(output)[1].lower()
+        if ext in VIDEO_EXTS:
+            self.kind, workers = "video", 1
+            self.video = None  # Opened on the first frame, VideoWriter needs the size
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        elif ext == FRAME_STORE_EXT:
+            self.kind, workers = "store", 1
+            self.store = FrameStoreWriter(output)
+        else:
+            self.kind = image_format
+            os.makedirs(output, exist_ok=True)
+            if image_format == "jpg":
+                self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+            else:
+                self.params = [] if png_compression is None else [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FrameSink")
+        self.slots = threading.BoundedSemaphore(max_queue)
+        self.error = None
+        self.wait_seconds = 0.0
+
+    def write(self, frame_idx, timestamp, frame):
+        """Queues one frame, only blocks if max_queue frames are already waiting."""
+        if self.error is not None:
+            raise self.error
+        start = time.perf_counter()
+        self.slots.acquire()
+        self.wait_seconds += time.perf_counter() - start
+        self.pool.submit(self._write, frame_idx, timestamp, frame)
+
+    def _write(self, frame_idx, timestamp, frame):
+        try:
+            with PROFILER.stage("sink write"):
+                if self.kind == "video":
+                    if self.video is None:
+                        height, width = frame.shape[:2]
+                        self.video = cv2.VideoWriter(self.output, cv2.VideoWriter_fourcc(*"mp4v"), self.fps,
+                                                     (width, height))
+                    self.video.write(frame)
+                elif self.kind == "store":
+                    self.store.append(frame_idx, timestamp, frame)
+                else:
+                    name = os.path.splitext(frame_filename(frame_idx, timestamp))[0] + "." + self.kind
+                    if not cv2.imwrite(os.path.join(self.output, name), frame, self.params):
+                        raise OSError(f"Could not write {name} to {self.output}")
+        except Exception as error:
+            if self.error is None:
+                self.error = error
+        finally:
+            self.slots.release()
+
+    def close(self):
+        """Waits for every queued frame to be written."""
+        self.pool.shutdown(wait=True)
+        if self.kind == "video" and self.video is not None:
+            self.video.release()
+            self.video = None
+        elif self.kind == "store":
+            self.store.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
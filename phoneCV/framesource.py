@@ -0,0 +1,119 @@
+import cv2
+import os
+import queue
+import threading
+
+import numpy as np
+
+from framestore import FrameStore, is_frame_store
+from framesync import iter_synced_video_frames, sync_and_downsample
+from videoslicer import iter_folder_frames
+
+# Decode-ahead frame source for the per-frame loops. A worker thread decodes (video, frame store or
+# folder of frame PNGs), resizes and converts to gray into a ring of buffers allocated once on the
+# first frame, while the loop works on the frame before. Videos decode straight into one reused
+# full-size buffer (VideoCapture.retrieve into it) and raw frame stores are read off the memory map,
+# so after the first frame nothing gets allocated per frame; PNG folders still pay for imread's array
+# (handed out as is at scale 1, no copy into the ring).
+# Frames may be views into the ring: they're only good until the loop asks for the next frame, so
+# copy anything that has to live longer (MOG2_main hands FrameSink a copy).
+
+def decode_frames(source, start_frame=0, end_frame=None, step=1):
+    """Synced (frame_idx, timestamp, full-size frame) iterator over a video / frame store / frame folder.
+
+    Also returns whether it reuses one buffer for every frame (videos do, copy what you keep).
+    """
+    if is_frame_store(source):
+        return FrameStore(source).iter_frames(start_frame, end_frame, step), False
+    end_frame = float("inf") if end_frame is None else end_frame
+    if os.path.isdir(source):
+        return sync_and_downsample(iter_folder_frames(source), start_frame, end_frame, step), False
+    return iter_synced_video_frames(source, start_frame, end_frame, step, reuse=True), True
+
+class FrameSource:
+    """(frame_idx, timestamp, frame) from a video / frame store / frame folder, decoded on a worker thread.
+
+    scale: resize factor, applied once on the worker (frames come out resized).
+    start_frame / end_frame / step: which frames, like framesync (videos seek + grab/retrieve).
+    ring_size: preallocated slots, the worker decodes up to ring_size - 1 frames ahead of the one in use.
+    Iterating gives (frame_idx, timestamp, frame); iter_gray() also gives the grayscale frame.
+    """
+
+    def __init__(self, source, scale=1.0, start_frame=0, end_frame=None, step=1, ring_size=4):
+        self.source = source
+        self.scale = scale
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.step = step
+        self.ring_size = ring_size
+        self.frames = self.grays = None
+
+    def _allocate(self, frame, copies):
+        height, width = frame.shape[:2]
+        self.size = (width, height)
+        if self.scale != 1.0:
+            self.size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+        if copies or self.scale != 1.0:
+            self.frames = np.empty((self.ring_size, self.size[1], self.size[0]) + frame.shape[2:], np.uint8)
+        self.grays = np.empty((self.ring_size, self.size[1], self.size[0]), np.uint8)
+
+    def _decode_ahead(self, free, ready, stop):
+        """Worker thread: fills free slots and hands them over as (slot, frame_idx, timestamp)."""
+        try:
+            decoded_frames, reused = decode_frames(self.source, self.start_frame, self.end_frame, self.step)
+            for frame_idx, timestamp, decoded in decoded_frames:
+                if self.grays is None:
+                    self._allocate(decoded, reused)
+                slot = None
+                while slot is None:
+                    if stop.is_set():
+                        return
+                    try:
+                        slot = free.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+
+                gray = self.grays[slot]
+                if self.scale != 1.0:
+                    frame = cv2.resize(decoded, self.size, dst=self.frames[slot], interpolation=cv2.INTER_AREA)
+                elif reused:
+                    frame = self.frames[slot]
+                    np.copyto(frame, decoded)
+                else:
+                    frame = decoded  # A fresh imread array or a view of the memory map, nothing to copy
+                if frame.ndim == 3:
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+                else:
+                    np.copyto(gray, frame)
+                ready.put((slot, frame_idx, timestamp, frame))
+            ready.put(None)
+        except Exception as error:
+            ready.put(error)
+
+    def iter_gray(self):
+        """Yields (frame_idx, timestamp, frame, gray), only good until the next one is asked for."""
+        free, ready, stop = queue.Queue(), queue.Queue(), threading.Event()
+        for slot in range(self.ring_size):
+            free.put(slot)
+        worker = threading.Thread(target=self._decode_ahead, args=(free, ready, stop), daemon=True)
+        worker.start()
+
+        slot = None
+        try:
+            while True:
+                if slot is not None:
+                    free.put(slot)  # The loop is done with the last frame, its slot can be decoded into again
+                item = ready.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                slot, frame_idx, timestamp, frame = item
+                yield frame_idx, timestamp, frame, self.grays[slot]
+        finally:
+            stop.set()
+            worker.join()
+
+    def __iter__(self):
+        for frame_idx, timestamp, frame, _ in self.iter_gray():
+            yield frame_idx, timestamp, frame
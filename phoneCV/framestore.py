@@ -0,0 +1,150 @@
+import cv2
+import json
+import os
+
+import numpy as np
+
+# One-file-per-frame PNG folders get slow once a flight has a few thousand frames (listdir + sort +
+# imread + parsing the frame number back out of the name, in every script). A frame store keeps a
+# whole flight in one folder with two files:
+#   frames.bin   every frame back to back, raw uint8 pixels or one encoded PNG/JPEG per frame
+#   index.json   shape, compression, and per frame its frame_idx, timestamp and byte offset
+# frames.bin is memory-mapped, so opening a store reads nothing but the index, any frame is one
+# offset lookup away, and uncompressed stores hand out frames (and slices of frames) as NumPy views
+# of the file with no copy. The mapping is copy-on-write: drawing on a frame never touches the file.
+#   compression=None    raw pixels, biggest on disk, fastest (reads are just page faults)
+#   compression="png"   lossless, same size and speed as the PNG files
+#   compression="jpg"   lossy, smallest, for frames that only get looked at (quality=95 by default)
+
+FRAME_STORE_EXT = ".frames"  # Stores are folders named like flight1_nick.frames
+COMPRESSIONS = (None, "png", "jpg")
+
+def is_frame_store(path):
+    return os.path.isfile(os.path.join(path, "index.json"))
+
+class FrameStoreWriter:
+    """Appends (frame_idx, timestamp, frame) to a new frame store. Use as a context manager or call close().
+
+    The index is only written on close(), so a store that never got closed doesn't open.
+    """
+
+    def __init__(self, path, compression=None, quality=95):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}")
+        self.path = path
+        self.compression = compression
+        # No PNG params on purpose: that's OpenCV's fastest setting (level 1 + RLE), same as imwrite's
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality] if compression == "jpg" else []
+        self.shape = None
+        self.frame_ids, self.timestamps, self.offsets = [], [], [0]
+
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, "index.json")
+        if os.path.exists(index_path):
+            os.remove(index_path)  # Overwriting an old store, it isn't valid until we're done
+        self.data = open(os.path.join(path, "frames.bin"), "wb")
+
+    def append(self, frame_idx, timestamp, frame):
+        if self.shape is None:
+            self.shape = frame.shape
+        elif frame.shape != self.shape:
+            raise ValueError(f"Frame {frame_idx} is {frame.shape}, the store holds {self.shape} frames")
+        if frame.dtype != np.uint8:
+            raise ValueError(f"Frame stores hold uint8 frames, got {frame.dtype}")
+
+        if self.compression is None:
+            self.data.write(np.ascontiguousarray(frame).data)
+        else:
+            ok, encoded = cv2.imencode("." + self.compression, frame, self.encode_params)
+            if not ok:
+                raise ValueError(f"Could not encode frame {frame_idx} as {self.compression}")
+            self.data.write(encoded.data)
+
+        self.frame_ids.append(int(frame_idx))
+        self.timestamps.append(float(timestamp))
+        self.offsets.append(self.data.tell())
+
+    def close(self):
+        if self.data.closed:
+            return
+        self.data.close()
+        index = {"shape": self.shape, "compression": self.compression, "frame_idx": self.frame_ids,
+                 "timestamps": self.timestamps, "offsets": self.offsets}
+        temp_path = os.path.join(self.path, "index.tmp.json")
+        with open(temp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(temp_path, os.path.join(self.path, "index.json"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class FrameStore:
+    """Read side of a frame store.
+
+    store[i] / store[a:b] index by position (views into the file when uncompressed), store.get(frame_idx)
+    and store.iter_frames(start, end, step) go by frame number. frame_ids / timestamps are the index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "index.json")) as f:
+            index = json.load(f)
+        self.compression = index["compression"]
+        self.shape = tuple(index["shape"] or ())
+        self.frame_ids = np.array(index["frame_idx"], dtype=np.int64)
+        self.timestamps = np.array(index["timestamps"], dtype=np.float64)
+        self.offsets = np.array(index["offsets"], dtype=np.int64)
+        self.positions = {frame_idx: i for i, frame_idx in enumerate(self.frame_ids.tolist())}
+
+        self.data = None
+        self.frames = None
+        if len(self.frame_ids):
+            self.data = np.memmap(os.path.join(path, "frames.bin"), dtype=np.uint8, mode="c")
+            if self.compression is None:
+                self.frames = self.data.reshape(len(self.frame_ids), *self.shape)  # (N, H, W[, C]) view
+
+    def __len__(self):
+        return len(self.frame_ids)
+
+    def __getitem__(self, position):
+        if self.frames is not None:
+            return self.frames[position]
+        if isinstance(position, slice):
+            return np.stack([self._decode(i) for i in range(*position.indices(len(self)))])
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(f"Frame position {position} out of range for {len(self)} frames")
+        return self._decode(position)
+
+    def _decode(self, position):
+        encoded = self.data[self.offsets[position]:self.offsets[position + 1]]
+        return cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED)
+
+    def get(self, frame_idx):
+        """Frame by frame number (KeyError if the store doesn't have it)."""
+        return self[self.positions[frame_idx]]
+
+    def select(self, start_frame=None, end_frame=None, step=1):
+        """Positions of the frames with start_frame <= frame_idx <= end_frame, every step-th from start_frame."""
+        if start_frame is None:
+            start_frame = int(self.frame_ids[0]) if len(self) else 0
+        keep = (self.frame_ids >= start_frame) & ((self.frame_ids - start_frame) % step == 0)
+        if end_frame is not None:
+            keep &= self.frame_ids <= end_frame
+        return np.flatnonzero(keep)
+
+    def iter_frames(self, start_frame=None, end_frame=None, step=1):
+        """Yields (frame_idx, timestamp, frame) like iter_video_frames, only decoding the frames selected."""
+        for position in self.select(start_frame, end_frame, step):
+            yield int(self.frame_ids[position]), float(self.timestamps[position]), self[position]
+
+def write_frame_store(frames, path, compression=None, quality=95):
+    """Writes (frame_idx, timestamp, frame) tuples to a new frame store. Returns the number of frames."""
+    with FrameStoreWriter(path, compression, quality) as writer:
+        for frame_idx, timestamp, frame in frames:
+            writer.append(frame_idx, timestamp, frame)
+    return len(writer.frame_ids)
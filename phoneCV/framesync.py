@@ -1,9 +1,16 @@
 import cv2
 import os
 import shutil
+import time
+
+from autosync import auto_sync
+from framestore import FRAME_STORE_EXT, FrameStore, is_frame_store
+from profiling import PROFILER
+from videoslicer import STORE_FRAMES, get_video_fps, open_frame_writer, parse_frame_filename
 
 # This script synchronizes frames from two different sources (Nick1 and Saanvi1) based on a known offset.
 # It also downsamples the frames to reduce the number of images for further processing.
+# Outputs are frame stores (framestore.py) when videoslicer.STORE_FRAMES is on, PNG folders otherwise.
 
 # Nick1 spin-up frame: frame_000795_26.489.png (796th frame, 26.489s)
 # Saanvi1 spin-up frame: frame_000780_26.023.png (781st frame, 26.023s)
@@ -14,19 +21,8 @@ START_FRAME_S1 = 781  # Saanvi1's first flight frame
 END_FRAME_N1 = 2636   # Nick1's last frame to process (adjustable)
 END_FRAME_S1 = 2621   # Saanvi1's last frame to process (adjustable)
 DOWNSAMPLE_RATE = 10  # Extract every 10th frame (adjustable)
-
-# Paths
-current_dir = os.path.dirname(os.path.abspath(__file__))
-frame_folder_n1 = os.path.join(current_dir, "frames_nick_one")
-frame_folder_s1 = os.path.join(current_dir, "frames_saanvi_one")
-output_folder = os.path.join(current_dir, "frames_synced")
-os.makedirs(output_folder, exist_ok=True)
-
-# Output directories for synced frames
-synced_n1 = os.path.join(output_folder, "frames_nick_one_synced")
-synced_s1 = os.path.join(output_folder, "frames_saanvi_one_synced")
-os.makedirs(synced_n1, exist_ok=True)
-os.makedirs(synced_s1, exist_ok=True)
+SYNC_FROM_VIDEO = True  # Seek straight into videos/ instead of reading the videoslicer frame folders
+AUTO_SYNC = False  # Work out Saanvi1's frames from Nick1's with autosync.py instead of the hand-picked ones
 
 # Function to clear output folders before rerunning
 def clear_folder(folder):
@@ -35,16 +31,113 @@ def clear_folder(folder):
         shutil.rmtree(folder)  # Deletes the entire folder
     os.makedirs(folder, exist_ok=True)  # Recreate the empty folder
 
-# Clear output directories
-clear_folder(synced_n1)
-clear_folder(synced_s1)
+def sync_and_downsample(frames, start_frame, end_frame, downsample_rate):
+    """Generator stage: keeps every Nth (frame_idx, timestamp, frame) between the start and end frames."""
+    for frame_idx, timestamp, frame in frames:
+        if frame_idx < start_frame:
+            continue  # Skip frames before the start frame
+        if frame_idx > end_frame:
+            break  # Stop processing once we reach the end frame
+        if (frame_idx - start_frame) % downsample_rate != 0:
+            continue  # Skip frames to downsample
+
+        yield frame_idx, timestamp, frame
+
+def iter_synced_video_frames(video_path, start_frame, end_frame, downsample_rate, seek=True, reuse=False):
+    """Yields the synced (frame_idx, timestamp, frame) tuples straight from the source video.
+
+    Jumps to start_frame with CAP_PROP_POS_FRAMES (falls back to grabbing up to it if the backend
+    can't seek exactly), then only grab()s the frames being skipped and retrieve()s the ones kept,
+    so the skipped frames never get converted to BGR or copied out. reuse=True retrieves every frame
+    into the same array (no allocation per frame, but each frame is only good until the next one).
+    """
+    if not os.path.exists(video_path):
+        print(f"Error: No such video as {video_path} exists.")
+        return
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open {video_path}")
+        return
+
+    fps = get_video_fps(cap)
+
+    try:
+        frame_idx = 0
+        frame = None
+        if seek and start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == start_frame:
+                frame_idx = start_frame
+            else:
+                # Inexact seek (some containers only land on keyframes), rewind and grab forward instead
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+        while frame_idx <= end_frame:
+            if not cap.grab():
+                break
+
+            if frame_idx >= start_frame and (frame_idx - start_frame) % downsample_rate == 0:
+                ret, retrieved = cap.retrieve(frame if reuse else None)
+                if ret and reuse:
+                    frame = retrieved
+                if not ret:
+                    print(f"Error decoding frame: {frame_idx}")
+                else:
+                    yield frame_idx, frame_idx / fps, retrieved
+
+            frame_idx += 1
+    finally:
+        cap.release()
+
+def iter_synced_store_frames(store_path, start_frame, end_frame, downsample_rate):
+    """Yields the synced (frame_idx, timestamp, frame) tuples of a frame store, picked off its index."""
+    return FrameStore(store_path).iter_frames(start_frame, end_frame, downsample_rate)
+
+def sync_and_downsample_video(video_path, output_folder, start_frame, end_frame, downsample_rate, seek=True):
+    """Writes the synced & downsampled frames of a video, skipping the full videoslicer dump.
+
+    output_folder ending in .frames gets a frame store, anything else a folder of PNGs.
+    """
+    saved = 0
+    with open_frame_writer(output_folder) as writer:
+        t = time.perf_counter()
+        for frame_idx, timestamp, frame in iter_synced_video_frames(video_path, start_frame, end_frame,
+                                                                    downsample_rate, seek):
+            PROFILER.record("decode", time.perf_counter() - t)
+            with PROFILER.stage("write"):
+                writer.append(frame_idx, timestamp, frame)  # Save synced & downsampled frame
+            saved += 1
+            t = time.perf_counter()
+
+    print(f"Saved {saved} synced frames in {output_folder}")
+
+def sync_and_downsample_store(input_store, output_folder, start_frame, end_frame, downsample_rate):
+    """Syncs and downsamples a frame store (into another store or a PNG folder, see open_frame_writer)."""
+    saved = 0
+    with open_frame_writer(output_folder) as writer:
+        frames = iter_synced_store_frames(input_store, start_frame, end_frame, downsample_rate)
+        t = time.perf_counter()
+        for frame_idx, timestamp, frame in frames:
+            PROFILER.record("decode", time.perf_counter() - t)
+            with PROFILER.stage("write"):
+                writer.append(frame_idx, timestamp, frame)
+            saved += 1
+            t = time.perf_counter()
+
+    print(f"Saved {saved} synced frames in {output_folder}")
 
 def sync_and_downsample_frames(input_folder, output_folder, start_frame, end_frame, downsample_rate):
-    """Syncs and downsamples frames from a folder, within the given start and end frames."""
+    """Syncs and downsamples frames from a folder (or frame store), within the given start and end frames."""
+    if is_frame_store(input_folder):
+        sync_and_downsample_store(input_folder, output_folder, start_frame, end_frame, downsample_rate)
+        return
+
     frame_files = sorted(os.listdir(input_folder))  # Sort to ensure order
+    saved = 0
 
     for frame_file in frame_files:
-        frame_number = int(frame_file.split("_")[1])  # Extract frame number from filename
+        frame_number, _ = parse_frame_filename(frame_file)
 
         if frame_number < start_frame:
             continue  # Skip frames before the start frame
@@ -54,19 +147,55 @@ def sync_and_downsample_frames(input_folder, output_folder, start_frame, end_fra
             continue  # Skip frames to downsample
 
         frame_path = os.path.join(input_folder, frame_file)
-        frame = cv2.imread(frame_path)
+        with PROFILER.stage("decode"):
+            frame = cv2.imread(frame_path)
 
         if frame is None:
             print(f"Error loading frame: {frame_file}")
             continue
 
         output_path = os.path.join(output_folder, frame_file)
-        cv2.imwrite(output_path, frame)  # Save synced & downsampled frame
-
-        print(f"Saved synced frame: {output_path}")
-
-# Process Nick1 & Saanvi1 frames
-sync_and_downsample_frames(frame_folder_n1, synced_n1, START_FRAME_N1, END_FRAME_N1, DOWNSAMPLE_RATE)
-sync_and_downsample_frames(frame_folder_s1, synced_s1, START_FRAME_S1, END_FRAME_S1, DOWNSAMPLE_RATE)
-
-print(f"✅ Synced & downsampled frames saved in {output_folder}")
+        with PROFILER.stage("write"):
+            cv2.imwrite(output_path, frame)  # Save synced & downsampled frame
+        saved += 1
+
+    print(f"Saved {saved} synced frames in {output_folder}")
+
+if __name__ == "__main__":
+    # Paths
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    frame_folder_n1 = os.path.join(current_dir, "frames_nick_one")
+    frame_folder_s1 = os.path.join(current_dir, "frames_saanvi_one")
+    output_folder = os.path.join(current_dir, "frames_synced")
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Output directories for synced frames
+    synced_n1 = os.path.join(output_folder, "frames_nick_one_synced")
+    synced_s1 = os.path.join(output_folder, "frames_saanvi_one_synced")
+    if STORE_FRAMES:
+        frame_folder_n1, frame_folder_s1 = frame_folder_n1 + FRAME_STORE_EXT, frame_folder_s1 + FRAME_STORE_EXT
+        synced_n1, synced_s1 = synced_n1 + FRAME_STORE_EXT, synced_s1 + FRAME_STORE_EXT
+
+    # Clear output directories
+    clear_folder(synced_n1)
+    clear_folder(synced_s1)
+
+    # Process Nick1 & Saanvi1 frames
+    if SYNC_FROM_VIDEO:
+        video_folder = os.path.join(current_dir, "videos")
+        video_n1 = os.path.join(video_folder, "flight1_nickphone.mp4")
+        video_s1 = os.path.join(video_folder, "flight1_saanviphone.MOV")
+
+        start_s1, end_s1, rate_s1 = START_FRAME_S1, END_FRAME_S1, DOWNSAMPLE_RATE
+        if AUTO_SYNC:
+            synced = auto_sync(video_n1, video_s1, START_FRAME_N1, END_FRAME_N1, DOWNSAMPLE_RATE)
+            if synced is not None:
+                start_s1, end_s1, rate_s1, _ = synced
+
+        sync_and_downsample_video(video_n1, synced_n1, START_FRAME_N1, END_FRAME_N1, DOWNSAMPLE_RATE)
+        sync_and_downsample_video(video_s1, synced_s1, start_s1, end_s1, rate_s1)
+    else:
+        sync_and_downsample_frames(frame_folder_n1, synced_n1, START_FRAME_N1, END_FRAME_N1, DOWNSAMPLE_RATE)
+        sync_and_downsample_frames(frame_folder_s1, synced_s1, START_FRAME_S1, END_FRAME_S1, DOWNSAMPLE_RATE)
+
+    print(f"✅ Synced & downsampled frames saved in {output_folder}")
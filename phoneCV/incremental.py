@@ -0,0 +1,266 @@
+import cv2
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from backgrounds import create_background_model
+from blobfinder import find_blobs
+from framesync import (DOWNSAMPLE_RATE, END_FRAME_N1, END_FRAME_S1, START_FRAME_N1, START_FRAME_S1,
+                       iter_synced_video_frames)
+from MOG2_main import find_largest_contour, merge_detections
+from pyramid import downscale, upscale_blobs, upscale_ellipse
+
+# Incremental, resumable version of the video -> framesync -> MOG2 -> detection pipeline.
+# Nothing gets wiped: every stage writes its output to cache/<stage>/<key>/ where key is a hash of the
+# stage's input (the video's content fingerprint, or the key of the stage before it) and its parameters.
+# Change varThreshold and only subtract + detect run again (off the cached synced frames, no decoding);
+# change min_area and only detect runs (off the cached masks). Outputs are written in chunks of
+# CHUNK_SIZE synced frames, each one atomically, so a run that gets killed picks up at the first
+# missing chunk next time.
+#
+# Stages: sync   (video, start/end/rate)            -> synced frames
+#         subtract (sync, MOG2 settings)           -> foreground masks (bit-packed)
+#         detect (subtract, min_area/multi_target) -> blob arrays
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+CHUNK_SIZE = 50  # Synced frames per chunk file
+
+def fingerprint_file(path, samples=16, block_size=1 << 20):
+    """Content hash of a (big) file from its size plus `samples` evenly spaced 1 MB blocks."""
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        for i in range(samples):
+            f.seek(max(0, (size - block_size) * i // max(samples - 1, 1)))
+            digest.update(f.read(block_size))
+    return digest.hexdigest()
+
+def stage_key(stage, upstream, params):
+    """Cache key of a stage: hash of its name, its input's key/fingerprint and its parameters."""
+    blob = json.dumps({"stage": stage, "upstream": upstream, "params": params}, sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+class StageCache:
+    """One stage's chunked output folder: cache_root/stage/key/chunk_000000.npz ... plus a done.json."""
+
+    def __init__(self, cache_root, stage, key, params):
+        self.stage = stage
+        self.key = key
+        self.params = params
+        self.folder = os.path.join(cache_root, stage, key)
+        os.makedirs(self.folder, exist_ok=True)
+        params_path = os.path.join(self.folder, "params.json")
+        if not os.path.exists(params_path):
+            with open(params_path, "w") as f:
+                json.dump(params, f, indent=2, sort_keys=True)  # So a human can tell the cache folders apart
+
+    def chunk_path(self, chunk):
+        return os.path.join(self.folder, f"chunk_{chunk:06d}.npz")
+
+    def has_chunk(self, chunk):
+        return os.path.exists(self.chunk_path(chunk))
+
+    def save_chunk(self, chunk, **arrays):
+        """Writes a chunk atomically (temp file + rename) so a crash never leaves half a chunk behind."""
+        temp_path = os.path.join(self.folder, f"chunk_{chunk:06d}.tmp.npz")
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, self.chunk_path(chunk))
+
+    def load_chunk(self, chunk):
+        with np.load(self.chunk_path(chunk)) as data:
+            return {name: data[name] for name in data.files}
+
+    def is_done(self):
+        return os.path.exists(os.path.join(self.folder, "done.json"))
+
+    def num_chunks(self):
+        with open(os.path.join(self.folder, "done.json")) as f:
+            return json.load(f)["num_chunks"]
+
+    def mark_done(self, num_chunks):
+        with open(os.path.join(self.folder, "done.json"), "w") as f:
+            json.dump({"num_chunks": num_chunks}, f)
+
+    def iter_chunks(self):
+        for chunk in range(self.num_chunks()):
+            yield self.load_chunk(chunk)
+
+def _chunks(items, chunk_size):
+    """Groups an iterator into lists of chunk_size."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_sync_stage(video_path, start_frame, end_frame, downsample_rate, cache_root=CACHE_DIR,
+                   chunk_size=CHUNK_SIZE):
+    """Synced, downsampled frames of a video, cached in chunks. Returns the StageCache."""
+    params = {"start": start_frame, "end": end_frame, "rate": downsample_rate, "chunk_size": chunk_size}
+    cache = StageCache(cache_root, "sync", stage_key("sync", fingerprint_file(video_path), params), params)
+    if cache.is_done():
+        return cache
+
+    # Resume at the first chunk that isn't there yet (seeking straight to its first frame)
+    first = 0
+    while cache.has_chunk(first):
+        first += 1
+    resume_frame = start_frame + first * chunk_size * downsample_rate
+
+    chunk = first
+    frames = iter_synced_video_frames(video_path, resume_frame, end_frame, downsample_rate)
+    for items in _chunks(frames, chunk_size):
+        frame_idx, timestamps, images = zip(*items)
+        cache.save_chunk(chunk, frame_idx=np.array(frame_idx), timestamps=np.array(timestamps),
+                         frames=np.stack(images))
+        chunk += 1
+    cache.mark_done(chunk)
+    return cache
+
+def _subtractor(params):
+    return create_background_model(params["background"], params["history"], params["var_threshold"])
+
+def run_subtract_stage(sync_cache, history=500, var_threshold=50, process_scale=1.0, background="mog2",
+                       cache_root=CACHE_DIR):
+    """Foreground masks (MOG2 or another backgrounds.py model) for every cached synced frame, bit-packed
+    per chunk. var_threshold is the model's threshold. Returns the StageCache.
+
+    MOG2's model can't be saved, so resuming mid-way re-learns it by feeding it the `history` frames
+    before the first missing chunk (only as many chunks as that takes get loaded).
+    """
+    params = {"history": history, "var_threshold": var_threshold, "process_scale": process_scale,
+              "background": background}
+    cache = StageCache(cache_root, "subtract", stage_key("subtract", sync_cache.key, params), params)
+    if cache.is_done():
+        return cache
+
+    num_chunks = sync_cache.num_chunks()
+    first = 0
+    while first < num_chunks and cache.has_chunk(first):
+        first += 1
+
+    fgbg = _subtractor(params)
+    chunk_size = len(sync_cache.load_chunk(0)["frame_idx"]) if num_chunks else 1
+    warmup_from = max(0, first - -(-history // chunk_size))
+    for chunk in range(warmup_from, first):
+        for frame in sync_cache.load_chunk(chunk)["frames"]:
+            fgbg.apply(downscale(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), process_scale))
+
+    for chunk in range(first, num_chunks):
+        synced = sync_cache.load_chunk(chunk)
+        # copy(): the cheaper backgrounds.py models hand back the same mask buffer every frame
+        masks = [fgbg.apply(downscale(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), process_scale)).copy()
+                 for frame in synced["frames"]]
+        masks = np.stack(masks)
+        cache.save_chunk(chunk, frame_idx=synced["frame_idx"], timestamps=synced["timestamps"],
+                         masks=np.packbits(masks > 0, axis=-1), width=masks.shape[-1])
+    cache.mark_done(num_chunks)
+    return cache
+
+def run_detect_stage(subtract_cache, min_area=100, multi_target=False, cache_root=CACHE_DIR):
+    """Blobs (full-resolution pixels) for every cached mask. Returns the StageCache.
+
+    Each chunk holds frame_idx, timestamps, counts (blobs per frame), blobs (all of them stacked) and
+    ellipses ((N, 5) cx, cy, major, minor, angle, NaN where there is none).
+    """
+    params = {"min_area": min_area, "multi_target": multi_target}
+    cache = StageCache(cache_root, "detect", stage_key("detect", subtract_cache.key, params), params)
+    if cache.is_done():
+        return cache
+
+    process_scale = subtract_cache.params["process_scale"]
+    num_chunks = subtract_cache.num_chunks()
+    for chunk in range(num_chunks):
+        if cache.has_chunk(chunk):
+            continue
+        subtracted = subtract_cache.load_chunk(chunk)
+        masks = np.unpackbits(subtracted["masks"], axis=-1, count=int(subtracted["width"])) * np.uint8(255)
+
+        counts, all_blobs, all_ellipses = [], [], []
+        for mask in masks:
+            if multi_target:
+                blobs = find_blobs(mask, min_area * process_scale ** 2)
+                ellipses = [None] * len(blobs)
+            else:
+                blobs, ellipses = find_largest_contour(mask, min_area * process_scale ** 2)
+            blobs = upscale_blobs(blobs, process_scale)
+            counts.append(len(blobs))
+            all_blobs.append(blobs)
+            for ellipse in ellipses:
+                ellipse = upscale_ellipse(ellipse, process_scale)
+                all_ellipses.append(np.full(5, np.nan) if ellipse is None else
+                                    np.array([*ellipse[0], *ellipse[1], ellipse[2]]))
+
+        cache.save_chunk(chunk, frame_idx=subtracted["frame_idx"], timestamps=subtracted["timestamps"],
+                         counts=np.array(counts), blobs=np.concatenate(all_blobs),
+                         ellipses=np.array(all_ellipses).reshape(-1, 5))
+    cache.mark_done(num_chunks)
+    return cache
+
+def load_detections(detect_cache):
+    """Cached detections in the usual [(frame_idx, timestamp, blobs, ellipses), ...] layout."""
+    detections = []
+    for chunk in detect_cache.iter_chunks():
+        splits = np.cumsum(chunk["counts"])[:-1]
+        for frame_idx, timestamp, blobs, ellipses in zip(chunk["frame_idx"], chunk["timestamps"],
+                                                         np.split(chunk["blobs"], splits),
+                                                         np.split(chunk["ellipses"], splits)):
+            ellipses = [None if np.isnan(e[0]) else ((float(e[0]), float(e[1])), (float(e[2]), float(e[3])),
+                                                     float(e[4])) for e in ellipses]
+            detections.append((int(frame_idx), float(timestamp), blobs, ellipses))
+    return detections
+
+def run_camera(camera, downsample_rate=DOWNSAMPLE_RATE, cache_root=CACHE_DIR, **params):
+    """Runs sync -> subtract -> detect for one datasets entry ("video", "start", "end"), reusing the cache.
+
+    params: history, var_threshold, process_scale, background (subtract) and min_area, multi_target (detect),
+    falling back to the camera entry and then the stage defaults. Returns the detections.
+    """
+    settings = {**camera, **params}
+    subtract_params = {name: settings[name] for name in ("history", "var_threshold", "process_scale", "background")
+                       if name in settings}
+    detect_params = {name: settings[name] for name in ("min_area", "multi_target") if name in settings}
+
+    timings = {}
+    start = time.perf_counter()
+    sync_cache = run_sync_stage(camera["video"], camera["start"], camera["end"], downsample_rate, cache_root)
+    timings["sync"] = time.perf_counter() - start
+    subtract_cache = run_subtract_stage(sync_cache, cache_root=cache_root, **subtract_params)
+    timings["subtract"] = time.perf_counter() - start - timings["sync"]
+    detect_cache = run_detect_stage(subtract_cache, cache_root=cache_root, **detect_params)
+    timings["detect"] = time.perf_counter() - start - timings["sync"] - timings["subtract"]
+
+    print("  ".join(f"{stage} {seconds:.2f}s ({cache.key})" for (stage, seconds), cache
+                    in zip(timings.items(), (sync_cache, subtract_cache, detect_cache))))
+    return load_detections(detect_cache)
+
+def run_cameras(datasets, downsample_rate=DOWNSAMPLE_RATE, cache_root=CACHE_DIR, **params):
+    """run_camera over every dataset, merged by synced frame index like MOG2_main.track_cameras."""
+    camera_detections = {}
+    for name, camera in datasets.items():
+        print(f"🚀 {name}")
+        camera_detections[name] = run_camera(camera, downsample_rate, cache_root, **params)
+    camera_starts = {name: camera["start"] for name, camera in datasets.items()}
+    return merge_detections(camera_detections, camera_starts, downsample_rate)
+
+# ========= MAIN EXECUTION =========
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    video_folder = os.path.join(current_dir, "videos")
+
+    datasets = {
+        "saanvi": {"video": os.path.join(video_folder, "flight1_saanviphone.MOV"),
+                   "start": START_FRAME_S1, "end": END_FRAME_S1},
+        "nick": {"video": os.path.join(video_folder, "flight1_nickphone.mp4"),
+                 "start": START_FRAME_N1, "end": END_FRAME_N1},
+    }
+
+    # Tweak these and rerun: only the stages downstream of what changed get recomputed
+    synced_detections = run_cameras(datasets, history=500, var_threshold=50, min_area=100)
+    print(f"✅ {len(synced_detections)} synced frames with detections from {len(datasets)} cameras")
@@ -0,0 +1,24 @@
+import importlib.util
+import sys
+
+# Deferred imports for start-up time. cv2 + numpy are ~0.15 s and scipy another ~0.3 s before a script
+# does anything, which every `--help` and every spawned worker process pays for even when it never
+# touches them. lazy_import gives back the module object straight away and only runs the real import
+# the first time one of its attributes gets used (importlib's LazyLoader), so a module can keep its
+# imports at the top and a process only pays for the parts it actually runs.
+# Only works for top-level modules: finding a submodule (scipy.optimize) imports its package already,
+# so optional heavy submodules get imported inside the function that needs them instead (multitracker).
+
+def lazy_import(name):
+    """Module `name`, imported on first attribute access. ModuleNotFoundError straight away if it isn't installed."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # A plain `import name` anywhere else gets the same (lazy) module
+    loader.exec_module(module)
+    return module
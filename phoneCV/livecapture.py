@@ -0,0 +1,172 @@
+import cv2
+import os
+import threading
+import time
+
+import numpy as np
+
+from MOG2_main import iter_track_frames
+
+# Live mode: MOG2 + detection straight off cameras instead of frame folders.
+# Every camera gets a capture thread that does nothing but read frames into a one-slot, latest-frame-wins
+# buffer. The detection stage always takes the newest frame, so when it's slower than the camera the
+# stale frames get dropped (and counted) instead of piling up in a queue, and latency stays bounded to
+# about one frame of processing. Every detection carries its end-to-end latency (frame captured ->
+# detections ready). Sources can be a device index (0, 1...), an RTSP/HTTP url or a video file, which
+# gets played back at its own fps so it behaves like a camera.
+
+class LatestFrame:
+    """One-slot buffer between a capture thread and a consumer. put() overwrites, get() waits for a new frame."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = None
+        self.closed = False
+
+    def put(self, item):
+        with self.condition:
+            self.item = item  # Whatever the consumer hasn't picked up yet is stale now
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """Newest frame not handed out yet, or None once the source is closed and drained (or on timeout)."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.item is not None or self.closed, timeout)
+            item, self.item = self.item, None
+            return item
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+class CameraReader(threading.Thread):
+    """Capture thread for one source: reads frames into a LatestFrame as (frame_idx, capture_time, frame).
+
+    capture_time is time.perf_counter() when the frame came off the camera. Files get paced to their fps
+    (realtime=False reads them as fast as possible, which will drop most frames).
+    """
+
+    def __init__(self, source, realtime=True):
+        super().__init__(daemon=True)
+        self.source = source
+        self.is_file = isinstance(source, str) and os.path.exists(source)
+        self.realtime = realtime
+        self.frames = LatestFrame()
+        self.captured = 0
+        self.stopping = threading.Event()
+
+    def run(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            print(f"Error: Could not open {self.source}")
+            self.frames.close()
+            return
+
+        if not self.is_file:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Don't let the driver queue up stale frames either
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        start = time.perf_counter()
+        try:
+            while not self.stopping.is_set():
+                if self.is_file and self.realtime:
+                    delay = start + self.captured / fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self.frames.put((self.captured, time.perf_counter(), frame))
+                self.captured += 1
+        finally:
+            cap.release()
+            self.frames.close()
+
+    def stop(self):
+        self.stopping.set()
+
+def iter_live_frames(reader):
+    """Yields (frame_idx, timestamp, frame) from a running CameraReader, newest frame first, skipping stale ones.
+
+    timestamp is the capture time in perf_counter seconds, so latency = time.perf_counter() - timestamp.
+    """
+    while True:
+        item = reader.frames.get()
+        if item is None:
+            return
+        yield item
+
+def live_track(source, realtime=True, **kwargs):
+    """Generator: tracks a live source, yielding (frame_idx, timestamp, blobs, ellipses, latency) per processed frame.
+
+    frame_idx is the camera's own frame counter, so gaps are dropped frames. latency is seconds from
+    capture to detections ready. kwargs go to MOG2_main.iter_track_frames (multi_target, process_scale...).
+    """
+    reader = CameraReader(source, realtime)
+    reader.start()
+    try:
+        for frame_idx, timestamp, blobs, ellipses in iter_track_frames(iter_live_frames(reader), **kwargs):
+            yield frame_idx, timestamp, blobs, ellipses, time.perf_counter() - timestamp
+    finally:
+        reader.stop()
+        reader.join()
+
+def track_live_camera(name, source, on_detection, stats, realtime=True, **kwargs):
+    """Worker thread body: live_track one camera, hand every result to on_detection(name, result)."""
+    latencies = []
+    processed, captured = 0, 0
+    for result in live_track(source, realtime, **kwargs):
+        on_detection(name, result)
+        latencies.append(result[4])
+        processed += 1
+        captured = result[0] + 1
+    stats[name] = {"processed": processed, "dropped": captured - processed, "latencies": np.array(latencies)}
+
+def track_live_cameras(sources, on_detection, realtime=True, **kwargs):
+    """Runs live_track on every {name: source} at once (one capture + one detection thread each).
+
+    Blocks until every source ends (files) or a KeyboardInterrupt, then returns per-camera stats:
+    {name: {"processed": frames, "dropped": frames, "latencies": array of seconds}}. OpenCV releases
+    the GIL while it works, so the cameras really do run side by side.
+    """
+    stats = {}
+    threads = [threading.Thread(target=track_live_camera, args=(name, source, on_detection, stats, realtime),
+                                kwargs=kwargs, daemon=True) for name, source in sources.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+def print_latency_report(stats):
+    """Frames processed / dropped and latency percentiles per camera."""
+    for name, camera in stats.items():
+        latencies = 1000 * camera["latencies"]
+        if len(latencies) == 0:
+            print(f"{name}: no frames processed")
+            continue
+        p50, p95, worst = np.percentile(latencies, [50, 95, 100])
+        print(f"{name}: {camera['processed']} frames ({camera['dropped']} dropped), "
+              f"latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {worst:.1f} ms")
+
+if __name__ == "__main__":
+    # Device indices for USB / continuity cameras, or RTSP urls from a phone camera app
+    # (e.g. "rtsp://192.168.1.20:8554/live"). A video file works as a stand-in.
+    sources = {
+        "nick": 0,
+        "saanvi": 1,
+    }
+
+    def print_detection(name, result):
+        frame_idx, _, blobs, _, latency = result
+        if len(blobs):
+            cx, cy = blobs[0, 5:7]
+            print(f"{name} frame {frame_idx}: {len(blobs)} drone(s), first at ({cx:.0f}, {cy:.0f}), "
+                  f"{1000 * latency:.1f} ms")
+
+    print(f"\n🚀 Live tracking {len(sources)} cameras (Ctrl+C to stop)...")
+    try:
+        print_latency_report(track_live_cameras(sources, print_detection, multi_target=True))
+    except KeyboardInterrupt:
+        print("Stopped")
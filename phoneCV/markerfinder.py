@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+
+from blobfinder import find_blobs
+
+# Shared colour-marker detector (the red balls in ballfinder / cvmark1).
+# The hue test is a precomputed 256-entry lookup table, so red's wrap-around (0-10 and 170-180) is a
+# single cv2.LUT pass instead of two inRange passes added together (which could also overflow uint8).
+# Saturation/value are one inRange, blobs come from connected-component stats (blobfinder), and every
+# intermediate image goes into buffers that are allocated once and reused for every frame.
+#
+# Two things were tried and dropped: a full 24-bit BGR -> mask table (the NumPy index build + gather
+# over a 16 MB table came out ~1.5x slower than cvtColor + the hue LUT), and running the colour stage
+# over a whole batch stacked into one tall image (slower than frame by frame, it falls out of cache).
+
+RED_HUE_RANGES = ((0, 10), (170, 180))  # OpenCV hue is 0-180
+RED_SAT_RANGE = (120, 255)
+RED_VAL_RANGE = (70, 255)
+
+def build_hue_lut(hue_ranges):
+    """256-entry table that is 255 for every hue inside any of the (low, high) ranges, inclusive."""
+    hues = np.arange(256)
+    inside = np.zeros(256, dtype=bool)
+    for low, high in hue_ranges:
+        inside |= (hues >= low) & (hues <= high)
+    return np.where(inside, 255, 0).astype(np.uint8)
+
+class MarkerDetector:
+    """Finds coloured markers: HSV hue LUT + S/V range, optional open/close, connected-component stats.
+
+    morph_kernel is the open/close kernel size (None to skip, like ballfinder used to).
+    Keeps its own scratch buffers, so use one detector per thread.
+    """
+
+    def __init__(self, hue_ranges=RED_HUE_RANGES, sat_range=RED_SAT_RANGE, val_range=RED_VAL_RANGE,
+                 min_area=100, morph_kernel=5):
+        self.hue_lut = build_hue_lut(hue_ranges)
+        self.lower = (0, sat_range[0], val_range[0])
+        self.upper = (255, sat_range[1], val_range[1])
+        self.min_area = min_area
+        self.kernel = np.ones((morph_kernel, morph_kernel), np.uint8) if morph_kernel else None
+        self.buffer_shape = None
+
+    def _buffers(self, shape):
+        """(Re)allocates the scratch images when the frame size changes."""
+        if shape != self.buffer_shape:
+            self.hsv = np.empty(shape, np.uint8)
+            self.sv_mask = np.empty(shape[:2], np.uint8)
+            self.hue = np.empty(shape[:2], np.uint8)
+            self.hue_mask = np.empty(shape[:2], np.uint8)
+            self.buffer_shape = shape
+
+    def color_mask(self, frame):
+        """Raw colour mask of a BGR frame. Returns an internal buffer that the next call overwrites."""
+        self._buffers(frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=self.hsv)
+        cv2.inRange(self.hsv, self.lower, self.upper, dst=self.sv_mask)
+        cv2.extractChannel(self.hsv, 0, dst=self.hue)
+        cv2.LUT(self.hue, self.hue_lut, dst=self.hue_mask)
+        return cv2.bitwise_and(self.sv_mask, self.hue_mask, dst=self.sv_mask)
+
+    def clean(self, mask):
+        """Morphological open + close to drop specks and fill holes (in place)."""
+        if self.kernel is not None:
+            cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel, dst=mask)
+            cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel, dst=mask)
+        return mask
+
+    def mask(self, frame):
+        """Cleaned-up marker mask for one frame (a copy the caller can keep)."""
+        return self.clean(self.color_mask(frame)).copy()
+
+    def detect(self, frame):
+        """Markers in one frame as an (N, 7) blob array (x, y, w, h, area, cx, cy)."""
+        return find_blobs(self.clean(self.color_mask(frame)), self.min_area)
+
+    def detect_batch(self, frames):
+        """Markers in a stack of frames ((N, H, W, 3) array or list). Returns a list of blob arrays."""
+        return [self.detect(frame) for frame in frames]
+
+# Default red ball detector shared by ballfinder.py and cvmark1.py
+RED_MARKERS = MarkerDetector()
@@ -2,9 +2,14 @@ import cv2
 import os
 import screeninfo
 
+from framestore import FRAME_STORE_EXT
+from videoslicer import STORE_FRAMES, frame_filename, iter_frames
+
 # Paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
 frame_folder = os.path.join(current_dir, "frames_synced", "frames_saanvi_one_synced")
+if STORE_FRAMES:
+    frame_folder += FRAME_STORE_EXT
 
 # New output directory for processed frames
 output_folder = os.path.join(current_dir, "mog2_processed", "frames_saanvi_one_processed")
@@ -13,17 +18,7 @@ os.makedirs(output_folder, exist_ok=True)  # Ensure the output folder exists
 # Initialize background subtractor (MOG2)
 fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
 
-# Load frames
-frame_files = sorted(os.listdir(frame_folder))
-
-for frame_file in frame_files:
-    frame_path = os.path.join(frame_folder, frame_file)
-    frame = cv2.imread(frame_path)
-
-    if frame is None:
-        print(f"Error loading frame: {frame_file}")
-        continue
-
+for frame_idx, timestamp, frame in iter_frames(frame_folder):
     # Get screen width & height
     screen = screeninfo.get_monitors()[0]
     screen_width, screen_height = screen.width, screen.height
@@ -57,7 +52,7 @@ for frame_file in frame_files:
                 cv2.ellipse(frame, ellipse, (255, 0, 0), 2)
 
     # Save processed frame to output folder
-    output_path = os.path.join(output_folder, frame_file)
+    output_path = os.path.join(output_folder, frame_filename(frame_idx, timestamp))
     cv2.imwrite(output_path, frame)
 
     # Show results
@@ -2,32 +2,37 @@ import cv2
 import os
 import screeninfo
 
+from framestore import FRAME_STORE_EXT
+from videoslicer import STORE_FRAMES, iter_frames
+
 # Paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
 frame_folder = os.path.join(current_dir, "frames_synced", "frames_saanvi_one_synced")
+if STORE_FRAMES:
+    frame_folder += FRAME_STORE_EXT
 
 # Initialize background subtractor
 fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
 
 # Load frames
-frame_files = sorted(os.listdir(frame_folder))
-first_frame = os.path.join(frame_folder, frame_files[0])
-frame = cv2.imread(first_frame)
+frames = iter_frames(frame_folder)
+_, _, frame = next(frames, (None, None, None))
 
 if frame is None:
-    print(f"Error loading first frame: {first_frame}")
+    print(f"Error loading first frame: {frame_folder}")
     exit()
 
 # Get screen width & height
 screen = screeninfo.get_monitors()[0]
 screen_width, screen_height = screen.width, screen.height
 
-# Resize the frame if it's too large
+# Resize the frame if it's too large (every later frame gets the same scale, the tracker needs that)
+scale = 1.0
 if frame.shape[1] > screen_width or frame.shape[0] > screen_height:
     scale_x = screen_width / frame.shape[1]
     scale_y = screen_height / frame.shape[0]
     scale = min(scale_x, scale_y) * 0.9  # Scale down slightly to fit
-    frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)    
+    frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
 
 # Convert to grayscale and apply motion detection
 fgmask = fgbg.apply(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
@@ -49,13 +54,10 @@ tracker = cv2.legacy.TrackerCSRT_create()
 tracker.init(frame, bbox)
 
 # Process frames
-for frame_file in frame_files[1:]:  # Skip first frame
-    frame_path = os.path.join(frame_folder, frame_file)
-    frame = cv2.imread(frame_path)
-
-    if frame is None:
-        print(f"Error loading frame: {frame_file}")
-        continue
+for frame_idx, timestamp, frame in frames:  # First frame already used above
+    # Same scale the tracker was initialized at
+    if scale != 1.0:
+        frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
 
     # Apply motion detection
     fgmask = fgbg.apply(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+
+# Motion gate: most of a flight is the drone sitting on the pad or hovering, and MOG2_main still ran
+# resize + cvtColor + MOG2 + contours + imwrite on every one of those frames. The gate shrinks each frame
+# to a thumbnail (INTER_AREA, which also averages the camera noise away), counts the thumbnail pixels
+# that changed by more than pixel_threshold since the last frame that got processed, and only lets the
+# frame through to the heavy stages when enough of them did. Comparing against the last *processed*
+# frame means slow drift still adds up until it trips the gate. Once something moves, the next `hold`
+# frames all go through too (so a drone that pauses for a moment keeps full rate), and while idle every
+# idle_every-th frame still goes through so the background model keeps up with lighting changes.
+# Skipped frames reuse the last processed frame's detections: nothing moved, so they're still right.
+
+class MotionGate:
+    """Decides per frame whether it needs full processing. Keeps frames / processed / skipped counts.
+
+    thumb_width: thumbnail width in px (height keeps the aspect ratio).
+    pixel_threshold: gray levels a thumbnail pixel has to change by to count as changed.
+    min_changed: changed thumbnail pixels needed to call it motion (a small drone is only a few of them).
+    hold: frames to stay at full rate after the last motion.
+    idle_every: while idle, still process one frame in this many (0 = never).
+    """
+
+    def __init__(self, thumb_width=160, pixel_threshold=10, min_changed=2, hold=5, idle_every=10):
+        self.thumb_width = thumb_width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.hold = hold
+        self.idle_every = idle_every
+        self.shape = None
+        self.frames = self.processed = 0
+
+    @property
+    def skipped(self):
+        return self.frames - self.processed
+
+    def _allocate(self, frame):
+        self.shape = frame.shape
+        height, width = frame.shape[:2]
+        self.size = (self.thumb_width, max(1, round(height * self.thumb_width / width)))
+        self.small = np.empty((self.size[1], self.size[0]) + frame.shape[2:], np.uint8)
+        self.thumb = np.empty(self.size[::-1], np.uint8)
+        self.reference = None
+        self.diff = np.empty_like(self.thumb)
+        self.changed = np.empty_like(self.thumb)
+        self.since_motion = self.since_processed = 0
+
+    def score(self, frame):
+        """Changed thumbnail pixels since the last processed frame (None for the first frame)."""
+        if frame.shape != self.shape:
+            self._allocate(frame)
+        cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        if self.small.ndim == 3:
+            cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.thumb)
+        else:
+            np.copyto(self.thumb, self.small)
+        if self.reference is None:
+            return None
+        cv2.absdiff(self.thumb, self.reference, dst=self.diff)
+        cv2.compare(self.diff, self.pixel_threshold, cv2.CMP_GT, dst=self.changed)
+        return cv2.countNonZero(self.changed)
+
+    def should_process(self, frame):
+        """True if the frame (BGR or gray, any size) should get the full pipeline."""
+        score = self.score(frame)
+        self.frames += 1
+
+        if score is None or score >= self.min_changed:
+            self.since_motion = 0
+        else:
+            self.since_motion += 1
+        self.since_processed += 1
+
+        process = (self.since_motion <= self.hold
+                   or (self.idle_every and self.since_processed >= self.idle_every))
+        if process:
+            self.processed += 1
+            self.since_processed = 0
+            if self.reference is None:
+                self.reference = np.empty_like(self.thumb)
+            np.copyto(self.reference, self.thumb)
+        return process
+
+    def summary(self):
+        return f"{self.skipped}/{self.frames} static frames skipped ({100 * self.skipped / max(self.frames, 1):.0f}%)"
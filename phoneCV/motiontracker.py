@@ -1,28 +1,24 @@
 import cv2
 import os
 
+from framesource import FrameSource
+from framestore import FRAME_STORE_EXT
+from videoslicer import STORE_FRAMES
+
 # Paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
 frame_folder = os.path.join(current_dir, "frames_synced", "frames_saanvi_one_synced")
+if STORE_FRAMES:
+    frame_folder += FRAME_STORE_EXT
 
 # Create Background Subtractor
 fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=50, detectShadows=False)
 
-frame_files = sorted(os.listdir(frame_folder))  # Sorted list of frames
-
-for frame_file in frame_files:
-    frame_path = os.path.join(frame_folder, frame_file)
-    frame = cv2.imread(frame_path)
-
-    if frame is None:
-        print(f"Error loading frame: {frame_file}")
-        continue
-
-    # Convert to grayscale
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # Apply background subtraction
-    fgmask = fgbg.apply(gray)
+# Frames get decoded + converted to grayscale on a worker thread, into reused buffers
+fgmask = None
+for frame_idx, timestamp, frame, gray in FrameSource(frame_folder).iter_gray():
+    # Apply background subtraction (into the same mask every frame)
+    fgmask = fgbg.apply(gray, fgmask)
 
     # Show results
     cv2.imshow("Motion Mask", fgmask)
@@ -0,0 +1,165 @@
+from functools import cache
+
+import numpy as np
+
+# Multi-object tracker that keeps drone identities across frames on top of the MOG2 / blobfinder
+# detections. Every track is a constant-velocity Kalman filter over (cx, cy, vx, vy) in pixels per
+# processed frame. All tracks live in stacked arrays, so predict/update are a handful of NumPy ops
+# no matter how many drones there are, and association is one assignment solve over a gated
+# distance matrix.
+
+# Column layout of the track arrays returned by MultiTracker.update
+TRACK_COLUMNS = ("track_id", "cx", "cy", "vx", "vy", "detection")
+
+class MultiTracker:
+    """Kalman + gated assignment multi-object tracker with track birth and death.
+
+    gate: max distance (px) between a predicted track and a detection for them to be matched.
+    min_hits: matched frames before a track is reported (filters one-frame noise blobs).
+    max_misses: frames a track can go unmatched (coasting on its prediction) before it's dropped.
+    """
+
+    def __init__(self, gate=50.0, min_hits=3, max_misses=5, process_noise=1.0, measurement_noise=2.0,
+                 initial_velocity_var=100.0):
+        self.gate = gate
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.measurement_var = measurement_noise ** 2
+        self.initial_velocity_var = initial_velocity_var
+
+        # Constant velocity model, dt = 1 processed frame
+        self.F = np.array([[1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float64)
+        q = process_noise ** 2
+        self.Q = q * np.array([[0.25, 0, 0.5, 0], [0, 0.25, 0, 0.5], [0.5, 0, 1, 0], [0, 0.5, 0, 1]])
+
+        self.next_id = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.x = np.empty((0, 4))         # State per track
+        self.P = np.empty((0, 4, 4))      # Covariance per track
+        self.hits = np.empty(0, dtype=np.int64)
+        self.misses = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def predict(self):
+        """Moves every track one frame forward."""
+        self.x = self.x @ self.F.T
+        self.P = self.F @ self.P @ self.F.T + self.Q
+
+    def associate(self, centroids):
+        """Matches predicted tracks to detections. Returns (track_rows, detection_rows) arrays."""
+        if len(self.ids) == 0 or len(centroids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        diff = self.x[:, None, :2] - centroids[None, :, :]
+        cost = np.sqrt(np.einsum("tdk,tdk->td", diff, diff))
+        return gated_assignment(cost, cost <= self.gate)
+
+    def update(self, centroids):
+        """Runs one frame: predict, associate, Kalman update, birth and death.
+
+        centroids is an (N, 2) array of detection centers (e.g. blobs[:, 5:7]). Returns an (M, 6) array
+        of confirmed tracks: track_id, cx, cy, vx, vy and the detection row they matched (-1 if coasting).
+        """
+        centroids = np.asarray(centroids, dtype=np.float64).reshape(-1, 2)
+        self.predict()
+        track_rows, det_rows = self.associate(centroids)
+
+        # Kalman update for the matched tracks, H = [I 0]
+        matched_det = np.full(len(self.ids), -1, dtype=np.int64)
+        if len(track_rows):
+            P = self.P[track_rows]
+            S = P[:, :2, :2] + self.measurement_var * np.eye(2)
+            K = P[:, :, :2] @ np.linalg.inv(S)
+            innovation = centroids[det_rows] - self.x[track_rows, :2]
+            self.x[track_rows] += np.einsum("tij,tj->ti", K, innovation)
+            self.P[track_rows] = P - K @ P[:, :2, :]
+            matched_det[track_rows] = det_rows
+
+        matched = matched_det >= 0
+        self.hits[matched] += 1
+        self.misses[matched] = 0
+        self.misses[~matched] += 1
+
+        # Track death
+        alive = self.misses <= self.max_misses
+        if not alive.all():
+            self.ids, self.x, self.P = self.ids[alive], self.x[alive], self.P[alive]
+            self.hits, self.misses, matched_det = self.hits[alive], self.misses[alive], matched_det[alive]
+
+        # Track birth from every detection nobody claimed
+        unclaimed = np.ones(len(centroids), dtype=bool)
+        unclaimed[det_rows] = False
+        self._birth(centroids[unclaimed])
+        matched_det = np.concatenate([matched_det, np.flatnonzero(unclaimed)])
+
+        confirmed = self.hits >= self.min_hits
+        tracks = np.empty((np.count_nonzero(confirmed), len(TRACK_COLUMNS)))
+        tracks[:, 0] = self.ids[confirmed]
+        tracks[:, 1:5] = self.x[confirmed]
+        tracks[:, 5] = matched_det[confirmed]
+        return tracks
+
+    def _birth(self, centroids):
+        n = len(centroids)
+        if n == 0:
+            return
+
+        x = np.zeros((n, 4))
+        x[:, :2] = centroids
+        P = np.zeros((n, 4, 4))
+        P[:, [0, 1], [0, 1]] = self.measurement_var
+        P[:, [2, 3], [2, 3]] = self.initial_velocity_var
+
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+        self.next_id += n
+        self.x = np.concatenate([self.x, x])
+        self.P = np.concatenate([self.P, P])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, dtype=np.int64)])
+
+@cache
+def get_linear_sum_assignment():
+    """scipy's linear_sum_assignment, or None without scipy. Imported on first use, scipy is slow to import."""
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:  # scipy is optional, fall back to greedy nearest-first matching
+        return None
+    return linear_sum_assignment
+
+def gated_assignment(cost, gated):
+    """Cheapest one-to-one matching of rows to columns using only the pairs where gated is True.
+
+    Returns (rows, cols) arrays of the matched pairs.
+    """
+    linear_sum_assignment = get_linear_sum_assignment()
+    if linear_sum_assignment is not None:
+        # Out-of-gate pairs get a cost no real match can reach, then get thrown away after the solve
+        rows, cols = linear_sum_assignment(np.where(gated, cost, 1e9))
+    else:
+        rows, cols = _greedy_assignment(cost, gated)
+
+    keep = gated[rows, cols]
+    return rows[keep], cols[keep]
+
+def _greedy_assignment(cost, gated):
+    """Cheapest-pair-first matching over the gated pairs (used when scipy isn't installed)."""
+    rows, cols = np.nonzero(gated)
+    order = np.argsort(cost[rows, cols], kind="stable")
+    used_rows, used_cols = set(), set()
+    picked_rows, picked_cols = [], []
+    for row, col in zip(rows[order], cols[order]):
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            picked_rows.append(row)
+            picked_cols.append(col)
+    return np.array(picked_rows, dtype=np.int64), np.array(picked_cols, dtype=np.int64)
+
+def track_detections(detections, tracker=None):
+    """Runs a MultiTracker over track_frames output. Returns [(frame_idx, timestamp, tracks), ...]."""
+    if tracker is None:
+        tracker = MultiTracker()
+    return [(frame_idx, timestamp, tracker.update(blobs[:, 5:7]))
+            for frame_idx, timestamp, blobs, _ in detections]
@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lazyimport import lazy_import
+
+# Stages (and cv2 / numpy / scipy behind them) are only imported once something uses them, so --help
+# answers straight away and a spawned worker only loads what its camera needs (lazyimport.py)
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+autosync = lazy_import("autosync")
+detectionlog = lazy_import("detectionlog")
+framesink = lazy_import("framesink")
+framesource = lazy_import("framesource")
+framestore = lazy_import("framestore")
+framesync = lazy_import("framesync")
+MOG2_main = lazy_import("MOG2_main")
+motiongate = lazy_import("motiongate")
+multitracker = lazy_import("multitracker")
+profiling = lazy_import("profiling")
+trajectorystore = lazy_import("trajectorystore")
+triangulate = lazy_import("triangulate")
+
+# One entry point for videoslicer -> framesync -> MOG2_main (+ tracks and 3D), driven by a JSON config
+# instead of the paths and offsets hard-coded in each script:
+#   python pipeline.py pipeline.json                       every flight in the config
+#   python pipeline.py pipeline.json --flight flight1 -j 2 just flight1, 2 worker processes
+# Every (flight, camera) is one job and all jobs of all flights share one process pool, so a batch of
+# flights keeps every core busy. A job runs its stages fused in memory: decode-ahead (FrameSource, seeks
+# straight to the synced range) -> MOG2 + detection -> detection log, and the synced frames / annotated
+# frames only touch the disk if the config asks for them (written behind the loop by FrameSinks).
+# When the last camera of a flight is done, its detections get merged by synced frame, tracked
+# (multitracker -> trajectory store) and triangulated if the flight has a calibration, and the flight's
+# throughput gets printed.
+#
+# Config layout (paths are relative to the config file):
+#   "output": folder the results go in (<output>/<flight>/...), "workers": pool size (default: cores)
+#   "defaults": camera settings every camera starts from
+#   "flights": {name: {"start", "end", "downsample_rate", "reference", "calibration", "stereo",
+#                      "cameras": {name: camera settings}}}
+# Camera settings:
+#   "video" or "input" (frame store / frame folder), where the frames come from
+#   sync: "start"/"end" frames of its own, or "offset" (frames, added to the flight's start/end, which are
+#         the reference camera's), or "auto_sync": true (autosync.py against the reference camera's video)
+#   tracking: "scale", "process_scale", "refine", "multi_target", "min_area", "background", "motion_gate"
+#             (same as the datasets entries in MOG2_main.py)
+#   outputs: "log" (detection log, on by default, "npz" or "parquet"), "synced" ("frames" for a frame store
+#            or "png" for a folder of the synced frames), "annotated" ("mp4", "png" or "jpg"), "tracks" (2D tracks)
+
+CAMERA_DEFAULTS = {"scale": None, "process_scale": 1.0, "refine": False, "multi_target": False, "min_area": 100,
+                   "background": "mog2", "motion_gate": False, "log": "npz", "synced": None, "annotated": None,
+                   "tracks": False}
+
+def load_config(path):
+    """Reads a pipeline config and resolves its paths against the config file's folder."""
+    with open(path) as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value):
+        return value if value is None or os.path.isabs(value) else os.path.join(base, value)
+
+    config["output"] = resolve(config.get("output", "runs"))
+    for flight in config["flights"].values():
+        if "calibration" in flight:
+            flight["calibration"] = resolve(flight["calibration"])
+        for camera in flight["cameras"].values():
+            for key in ("video", "input"):
+                if key in camera:
+                    camera[key] = resolve(camera[key])
+    return config
+
+def camera_jobs(config, flights=None):
+    """Fully resolved settings of every (flight, camera) job: sync range, stage settings and output paths."""
+    jobs = []
+    for flight_name, flight in config["flights"].items():
+        if flights and flight_name not in flights:
+            continue
+        cameras = flight["cameras"]
+        reference = flight.get("reference", next(iter(cameras)))
+        rate = flight.get("downsample_rate", config.get("downsample_rate", framesync.DOWNSAMPLE_RATE))
+        output = os.path.join(config["output"], flight_name)
+
+        for name, settings in cameras.items():
+            camera = {**CAMERA_DEFAULTS, **config.get("defaults", {}), **settings}
+            if "video" not in camera and "input" not in camera:
+                raise ValueError(f"{flight_name}/{name}: needs a \"video\" or an \"input\"")
+            camera["flight"], camera["name"], camera["downsample_rate"] = flight_name, name, rate
+            offset = camera.get("offset", 0)
+            camera.setdefault("start", flight.get("start", 0) + offset)
+            camera.setdefault("end", flight["end"] + offset if "end" in flight else None)
+            if camera.get("auto_sync") and name != reference:
+                if "end" not in flight:
+                    raise ValueError(f"{flight_name}/{name}: \"auto_sync\" needs the flight's \"end\" frame")
+                camera["reference_video"] = cameras[reference]["video"]
+                camera["reference_start"], camera["reference_end"] = flight.get("start", 0), flight["end"]
+
+            camera["output"] = output
+            if camera["log"]:
+                camera["log_path"] = os.path.join(output, f"{name}.{camera['log']}")
+            if camera["synced"]:
+                ext = framestore.FRAME_STORE_EXT if camera["synced"] == "frames" else ""
+                camera["synced_path"] = os.path.join(output, f"{name}_synced{ext}")
+            if camera["annotated"]:
+                ext = ".mp4" if camera["annotated"] == "mp4" else ""
+                camera["annotated_path"] = os.path.join(output, f"{name}_annotated{ext}")
+            jobs.append(camera)
+    return jobs
+
+def tee_frames(frames, sink):
+    """Pass-through stage that also hands a copy of every frame to a FrameSink."""
+    for frame_idx, timestamp, frame in frames:
+        sink.write(frame_idx, timestamp, frame.copy())  # FrameSource buffers get reused, the copy doesn't
+        yield frame_idx, timestamp, frame
+
+def run_camera(camera):
+    """Process-pool worker: runs one camera's stages fused in memory.
+
+    Returns (camera, detections, stage timings, (start, end) wall clock times).
+    """
+    cv2.setNumThreads(1)  # One core per job, the pool does the parallelism
+    profiling.PROFILER.reset()
+    started = time.time()
+
+    if "reference_video" in camera:
+        synced = autosync.auto_sync(camera["reference_video"], camera["video"], camera["reference_start"],
+                                    camera["reference_end"], camera["downsample_rate"])
+        if synced is None:
+            raise ValueError(f"{camera['flight']}/{camera['name']}: auto sync failed")
+        camera["start"], camera["end"], camera["downsample_rate"], _ = synced
+
+    source = camera.get("video", camera.get("input"))
+    synced_sink = None
+    if "synced_path" in camera:
+        # The synced frames get saved full size, so the tracker does the resizing itself
+        frames = framesource.FrameSource(source, 1.0, camera["start"], camera["end"], camera["downsample_rate"])
+        synced_sink = framesink.FrameSink(camera["synced_path"], clear=True)
+        frames, scale = tee_frames(frames, synced_sink), camera["scale"]
+    else:
+        frames = framesource.FrameSource(source, camera["scale"] or 1.0, camera["start"], camera["end"],
+                                         camera["downsample_rate"])
+        scale = None
+
+    timings = {}
+    log = detectionlog.DetectionLog(camera["log_path"]) if "log_path" in camera else None
+    gate = motiongate.MotionGate() if camera["motion_gate"] else None
+    output_format = camera["annotated"] if camera["annotated"] in ("png", "jpg") else "png"
+    try:
+        detections = list(MOG2_main.iter_track_frames(
+            frames, camera.get("annotated_path"), scale=scale, timings=timings, log=log, camera=camera["name"],
+            multi_target=camera["multi_target"], min_area=camera["min_area"], process_scale=camera["process_scale"],
+            refine=camera["refine"], background=camera["background"], output_format=output_format, motion_gate=gate))
+    finally:
+        if synced_sink is not None:
+            synced_sink.close()
+        if log is not None:
+            log.close()
+
+    if gate is not None:
+        print(f"⏩ {camera['flight']}/{camera['name']}: {gate.summary()}")
+    profiling.PROFILER.write_report(f"pipeline_{camera['flight']}_{camera['name']}_{os.getpid()}")
+    return camera, detections, timings, (started, time.time())
+
+def finish_flight(flight_name, flight, results):
+    """Merges a flight's camera results, saves tracks / 3D positions and prints its throughput summary.
+
+    results is {camera: run_camera output}. Returns the summary dict.
+    """
+    output = next(iter(results.values()))[0]["output"]
+    os.makedirs(output, exist_ok=True)
+    camera_detections = {name: result[1] for name, result in results.items()}
+    starts = {name: result[0]["start"] for name, result in results.items()}
+    rates = {name: result[0]["downsample_rate"] for name, result in results.items()}
+    synced_detections = MOG2_main.merge_detections(camera_detections, starts, rates)
+
+    for name, (camera, detections, _, _) in results.items():
+        if camera["tracks"]:
+            tracks = trajectorystore.store_tracks(multitracker.track_detections(detections))
+            tracks.save(os.path.join(output, f"{name}_tracks.npz"))
+
+    positions = None
+    if "calibration" in flight and os.path.exists(flight["calibration"]):
+        camera_a, camera_b = flight.get("stereo", list(flight["cameras"])[:2])
+        calibration = triangulate.load_calibration(flight["calibration"])
+        positions = triangulate.triangulate_detections(synced_detections, calibration, camera_a, camera_b)
+        np.savez(os.path.join(output, "positions.npz"),
+                 synced_idx=np.array([frame[0] for frame in positions], np.int64),
+                 counts=np.array([len(frame[1]) for frame in positions], np.int64),
+                 positions=np.concatenate([frame[1] for frame in positions] or [np.empty((0, 3))]),
+                 errors=np.concatenate([frame[4] for frame in positions] or [np.empty(0)]))
+
+    # Throughput: frames and stage times summed over the cameras, wall time from first start to last finish
+    frames = sum(len(detections) for detections in camera_detections.values())
+    timings = {}
+    for _, _, camera_timings, _ in results.values():
+        for stage, seconds in camera_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    wall = max(result[3][1] for result in results.values()) - min(result[3][0] for result in results.values())
+    MOG2_main.print_timing_report(timings, frames, f"✅ {flight_name} stages")
+    summary = {"flight": flight_name, "cameras": len(results), "frames": frames, "seconds": wall,
+               "fps": frames / wall if wall > 0 else 0.0, "synced_frames": len(synced_detections),
+               "detections": sum(len(d[2]) for dets in camera_detections.values() for d in dets),
+               "positions": None if positions is None else sum(len(frame[1]) for frame in positions)}
+    with open(os.path.join(output, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def run_pipeline(config, flights=None, workers=None):
+    """Runs every camera of every (selected) flight on a process pool. Returns the per-flight summaries."""
+    jobs = camera_jobs(config, flights)
+    if not jobs:
+        print("Error: no flights to run")
+        return []
+    if workers is None:
+        workers = config.get("workers") or os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+
+    remaining = {}
+    for camera in jobs:
+        remaining[camera["flight"]] = remaining.get(camera["flight"], 0) + 1
+    results, summaries = {}, []
+    started = time.perf_counter()
+    print(f"🚀 {len(jobs)} cameras over {len(remaining)} flights on {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_camera, camera): camera for camera in jobs}
+        for future in as_completed(futures):
+            camera = futures[future]
+            flight_name = camera["flight"]
+            try:
+                result = future.result()
+                results.setdefault(flight_name, {})[camera["name"]] = result
+                _, detections, _, (job_start, job_end) = result
+                print(f"✅ {flight_name}/{camera['name']}: {len(detections)} frames in {job_end - job_start:.1f}s")
+            except Exception as error:
+                print(f"❌ {flight_name}/{camera['name']}: {error!r}")
+                remaining[flight_name] = None  # One camera failed, the flight can't be merged
+
+            if remaining[flight_name] is None:
+                continue
+            remaining[flight_name] -= 1
+            if remaining[flight_name] == 0:
+                summaries.append(finish_flight(flight_name, config["flights"][flight_name], results.pop(flight_name)))
+
+    print_pipeline_summary(summaries, time.perf_counter() - started)
+    return summaries
+
+def print_pipeline_summary(summaries, seconds):
+    """One line per flight (cameras, frames, wall time, throughput, detections, 3D positions) and the total."""
+    print("\n📊 Throughput per flight")
+    for s in summaries:
+        positions = "" if s["positions"] is None else f"  {s['positions']:6d} 3D positions"
+        print(f"  {s['flight']:<16} {s['cameras']} cams  {s['frames']:6d} frames  {s['seconds']:7.1f}s  "
+              f"{s['fps']:7.1f} fps  {s['detections']:6d} detections{positions}")
+    frames = sum(s["frames"] for s in summaries)
+    print(f"  {'total':<16} {len(summaries)} flights  {frames:6d} frames  {seconds:7.1f}s  "
+          f"{frames / max(seconds, 1e-9):7.1f} fps")
+
+# ========= MAIN EXECUTION =========
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the phoneCV tracking pipeline from a config file.")
+    parser.add_argument("config", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                  "pipeline.json"))
+    parser.add_argument("--flight", action="append", help="only run this flight (can be repeated)")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: config, then cores)")
+    args = parser.parse_args()
+
+    run_pipeline(load_config(args.config), args.flight, args.workers)
@@ -0,0 +1,141 @@
+import atexit
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows, no peak RSS there
+    resource = None
+
+# Lightweight per-stage instrumentation shared by every phoneCV script, switched on with one flag:
+#   PHONECV_PROFILE=1 python MOG2_main.py          stage timers -> profile_reports/<script>_<pid>.json/.csv
+#   PHONECV_PROFILE=cprofile python MOG2_main.py   same + a cProfile dump (.prof, open with snakeviz/pstats)
+# Off (the default) every hook is a no-op. On, a stage costs two perf_counter calls, a list append and a
+# getrusage call, so it can stay wrapped around per-frame work. The report has p50/p95/p99 latency,
+# frames/sec (calls per second of time spent in the stage) and the peak RSS the process had reached
+# by the end of the stage.
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profile_reports")
+
+def _peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3  # bytes on macOS, KB on Linux
+
+class Profiler:
+    """Collects per-stage latency samples. Use stage() as a context manager, timed() as a decorator."""
+
+    def __init__(self, enabled=False, cprofile=False):
+        self.enabled = enabled
+        self.samples = {}
+        self.peak_rss = {}
+        self.start_time = time.perf_counter()
+        self.cprofile = None
+        if enabled and cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def reset(self):
+        """Drops everything recorded so far (e.g. what a forked worker inherited from its parent)."""
+        self.samples = {}
+        self.peak_rss = {}
+        self.start_time = time.perf_counter()
+
+    def record(self, stage, seconds):
+        """Adds one latency sample (seconds) to a stage."""
+        if not self.enabled:
+            return
+        self.samples.setdefault(stage, []).append(seconds)
+        self.peak_rss[stage] = _peak_rss_mb()
+
+    def stage(self, name):
+        """Context manager timing one run of a stage."""
+        if not self.enabled:
+            return nullcontext()
+        return _StageTimer(self, name)
+
+    def timed(self, name=None):
+        """Decorator timing every call of a function as a stage (named after the function by default)."""
+        def decorator(fn):
+            stage = name or fn.__name__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def report(self):
+        """{stage: {calls, total_s, fps, p50_ms, p95_ms, p99_ms, max_ms, peak_rss_mb}}."""
+        report = {}
+        for stage, samples in self.samples.items():
+            ms = 1000 * np.asarray(samples)
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            total = ms.sum() / 1000
+            report[stage] = {"calls": len(ms), "total_s": total, "fps": len(ms) / total if total else 0.0,
+                             "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": ms.max(),
+                             "peak_rss_mb": self.peak_rss[stage]}
+        return report
+
+    def write_report(self, name=None, folder=REPORT_DIR):
+        """Writes the report as <name>.json and <name>.csv (plus <name>.prof with cProfile). Returns the json path."""
+        if not self.enabled or not self.samples:
+            return None
+        if name is None:
+            name = f"{os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]}_{os.getpid()}"
+        os.makedirs(folder, exist_ok=True)
+        base = os.path.join(folder, name)
+        report = self.report()
+
+        with open(base + ".json", "w") as f:
+            json.dump({"wall_s": time.perf_counter() - self.start_time, "stages": report}, f, indent=2)
+        with open(base + ".csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            columns = ["calls", "total_s", "fps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "peak_rss_mb"]
+            writer.writerow(["stage"] + columns)
+            for stage, row in report.items():
+                writer.writerow([stage] + [row[column] for column in columns])
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(base + ".prof")
+
+        print(f"📊 Profile report saved to {base}.json")
+        return base + ".json"
+
+class _StageTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+def profiler_from_env():
+    """Profiler configured by the PHONECV_PROFILE flag (unset/0 = off, 1 = timers, cprofile = timers + cProfile)."""
+    flag = os.environ.get("PHONECV_PROFILE", "").lower()
+    return Profiler(enabled=flag not in ("", "0"), cprofile=flag == "cprofile")
+
+# The one profiler every script reports into; written out automatically when the process exits
+PROFILER = profiler_from_env()
+atexit.register(PROFILER.write_report)
@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+
+# Run background subtraction on a downscaled copy of the frame and bring the detections back up.
+# MOG2 cost is linear in pixel count, so 1/2 scale is ~4x cheaper and 1/4 scale ~16x. Boxes mapped
+# back up are only as precise as the small frame (±1/scale px); refine_blobs tightens them again by
+# diffing small full-resolution crops around each detection against the MOG2 background.
+
+def downscale(gray, process_scale):
+    """Shrinks a frame for processing (INTER_AREA so small drones don't alias away)."""
+    if process_scale == 1.0:
+        return gray
+    return cv2.resize(gray, (0, 0), fx=process_scale, fy=process_scale, interpolation=cv2.INTER_AREA)
+
+def upscale_blobs(blobs, process_scale):
+    """Maps an (N, 7) blob array found at process_scale back to full-resolution pixels."""
+    if process_scale == 1.0:
+        return blobs
+    blobs = blobs / np.float32(process_scale)
+    blobs[:, 4] /= process_scale  # area scales with the square, 1 / process_scale ** 2 in total
+    blobs[:, 5:7] += 0.5 / process_scale - 0.5  # Centroids map pixel centre to pixel centre: (c + 0.5) / s - 0.5
+    return blobs
+
+def upscale_ellipse(ellipse, process_scale):
+    """Maps a cv2.fitEllipse result found at process_scale back to full-resolution pixels."""
+    if ellipse is None or process_scale == 1.0:
+        return ellipse
+    (cx, cy), (major, minor), angle = ellipse
+    center = ((cx + 0.5) / process_scale - 0.5, (cy + 0.5) / process_scale - 0.5)
+    return center, (major / process_scale, minor / process_scale), angle
+
+def refine_blobs(gray, background_small, blobs, process_scale, diff_threshold=25, pad=2):
+    """Re-measures full-resolution blobs in small full-res crops.
+
+    gray is the full-resolution grayscale frame, background_small the MOG2 background image at
+    process_scale (fgbg.getBackgroundImage()). Each crop is diffed against the upsampled background
+    and the box, centroid and area are re-measured from the pixels over diff_threshold. pad is in
+    small-frame pixels. Blobs with no pixels over the threshold are left as they were.
+    """
+    if process_scale == 1.0 or len(blobs) == 0:
+        return blobs
+
+    small_h, small_w = background_small.shape[:2]
+    full_h, full_w = gray.shape[:2]
+    refined = blobs.copy()
+    for i, (x, y, w, h) in enumerate(blobs[:, :4]):
+        # Crop on the small-frame pixel grid so the upsampled background lines up with the frame
+        sx0 = max(0, int(np.floor(x * process_scale)) - pad)
+        sy0 = max(0, int(np.floor(y * process_scale)) - pad)
+        sx1 = min(small_w, int(np.ceil((x + w) * process_scale)) + pad)
+        sy1 = min(small_h, int(np.ceil((y + h) * process_scale)) + pad)
+        x0, y0 = int(round(sx0 / process_scale)), int(round(sy0 / process_scale))
+        x1, y1 = min(full_w, int(round(sx1 / process_scale))), min(full_h, int(round(sy1 / process_scale)))
+        if x1 <= x0 or y1 <= y0:
+            continue
+
+        crop = gray[y0:y1, x0:x1]
+        background = cv2.resize(background_small[sy0:sy1, sx0:sx1], (x1 - x0, y1 - y0),
+                                interpolation=cv2.INTER_LINEAR)
+        _, mask = cv2.threshold(cv2.absdiff(crop, background), diff_threshold, 255, cv2.THRESH_BINARY)
+
+        moments = cv2.moments(mask, binaryImage=True)
+        if moments["m00"] == 0:
+            continue
+        bx, by, bw, bh = cv2.boundingRect(mask)
+        refined[i] = (bx + x0, by + y0, bw, bh, moments["m00"],
+                      moments["m10"] / moments["m00"] + x0, moments["m01"] / moments["m00"] + y0)
+    return refined
@@ -0,0 +1,161 @@
+import cv2
+import numpy as np
+
+from backgrounds import create_background_model
+from blobfinder import find_blobs
+from profiling import PROFILER
+
+# Hybrid MOG2 + CSRT tracking that doesn't pay for full-frame work every frame.
+# Every `redetect_every` frames (or as soon as a tracker loses its target or runs into the edge of its
+# ROI) MOG2 + blobfinder run on the whole frame and every blob gets a fresh tracker. In between, each
+# tracker only sees a padded crop (ROI) around its target, so CSRT/KCF/MOSSE work on a few thousand
+# pixels instead of a 4K frame. CSRT's cost follows the size of the target rather than the frame, so
+# each ROI is also shrunk until the target is about `target_size` px across. The ROI and its shrink
+# factor stay put between re-detections so the tracker's coordinates stay consistent, and everything
+# (MOG2, tracker init and update) runs at the same processing scale.
+
+TRACKER_TYPES = ("csrt", "kcf", "mosse")
+
+def create_tracker(kind="csrt"):
+    """Makes an OpenCV legacy tracker: "csrt" (most accurate), "kcf" (faster) or "mosse" (fastest)."""
+    if kind == "csrt":
+        return cv2.legacy.TrackerCSRT_create()
+    if kind == "kcf":
+        return cv2.legacy.TrackerKCF_create()
+    if kind == "mosse":
+        return cv2.legacy.TrackerMOSSE_create()
+    raise ValueError(f"Unknown tracker type {kind!r}, expected one of {TRACKER_TYPES}")
+
+def padded_roi(bbox, frame_shape, pad):
+    """(x, y, w, h) box around bbox, grown by pad times its size on every side and clipped to the frame."""
+    x, y, w, h = bbox
+    margin_x, margin_y = pad * w + 8, pad * h + 8
+    x0, y0 = int(max(0, x - margin_x)), int(max(0, y - margin_y))
+    x1 = int(min(frame_shape[1], x + w + margin_x))
+    y1 = int(min(frame_shape[0], y + h + margin_y))
+    return x0, y0, x1 - x0, y1 - y0
+
+def crop_roi(frame, roi, roi_scale=1.0):
+    """Cuts roi out of frame, shrunk by roi_scale (a view when roi_scale is 1)."""
+    x, y, w, h = roi
+    crop = frame[y:y + h, x:x + w]
+    if roi_scale != 1.0:
+        crop = cv2.resize(crop, (0, 0), fx=roi_scale, fy=roi_scale, interpolation=cv2.INTER_AREA)
+    return crop
+
+class HybridTracker:
+    """MOG2 re-detection every K frames + per-target ROI trackers in between.
+
+    scale: processing scale applied to every frame (tracker init and updates use the same one).
+    redetect_every: K, frames between full-frame MOG2 re-detections.
+    detect_scale: extra downscale for the MOG2 re-detection only (blobs get mapped back before the
+        trackers are seeded, so they still live at the processing scale). 0.25 at 4K is plenty for drones.
+    pad: ROI padding, as a multiple of the target size on each side.
+    target_size: ROIs get shrunk so the target is at most this many px across inside the tracker.
+    max_area_fraction: blobs bigger than this share of the frame are ignored (MOG2 start-up flashes).
+    background: background model used for the re-detections (see backgrounds.py).
+    """
+
+    def __init__(self, tracker_type="csrt", redetect_every=10, pad=2.0, scale=1.0, detect_scale=1.0,
+                 target_size=48, min_area=100, max_area_fraction=0.25, gate=50.0, background="mog2"):
+        self.tracker_type = tracker_type
+        self.redetect_every = redetect_every
+        self.pad = pad
+        self.scale = scale
+        self.detect_scale = detect_scale
+        self.target_size = target_size
+        self.min_area = min_area
+        self.max_area_fraction = max_area_fraction
+        self.gate = gate
+
+        self.fgbg = create_background_model(background)
+        self.tracks = []  # dicts: id, tracker, roi, roi_scale, bbox (processing-scale pixels)
+        self.next_id = 0
+        self.frames_since_detect = 0
+        self.need_detect = True
+
+    def update(self, frame):
+        """Processes one full-resolution BGR frame.
+
+        Returns (tracks, redetected) where tracks is a list of (track_id, (x, y, w, h)) in
+        full-resolution pixels and redetected says whether this frame ran full-frame MOG2.
+        """
+        if self.scale != 1.0:
+            frame = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale)
+
+        redetected = self.need_detect or self.frames_since_detect >= self.redetect_every or not self.tracks
+        if redetected:
+            with PROFILER.stage("redetect"):
+                self._redetect(frame)
+        else:
+            with PROFILER.stage("tracking"):
+                self._update_rois(frame)
+
+        return [(track["id"], tuple(v / self.scale for v in track["bbox"])) for track in self.tracks], redetected
+
+    def _redetect(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.detect_scale != 1.0:
+            gray = cv2.resize(gray, (0, 0), fx=self.detect_scale, fy=self.detect_scale,
+                              interpolation=cv2.INTER_AREA)
+        fgmask = self.fgbg.apply(gray)
+
+        # min_area is in processing-scale pixels, so it shrinks with the detection scale too
+        max_area = self.max_area_fraction * fgmask.shape[0] * fgmask.shape[1]
+        blobs = find_blobs(fgmask, self.min_area * self.detect_scale ** 2, max_area)
+        blobs[:, [0, 1, 2, 3, 5, 6]] /= self.detect_scale
+
+        # Keep track ids by matching each blob to the nearest old track inside the gate
+        old = {track["id"]: track["bbox"] for track in self.tracks}
+        tracks = []
+        for blob in blobs[np.argsort(-blobs[:, 4])]:
+            bbox = tuple(int(v) for v in blob[:4])
+            track_id = self._claim_id(old, blob[5:7])
+
+            roi = padded_roi(bbox, frame.shape, self.pad)
+            roi_scale = min(1.0, self.target_size / max(bbox[2], bbox[3]))
+            tracker = create_tracker(self.tracker_type)
+            x, y, w, h = bbox[0] - roi[0], bbox[1] - roi[1], bbox[2], bbox[3]
+            tracker.init(crop_roi(frame, roi, roi_scale),
+                         (x * roi_scale, y * roi_scale, w * roi_scale, h * roi_scale))
+            tracks.append({"id": track_id, "tracker": tracker, "roi": roi, "roi_scale": roi_scale, "bbox": bbox})
+
+        self.tracks = tracks
+        self.frames_since_detect = 0
+        self.need_detect = False
+
+    def _claim_id(self, old, center):
+        best_id, best_dist = None, self.gate
+        for track_id, (x, y, w, h) in old.items():
+            dist = np.hypot(x + w / 2 - center[0], y + h / 2 - center[1])
+            if dist <= best_dist:
+                best_id, best_dist = track_id, dist
+
+        if best_id is None:
+            best_id = self.next_id
+            self.next_id += 1
+        else:
+            del old[best_id]
+        return best_id
+
+    def _update_rois(self, frame):
+        kept = []
+        for track in self.tracks:
+            roi_frame = crop_roi(frame, track["roi"], track["roi_scale"])
+            ok, box = track["tracker"].update(roi_frame)
+            if not ok:
+                self.need_detect = True  # Lost it, full re-detection next frame
+                continue
+
+            x, y, w, h = box
+            # Target about to leave its ROI: coordinates are still good this frame, re-detect next one
+            if x <= 1 or y <= 1 or x + w >= roi_frame.shape[1] - 1 or y + h >= roi_frame.shape[0] - 1:
+                self.need_detect = True
+
+            rx, ry, _, _ = track["roi"]
+            roi_scale = track["roi_scale"]
+            track["bbox"] = (x / roi_scale + rx, y / roi_scale + ry, w / roi_scale, h / roi_scale)
+            kept.append(track)
+
+        self.tracks = kept
+        self.frames_since_detect += 1
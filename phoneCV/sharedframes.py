@@ -0,0 +1,211 @@
+import multiprocessing
+import os
+import queue
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from lazyimport import lazy_import
+
+# Only the stage that runs in a process gets imported there (lazyimport.py)
+backgrounds = lazy_import("backgrounds")
+blobfinder = lazy_import("blobfinder")
+cv2 = lazy_import("cv2")
+framesource = lazy_import("framesource")
+multitracker = lazy_import("multitracker")
+
+# Frame handoff between processes without pickling the frames. Putting a frame on a multiprocessing.Queue
+# pickles it, pushes it through a pipe and unpickles it on the other side: ~6 MB per 1080p frame, ~25 MB
+# at 4K, which costs about as much as the processing it was meant to parallelise. A SharedFrameRing is
+# `slots` frame buffers in one multiprocessing.shared_memory block that both processes map. The producer
+# takes a free slot, writes the frame into it (or has OpenCV write straight into it) and sends the slot
+# number + frame_idx + timestamp over a queue; the consumer reads the frame in place and gives the slot
+# back when it asks for the next one. Only a few small tuples ever go through the queues, and a full
+# ring makes the producer wait (at most slots frames in flight, no unbounded queue).
+#
+# iter_shared_detections runs decode -> subtract -> track as three processes on two rings:
+#   decode process:   video / frame store / folder -> frames ring (one copy into shared memory)
+#   subtract process: frames ring -> cvtColor + background model, the mask written straight into the masks ring
+#   this process:     masks ring -> find_blobs + MultiTracker
+# so on a multi-core machine decoding, MOG2 and tracking overlap (bench_sharedframes).
+
+class SharedFrameRing:
+    """Ring of `slots` shared-memory frame buffers of one shape, handed between two processes by slot number.
+
+    Producer: slot = ring.acquire(), fill ring.frames[slot], ring.publish(slot, frame_idx, timestamp)
+    (or ring.put(...) to copy a frame in), then ring.finish(). Consumer: iterate it (or iter_frames()) for
+    (frame_idx, timestamp, frame) views, each only good until the next one is asked for.
+    One producer and one consumer per ring. Passing it to a multiprocessing.Process sends only the block's
+    name and the queues; the process that created it unlinks the block on close().
+    """
+
+    def __init__(self, shape, slots=8, dtype=np.uint8, context=None):
+        context = context or multiprocessing.get_context()
+        self.shape = tuple(int(n) for n in shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        size = slots * int(np.prod(self.shape)) * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.owner_pid = os.getpid()  # Forked children inherit the object as is, only this process unlinks
+        self.free, self.ready = context.Queue(), context.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self._map()
+
+    def _map(self):
+        self.frames = np.ndarray((self.slots, *self.shape), self.dtype, buffer=self.shm.buf)
+
+    def __getstate__(self):
+        return {"name": self.shm.name, "shape": self.shape, "slots": self.slots, "dtype": self.dtype.str,
+                "free": self.free, "ready": self.ready, "owner_pid": self.owner_pid}
+
+    def __setstate__(self, state):
+        self.shape, self.slots, self.dtype = state["shape"], state["slots"], np.dtype(state["dtype"])
+        self.free, self.ready = state["free"], state["ready"]
+        self.owner_pid = state["owner_pid"]
+        self.shm = shared_memory.SharedMemory(name=state["name"])
+        self._map()
+
+    def acquire(self):
+        """A free slot to write the next frame into, waits while the consumer still holds all of them."""
+        return self.free.get()
+
+    def publish(self, slot, frame_idx, timestamp):
+        """Hands a filled slot over to the consumer."""
+        self.ready.put((slot, frame_idx, timestamp))
+
+    def put(self, frame_idx, timestamp, frame):
+        """Copies one frame into a free slot and hands it over."""
+        slot = self.acquire()
+        np.copyto(self.frames[slot], frame)
+        self.publish(slot, frame_idx, timestamp)
+
+    def finish(self):
+        """No more frames, the consumer's iteration ends once it has the ones already published."""
+        self.ready.put(None)
+
+    def fail(self, stage):
+        """Called from the producer's except block: the consumer gets the traceback raised as a RuntimeError."""
+        self.ready.put(RuntimeError(f"{stage} failed:\n{traceback.format_exc()}"))
+
+    def iter_frames(self, producers=()):
+        """Yields (frame_idx, timestamp, frame) views into the ring.
+
+        producers are the multiprocessing.Processes upstream of the ring: if one of them dies (killed,
+        segfault, anything that doesn't get to fail()) this raises instead of waiting forever.
+        """
+        slot = None
+        try:
+            while True:
+                if slot is not None:
+                    self.free.put(slot)  # Done with the last frame, the producer can write into it again
+                    slot = None
+                try:
+                    item = self.ready.get(timeout=1.0 if producers else None)
+                except queue.Empty:
+                    for process in producers:
+                        if process.exitcode not in (None, 0):
+                            raise RuntimeError(f"{process.name} process died (exit code {process.exitcode})")
+                    continue
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                slot, frame_idx, timestamp = item
+                yield frame_idx, timestamp, self.frames[slot]
+        finally:
+            if slot is not None:
+                self.free.put(slot)
+
+    def __iter__(self):
+        return self.iter_frames()
+
+    def close(self):
+        """Unmaps the block (and frees it, in the process that created it)."""
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Someone still holds a view of a frame, the mapping goes away with it
+        if self.owner_pid == os.getpid():
+            self.shm.unlink()
+            self.owner_pid = None
+
+def probe_frame_shape(source, start_frame=0, end_frame=None, step=1):
+    """Shape of the frames source gives (decodes the first one), None if it has none."""
+    frames, _ = framesource.decode_frames(source, start_frame, end_frame, step)
+    for _, _, frame in frames:
+        return frame.shape
+    return None
+
+def _decode_stage(source, start_frame, end_frame, step, frames_out):
+    """Decode process: source frames into the frames ring."""
+    try:
+        cv2.setNumThreads(1)  # One core per stage
+        frames, _ = framesource.decode_frames(source, start_frame, end_frame, step)
+        for frame_idx, timestamp, frame in frames:
+            frames_out.put(frame_idx, timestamp, frame)
+        frames_out.finish()
+    except Exception:
+        frames_out.fail("decode")
+    finally:
+        frames_out.close()
+
+def _subtract_stage(frames_in, masks_out, background):
+    """Subtract process: gray + background model per frame, masks written straight into the masks ring."""
+    try:
+        cv2.setNumThreads(1)
+        model = backgrounds.create_background_model(background)
+        gray = None
+        for frame_idx, timestamp, frame in frames_in.iter_frames():
+            if frame.ndim == 3:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, gray)
+            else:
+                gray = frame
+            slot = masks_out.acquire()
+            mask = model.apply(gray, masks_out.frames[slot])
+            if not np.shares_memory(mask, masks_out.frames[slot]):
+                np.copyto(masks_out.frames[slot], mask)  # A model that didn't write in place
+            masks_out.publish(slot, frame_idx, timestamp)
+        masks_out.finish()
+    except Exception:
+        masks_out.fail("subtract")
+    finally:
+        frames_in.close()
+        masks_out.close()
+
+def iter_shared_detections(source, start_frame=0, end_frame=None, step=1, background="mog2", min_area=100,
+                           slots=8, tracker=None):
+    """Decode -> subtract -> track over three processes, frames and masks handed over in shared memory.
+
+    source is a video, frame store or frame folder, synced like FrameSource (start/end/step).
+    background is any backgrounds.py model, min_area goes to blobfinder.find_blobs, tracker defaults to a
+    new MultiTracker. Yields (frame_idx, timestamp, blobs, tracks) as each frame comes out of the tracker.
+    """
+    shape = probe_frame_shape(source, start_frame, end_frame, step)
+    if shape is None:
+        return
+    if tracker is None:
+        tracker = multitracker.MultiTracker()
+
+    context = multiprocessing.get_context()
+    frames = SharedFrameRing(shape, slots, context=context)
+    masks = SharedFrameRing(shape[:2], slots, context=context)
+    decoder = context.Process(target=_decode_stage, name="decode", daemon=True,
+                              args=(source, start_frame, end_frame, step, frames))
+    subtractor = context.Process(target=_subtract_stage, name="subtract", daemon=True,
+                                 args=(frames, masks, background))
+    try:
+        decoder.start()
+        subtractor.start()
+        for frame_idx, timestamp, mask in masks.iter_frames((decoder, subtractor)):
+            blobs = blobfinder.find_blobs(mask, min_area)
+            yield frame_idx, timestamp, blobs, tracker.update(blobs[:, 5:7])
+    finally:
+        for process in (decoder, subtractor):
+            if process.is_alive():
+                process.terminate()  # Stopped early (or failed), the stages may be waiting on a full ring
+            process.join()
+        frames.close()
+        masks.close()
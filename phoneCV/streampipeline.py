@@ -0,0 +1,63 @@
+import os
+
+from detectionlog import DetectionLog
+from framesync import (DOWNSAMPLE_RATE, END_FRAME_N1, END_FRAME_S1, START_FRAME_N1, START_FRAME_S1,
+                       iter_synced_video_frames, sync_and_downsample)
+from MOG2_main import track_cameras, track_frames
+from videoslicer import iter_video_frames, save_frames
+
+# Streaming version of videoslicer -> framesync -> MOG2_main.
+# Frames are decoded straight from the video, synced/downsampled as a generator and handed to the
+# MOG2 tracker in memory, so nothing hits the disk unless you ask for the intermediate folders.
+
+def stream_mog2_tracking(video_path, start_frame, end_frame, downsample_rate, output_folder=None,
+                         frames_folder=None, synced_folder=None, display=None, scale=None, log_path=None,
+                         camera="", multi_target=False):
+    """Decodes video_path and tracks the synced frames without the PNG round trips.
+
+    frames_folder / synced_folder optionally dump what videoslicer / framesync would have written
+    (frames_folder stops at end_frame since decoding stops there). Without frames_folder the video is
+    seeked to start_frame and the skipped frames are only grabbed, never retrieved.
+    log_path writes the detections as a .npz/.parquet DetectionLog.
+    """
+    if frames_folder is not None:
+        frames = save_frames(iter_video_frames(video_path), frames_folder)
+        frames = sync_and_downsample(frames, start_frame, end_frame, downsample_rate)
+    else:
+        frames = iter_synced_video_frames(video_path, start_frame, end_frame, downsample_rate)
+
+    if synced_folder is not None:
+        frames = save_frames(frames, synced_folder)
+
+    log = DetectionLog(log_path) if log_path is not None else None
+    detections = track_frames(frames, output_folder, display, scale, log=log, camera=camera,
+                              multi_target=multi_target)
+    if log is not None:
+        log.close()
+    return detections
+
+# ========= MAIN EXECUTION =========
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    video_folder = os.path.join(current_dir, "videos")
+
+    # Same flights & offsets as framesync.py, but read straight from the videos
+    datasets = {
+        "saanvi": {
+            "video": os.path.join(video_folder, "flight1_saanviphone.MOV"),
+            "start": START_FRAME_S1,
+            "end": END_FRAME_S1,
+            "log": os.path.join(current_dir, "detections", "saanvi_one.npz")
+        },
+        "nick": {
+            "video": os.path.join(video_folder, "flight1_nickphone.mp4"),
+            "start": START_FRAME_N1,
+            "end": END_FRAME_N1,
+            "log": os.path.join(current_dir, "detections", "nick_one.npz")
+        }
+    }
+
+    # One worker process per camera, each seeking through its own video
+    print(f"\n🚀 Streaming {len(datasets)} datasets in parallel...")
+    synced_detections = track_cameras(datasets, DOWNSAMPLE_RATE)
+    print(f"✅ {len(synced_detections)} synced frames with detections from {len(datasets)} cameras")
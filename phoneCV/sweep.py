@@ -0,0 +1,193 @@
+import cv2
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backgrounds import create_background_model
+from blobfinder import find_blobs
+from detectionlog import read_detection_log
+from framesync import DOWNSAMPLE_RATE, END_FRAME_N1, START_FRAME_N1, iter_synced_video_frames
+from multitracker import gated_assignment
+
+# Parameter sweep for the background subtraction / detection settings (history=500, varThreshold=50 and
+# area > 100 were picked once and copied everywhere). A flight is decoded once into one grayscale
+# shared-memory block, every worker process maps that same block instead of decoding or unpickling
+# frames, and each worker runs whole configurations (subtractor + morphology + area cutoff) over it.
+# Every configuration gets scored against labelled boxes (precision, recall, mean IoU of the matches)
+# and timed, so the report shows what each setting costs as well as what it catches.
+
+# Default grid: every combination gets run. KNN's threshold is a squared distance, hence the other scale;
+# running_average's is the minimum gray-level difference.
+SWEEP_GRID = {
+    "mog2": {"history": [200, 500], "threshold": [16, 32, 50, 80], "morph_kernel": [0, 3], "min_area": [50, 100]},
+    "knn": {"history": [200, 500], "threshold": [200, 400, 800], "morph_kernel": [0, 3], "min_area": [50, 100]},
+    "running_average": {"history": [200, 500], "threshold": [10, 15, 25], "morph_kernel": [0, 3],
+                        "min_area": [50, 100]},
+}
+MIN_IOU = 0.3  # A detection only counts as a hit if it overlaps a labelled box at least this much
+
+def expand_grid(grid):
+    """Turns {subtractor: {param: [values]}} into a flat list of config dicts."""
+    configs = []
+    for subtractor, params in grid.items():
+        names = list(params)
+        for values in itertools.product(*(params[name] for name in names)):
+            configs.append({"subtractor": subtractor, **dict(zip(names, values))})
+    return configs
+
+def create_subtractor(config):
+    """Background model for a sweep config (any of backgrounds.BACKGROUND_MODELS)."""
+    return create_background_model(config["subtractor"], config["history"], config["threshold"])
+
+def load_gray_frames(frames):
+    """Decodes (frame_idx, timestamp, frame) tuples into shared memory as one (N, H, W) grayscale block.
+
+    Returns (shm, gray, frame_ids); close and unlink shm when done.
+    """
+    grays, frame_ids = [], []
+    for frame_idx, _, frame in frames:
+        grays.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        frame_ids.append(frame_idx)
+    if not grays:
+        raise ValueError("No frames to sweep over")
+
+    shape = (len(grays), *grays[0].shape)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+    gray = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    for i, frame in enumerate(grays):
+        gray[i] = frame
+    return shm, gray, np.array(frame_ids)
+
+_shared = {}  # Per worker process: the attached shared-memory block and the frame view on it
+
+def _attach(shm_name, shape):
+    """Pool initializer: maps the decoded frames into this worker (no copy)."""
+    cv2.setNumThreads(1)  # One config per core, the pool does the parallelism
+    _shared["shm"] = shared_memory.SharedMemory(name=shm_name)
+    _shared["gray"] = np.ndarray(shape, dtype=np.uint8, buffer=_shared["shm"].buf)
+
+def run_config(config, gray=None):
+    """Runs one config over every frame. Returns (list of (N, 4) x, y, w, h boxes per frame, ms per frame)."""
+    if gray is None:
+        gray = _shared["gray"]
+    subtractor = create_subtractor(config)
+    kernel = np.ones((config["morph_kernel"],) * 2, np.uint8) if config["morph_kernel"] else None
+
+    boxes = []
+    start = time.perf_counter()
+    for frame in gray:
+        fgmask = subtractor.apply(frame)
+        if kernel is not None:
+            cv2.morphologyEx(fgmask, cv2.MORPH_OPEN, kernel, dst=fgmask)
+        boxes.append(find_blobs(fgmask, config["min_area"])[:, :4])
+    return boxes, 1000 * (time.perf_counter() - start) / len(gray)
+
+def box_iou(boxes_a, boxes_b):
+    """(N, M) IoU between two sets of x, y, w, h boxes."""
+    a_x0, a_y0 = boxes_a[:, None, 0], boxes_a[:, None, 1]
+    a_x1, a_y1 = a_x0 + boxes_a[:, None, 2], a_y0 + boxes_a[:, None, 3]
+    b_x0, b_y0 = boxes_b[None, :, 0], boxes_b[None, :, 1]
+    b_x1, b_y1 = b_x0 + boxes_b[None, :, 2], b_y0 + boxes_b[None, :, 3]
+    inter = (np.clip(np.minimum(a_x1, b_x1) - np.maximum(a_x0, b_x0), 0, None)
+             * np.clip(np.minimum(a_y1, b_y1) - np.maximum(a_y0, b_y0), 0, None))
+    union = (a_x1 - a_x0) * (a_y1 - a_y0) + (b_x1 - b_x0) * (b_y1 - b_y0) - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+def score_boxes(predicted, labels, frame_ids, min_iou=MIN_IOU, skip_frames=0):
+    """Precision, recall and mean IoU of the matched pairs over a flight.
+
+    predicted is a list of (N, 4) boxes per frame, labels {frame_idx: (M, 4) boxes}. Boxes are matched
+    one-to-one per frame on IoU. skip_frames leaves out the first frames while the background model
+    is still learning.
+    """
+    hits = false_alarms = misses = 0
+    ious = []
+    for boxes, frame_idx in zip(predicted[skip_frames:], frame_ids[skip_frames:]):
+        truth = labels.get(int(frame_idx), np.empty((0, 4)))
+        if len(boxes) and len(truth):
+            iou = box_iou(boxes, truth)
+            rows, cols = gated_assignment(1 - iou, iou >= min_iou)
+            ious.extend(iou[rows, cols])
+            matched = len(rows)
+        else:
+            matched = 0
+        hits += matched
+        false_alarms += len(boxes) - matched
+        misses += len(truth) - matched
+
+    precision = hits / (hits + false_alarms) if hits + false_alarms else 0.0
+    recall = hits / (hits + misses) if hits + misses else 0.0
+    return precision, recall, float(np.mean(ious)) if ious else 0.0
+
+def labels_from_log(path, camera=None):
+    """Labelled boxes from a detection log (e.g. hand-corrected detections): {frame_idx: (M, 4) boxes}."""
+    columns = read_detection_log(path)
+    if camera is not None:
+        keep = columns["camera"] == camera
+        columns = {name: values[keep] for name, values in columns.items()}
+
+    boxes = np.stack([columns[c] for c in ("x", "y", "w", "h")], axis=1)
+    labels = {}
+    for frame_idx in np.unique(columns["frame_idx"]):
+        labels[int(frame_idx)] = boxes[columns["frame_idx"] == frame_idx]
+    return labels
+
+def sweep(frames, labels, configs=None, max_workers=None, skip_frames=10):
+    """Runs every config over the frames in parallel and scores it.
+
+    Returns a list of result dicts (config + precision, recall, f1, iou, ms_per_frame) sorted best F1 first.
+    """
+    if configs is None:
+        configs = expand_grid(SWEEP_GRID)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    shm, gray, frame_ids = load_gray_frames(frames)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach,
+                                 initargs=(shm.name, gray.shape)) as pool:
+            runs = list(pool.map(run_config, configs))
+    finally:
+        del gray
+        shm.close()
+        shm.unlink()
+
+    results = []
+    for config, (boxes, ms) in zip(configs, runs):
+        precision, recall, iou = score_boxes(boxes, labels, frame_ids, skip_frames=skip_frames)
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        results.append({**config, "precision": precision, "recall": recall, "f1": f1, "iou": iou,
+                        "ms_per_frame": ms})
+    return sorted(results, key=lambda result: -result["f1"])
+
+def print_sweep_report(results, top=None):
+    """Table of configs, best F1 first. '*' marks the accuracy/speed frontier (nothing is both faster and better)."""
+    print(f"{'subtractor':<10} {'history':>7} {'thresh':>6} {'morph':>5} {'area':>5}  "
+          f"{'prec':>5} {'recall':>6} {'f1':>5} {'iou':>5} {'ms/frame':>8}")
+    for result in results[:top]:
+        frontier = not any(other["f1"] >= result["f1"] and other["ms_per_frame"] < result["ms_per_frame"]
+                           for other in results)
+        print(f"{result['subtractor']:<10} {result['history']:>7} {result['threshold']:>6} "
+              f"{result['morph_kernel']:>5} {result['min_area']:>5}  {result['precision']:5.2f} "
+              f"{result['recall']:6.2f} {result['f1']:5.2f} {result['iou']:5.2f} {result['ms_per_frame']:8.2f}"
+              f"{' *' if frontier else ''}")
+
+# ========= MAIN EXECUTION =========
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    video_path = os.path.join(current_dir, "videos", "flight1_nickphone.mp4")
+    # Labelled boxes in the detection log format (e.g. a MOG2_main log with the bad boxes fixed by hand)
+    labels_path = os.path.join(current_dir, "detections", "nick_one_labels.npz")
+
+    if not os.path.exists(labels_path):
+        print(f"Error: Need labelled boxes in {labels_path}")
+        exit()
+
+    frames = iter_synced_video_frames(video_path, START_FRAME_N1, END_FRAME_N1, DOWNSAMPLE_RATE)
+    configs = expand_grid(SWEEP_GRID)
+    print(f"🚀 Sweeping {len(configs)} configs...")
+    print_sweep_report(sweep(frames, labels_from_log(labels_path, "nick"), configs))
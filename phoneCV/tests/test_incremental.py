@@ -0,0 +1,22 @@
+import numpy as np
+
+from incremental import StageCache, run_subtract_stage
+
+def make_sync_cache(cache_root, num_frames=20):
+    """Sync stage cache with one chunk of frames where a bright square moves 4 px per frame."""
+    frames = np.full((num_frames, 48, 64, 3), 40, np.uint8)
+    for i, frame in enumerate(frames):
+        frame[10:20, 2 + 2 * i:12 + 2 * i] = 220
+    cache = StageCache(cache_root, "sync", "test", {})
+    cache.save_chunk(0, frame_idx=np.arange(num_frames), timestamps=np.arange(num_frames) / 30, frames=frames)
+    cache.mark_done(1)
+    return cache
+
+def test_subtract_stage_keeps_every_mask_with_buffer_reusing_model(tmp_path):
+    sync_cache = make_sync_cache(str(tmp_path))
+    cache = run_subtract_stage(sync_cache, history=5, var_threshold=15, background="running_average",
+                               cache_root=str(tmp_path))
+    chunk = cache.load_chunk(0)
+    masks = np.unpackbits(chunk["masks"], axis=-1, count=int(chunk["width"]))
+    distinct = {mask.tobytes() for mask in masks[1:]}
+    assert len(distinct) == len(masks) - 1
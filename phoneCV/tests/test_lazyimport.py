@@ -0,0 +1,7 @@
+import pytest
+
+from lazyimport import lazy_import
+
+def test_missing_module_fails_at_import_time():
+    with pytest.raises(ModuleNotFoundError, match="no_such_module_here"):
+        lazy_import("no_such_module_here")
@@ -0,0 +1,18 @@
+import numpy as np
+
+from MOG2_main import iter_track_frames
+from motiongate import MotionGate
+
+def test_gate_skipping_the_first_frame_yields_no_detections():
+    frame = np.full((48, 64, 3), 40, np.uint8)
+    gate = MotionGate(thumb_width=32, hold=0, idle_every=0)
+    for _ in range(3):
+        gate.should_process(frame)  # Warmed up on a static scene, the next identical frame gets skipped
+    frames = [(frame_idx, frame_idx / 30, frame) for frame_idx in range(3)]
+
+    results = list(iter_track_frames(frames, motion_gate=gate))
+
+    assert [frame_idx for frame_idx, _, _, _ in results] == [0, 1, 2]
+    assert gate.processed == 1  # Only the warm-up's first frame
+    for _, _, blobs, ellipses in results:
+        assert blobs.shape == (0, 7) and ellipses == []
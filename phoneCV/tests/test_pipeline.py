@@ -0,0 +1,16 @@
+import pytest
+
+from pipeline import camera_jobs
+
+def make_config(**flight):
+    cameras = {"north": {"video": "north.mp4"}, "south": {"video": "south.mp4", "auto_sync": True}}
+    return {"output": "runs", "flights": {"one": {"cameras": cameras, **flight}}}
+
+def test_auto_sync_uses_the_flight_range_of_the_reference_camera():
+    south = camera_jobs(make_config(start=10, end=200))[1]
+    assert south["reference_video"] == "north.mp4"
+    assert (south["reference_start"], south["reference_end"]) == (10, 200)
+
+def test_auto_sync_without_flight_end_is_a_config_error():
+    with pytest.raises(ValueError, match="one/south"):
+        camera_jobs(make_config(start=10))
@@ -0,0 +1,23 @@
+import cv2
+import numpy as np
+
+from blobfinder import find_blobs
+from pyramid import downscale, upscale_blobs, upscale_ellipse
+
+def test_upscale_blobs_maps_area_back_to_full_resolution():
+    mask = np.zeros((200, 200), np.uint8)
+    mask[40:80, 100:120] = 255  # 40 x 20 = 800 px
+    for process_scale in (1.0, 0.5, 0.25):
+        small = downscale(mask, process_scale)
+        blobs = upscale_blobs(find_blobs(small, 1), process_scale)
+        assert len(blobs) == 1
+        np.testing.assert_allclose(blobs[0, :5], [100, 40, 20, 40, 800], rtol=1e-6)
+        np.testing.assert_allclose(blobs[0, 5:7], [109.5, 59.5], atol=0.5)
+
+def test_upscale_ellipse_maps_the_centre_back_to_full_resolution():
+    mask = np.zeros((400, 400), np.uint8)
+    cv2.ellipse(mask, ((210, 160), (160, 80), 0), 255, -1)  # Big enough that fitEllipse is exact to ~0.1 px at 1/4
+    for process_scale in (1.0, 0.5, 0.25):
+        contours, _ = cv2.findContours(downscale(mask, process_scale), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        (cx, cy), _, _ = upscale_ellipse(cv2.fitEllipse(contours[0]), process_scale)
+        np.testing.assert_allclose([cx, cy], [210, 160], atol=0.5)
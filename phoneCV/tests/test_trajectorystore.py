@@ -0,0 +1,23 @@
+import numpy as np
+
+from trajectorystore import TrajectoryStore, load_trajectories
+
+def test_save_load_keeps_frames_without_drones(tmp_path):
+    store = TrajectoryStore()
+    store.add_frame(0, 0.0, [1], [[10, 20]])
+    store.add_frame(1, 0.1, [], np.empty((0, 2)))
+    store.add_frame(2, 0.2, [1], [[12, 21]])
+    path = tmp_path / "trajectories.npz"
+    store.save(path)
+
+    loaded = load_trajectories(path)
+
+    assert loaded.num_frames == store.num_frames == 3
+    np.testing.assert_array_equal(loaded.frames[:3], [0, 1, 2])
+    np.testing.assert_array_equal(loaded.frame_starts[:4], store.frame_starts[:4])
+    for time in (0.05, 0.15, 0.25):
+        track_ids, positions = loaded.snapshot(time=time)
+        expected_ids, expected_positions = store.snapshot(time=time)
+        np.testing.assert_array_equal(track_ids, expected_ids)
+        np.testing.assert_array_equal(positions, expected_positions)
+    assert len(loaded.snapshot(time=0.15)[0]) == 0
@@ -0,0 +1,242 @@
+import math
+
+import numpy as np
+
+# Columnar store for drone trajectories, so control code can ask "who is within 1 m of here at time t"
+# or "where was drone 7 between frames 900 and 1200" without going back to annotated frames.
+# One record per track per frame in growable column arrays (track_id, frame_idx, timestamp, position,
+# velocity). Records have to come in frame order (which is how trackers produce them), so the rows are
+# sorted by frame and the time index is just the first row of every frame. On top of that:
+#   per track:  the rows of every track, for path queries
+#   per frame:  a uniform grid over that frame's positions, built the first time the frame gets a
+#               spatial query and kept (frames are never changed once the next one has started),
+#               so a radius / box query only looks at the few cells it overlaps
+# Positions can be 2D (pixels, MultiTracker tracks) or 3D (metres, triangulated); cell_size is in the
+# same units and should be about the radius you query with.
+
+def _grow(array, needed):
+    """array with room for at least `needed` rows (doubling), old rows copied over."""
+    if needed <= len(array):
+        return array
+    grown = np.empty((max(2 * len(array), needed),) + array.shape[1:], array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class _Grid:
+    """Uniform grid over one frame's positions: rows sorted by cell, searchsorted to find a cell's rows."""
+
+    def __init__(self, positions, cell_size):
+        self.cell_size = cell_size
+        cells = np.floor(positions / cell_size).astype(np.int64)
+        self.origin = cells.min(axis=0)
+        self.shape = cells.max(axis=0) - self.origin + 1
+        # Row-major cell keys, so the cells along the last axis have consecutive keys
+        strides = np.append(np.cumprod(self.shape[:0:-1])[::-1], 1)
+        keys = (cells - self.origin) @ strides
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        # Plain ints for candidates(): a query only touches a handful of cells, numpy per-call overhead would dominate
+        self.origin, self.shape, self.strides = self.origin.tolist(), self.shape.tolist(), strides.tolist()
+
+    def candidates(self, lo, hi):
+        """Rows (into the frame) of every position in a cell that overlaps the box lo..hi."""
+        ranges, count = [], 1
+        for low, high, origin, size in zip(lo.tolist(), hi.tolist(), self.origin, self.shape):
+            cell_lo = max(math.floor(low / self.cell_size) - origin, 0)
+            cell_hi = min(math.floor(high / self.cell_size) - origin, size - 1)
+            if cell_lo > cell_hi:
+                return self.order[:0]
+            ranges.append((cell_lo, cell_hi))
+            count *= cell_hi - cell_lo + 1
+        if count >= len(self.keys):
+            return self.order  # Box covers more cells than there are drones, checking them all is cheaper
+
+        # One key range per row of cells along the last axis (those keys are consecutive)
+        firsts = [0]
+        for (cell_lo, cell_hi), stride in zip(ranges[:-1], self.strides):
+            firsts = [first + cell * stride for first in firsts for cell in range(cell_lo, cell_hi + 1)]
+        cell_lo, cell_hi = ranges[-1]
+        bounds = np.searchsorted(self.keys, [first + cell_lo for first in firsts]
+                                 + [first + cell_hi + 0.5 for first in firsts])
+        starts, ends = bounds[:len(firsts)].tolist(), bounds[len(firsts):].tolist()
+        pieces = [self.order[start:end] for start, end in zip(starts, ends) if end > start]
+        if len(pieces) == 1:
+            return pieces[0]
+        return np.concatenate(pieces) if pieces else self.order[:0]
+
+class TrajectoryStore:
+    """Append-only trajectory records with a time index, per-track rows and per-frame spatial grids.
+
+    ndim: 2 for pixel tracks, 3 for triangulated ones.
+    cell_size: grid cell size for the spatial queries (px or m, like the positions).
+    """
+
+    def __init__(self, ndim=2, cell_size=50.0, capacity=1024):
+        self.ndim = ndim
+        self.cell_size = cell_size
+        self.size = 0
+        self.track_id = np.empty(capacity, np.int64)
+        self.frame_idx = np.empty(capacity, np.int64)
+        self.timestamp = np.empty(capacity, np.float64)
+        self.position = np.empty((capacity, ndim), np.float32)
+        self.velocity = np.empty((capacity, ndim), np.float32)
+
+        # Time index: frame numbers, their timestamps and first rows (frame_starts has one more, the end)
+        self.num_frames = 0
+        self.frames = np.empty(256, np.int64)
+        self.frame_times = np.empty(256, np.float64)
+        self.frame_starts = np.zeros(257, np.int64)
+        self.track_rows = {}  # track_id -> list of rows, in frame order
+        self.track_arrays = {}  # track_id -> the same rows as an array, caught up on the next path query
+        self.grids = {}       # frame position -> _Grid
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, extra):
+        for name in ("track_id", "frame_idx", "timestamp", "position", "velocity"):
+            setattr(self, name, _grow(getattr(self, name), self.size + extra))
+
+    def add_frame(self, frame_idx, timestamp, track_ids, positions, velocities=None):
+        """Appends one frame's worth of records. Frames have to arrive in order (the same frame again adds to it)."""
+        track_ids = np.asarray(track_ids, np.int64).ravel()
+        positions = np.asarray(positions, np.float32).reshape(-1, self.ndim)
+        n = len(track_ids)
+        last = self.frames[self.num_frames - 1] if self.num_frames else None
+        if last is not None and frame_idx < last:
+            raise ValueError(f"Frame {frame_idx} arrived after frame {last}, frames must be in order")
+
+        self._reserve(n)
+        rows = slice(self.size, self.size + n)
+        self.track_id[rows] = track_ids
+        self.frame_idx[rows] = frame_idx
+        self.timestamp[rows] = timestamp
+        self.position[rows] = positions
+        self.velocity[rows] = np.nan if velocities is None else np.asarray(velocities).reshape(-1, self.ndim)
+        for row, track_id in enumerate(track_ids.tolist(), self.size):
+            self.track_rows.setdefault(track_id, []).append(row)
+        self.size += n
+
+        if frame_idx == last:
+            self.frame_starts[self.num_frames] = self.size
+            self.grids.pop(self.num_frames - 1, None)  # That frame changed, its grid gets rebuilt if asked for
+        else:
+            self.frames = _grow(self.frames, self.num_frames + 1)
+            self.frame_times = _grow(self.frame_times, self.num_frames + 1)
+            self.frame_starts = _grow(self.frame_starts, self.num_frames + 2)
+            self.frames[self.num_frames] = frame_idx
+            self.frame_times[self.num_frames] = timestamp
+            self.num_frames += 1
+            self.frame_starts[self.num_frames] = self.size
+
+    def add_tracks(self, frame_idx, timestamp, tracks):
+        """Appends a MultiTracker.update result (track_id, cx, cy, vx, vy, detection rows)."""
+        self.add_frame(frame_idx, timestamp, tracks[:, 0], tracks[:, 1:3], tracks[:, 3:5])
+
+    def frame_position(self, frame_idx=None, time=None):
+        """Index into self.frames of frame_idx, or of the last frame at or before `time` (None if there's none)."""
+        if time is not None:
+            position = np.searchsorted(self.frame_times[:self.num_frames], time, side="right") - 1
+            return int(position) if position >= 0 else None
+        position = np.searchsorted(self.frames[:self.num_frames], frame_idx)
+        if position < self.num_frames and self.frames[position] == frame_idx:
+            return int(position)
+        return None
+
+    def frame_rows(self, frame_idx=None, time=None):
+        """Row slice of one frame, by frame number or time (empty if there's no such frame)."""
+        position = self.frame_position(frame_idx, time)
+        if position is None:
+            return slice(0, 0)
+        return slice(self.frame_starts[position], self.frame_starts[position + 1])
+
+    def snapshot(self, frame_idx=None, time=None):
+        """(track_ids, positions) of every drone in one frame."""
+        rows = self.frame_rows(frame_idx, time)
+        return self.track_id[rows], self.position[rows]
+
+    def _grid(self, position):
+        grid = self.grids.get(position)
+        if grid is None:
+            rows = slice(self.frame_starts[position], self.frame_starts[position + 1])
+            grid = self.grids[position] = _Grid(self.position[rows], self.cell_size)
+        return grid
+
+    def neighbors(self, point, radius, frame_idx=None, time=None):
+        """Drones within radius of point in one frame: (track_ids, positions, distances), nearest first."""
+        point = np.asarray(point, np.float64)
+        position = self.frame_position(frame_idx, time)
+        if position is None or self.frame_starts[position] == self.frame_starts[position + 1]:
+            return self.track_id[:0], self.position[:0], np.empty(0)
+
+        start = self.frame_starts[position]
+        rows = start + self._grid(position).candidates(point - radius, point + radius)
+        distances = np.linalg.norm(self.position[rows] - point, axis=1)
+        keep = distances <= radius
+        rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return self.track_id[rows[order]], self.position[rows[order]], distances[order]
+
+    def in_box(self, lo, hi, frame_idx=None, time=None):
+        """Drones inside the axis-aligned box lo..hi in one frame: (track_ids, positions)."""
+        lo, hi = np.asarray(lo, np.float64), np.asarray(hi, np.float64)
+        position = self.frame_position(frame_idx, time)
+        if position is None or self.frame_starts[position] == self.frame_starts[position + 1]:
+            return self.track_id[:0], self.position[:0]
+
+        rows = self.frame_starts[position] + self._grid(position).candidates(lo, hi)
+        inside = np.all((self.position[rows] >= lo) & (self.position[rows] <= hi), axis=1)
+        rows = np.sort(rows[inside])
+        return self.track_id[rows], self.position[rows]
+
+    def path(self, track_id, start_frame=None, end_frame=None):
+        """One drone's (frame_idx, timestamps, positions, velocities) between two frames (inclusive)."""
+        rows = self._track_array(track_id)
+        frames = self.frame_idx[rows]
+        lo = 0 if start_frame is None else np.searchsorted(frames, start_frame, side="left")
+        hi = len(rows) if end_frame is None else np.searchsorted(frames, end_frame, side="right")
+        rows = rows[lo:hi]
+        return self.frame_idx[rows], self.timestamp[rows], self.position[rows], self.velocity[rows]
+
+    def _track_array(self, track_id):
+        """The rows of one track as an array, only converting what was added since the last call."""
+        rows = self.track_rows.get(track_id, [])
+        cached = self.track_arrays.get(track_id, np.empty(0, np.int64))
+        if len(cached) < len(rows):
+            cached = self.track_arrays[track_id] = np.concatenate([cached, np.array(rows[len(cached):], np.int64)])
+        return cached
+
+    def track_ids(self):
+        return np.array(sorted(self.track_rows), np.int64)
+
+    def columns(self):
+        """The records as a dict of column arrays (views, trimmed to the records actually stored)."""
+        return {"track_id": self.track_id[:self.size], "frame_idx": self.frame_idx[:self.size],
+                "timestamp": self.timestamp[:self.size], "position": self.position[:self.size],
+                "velocity": self.velocity[:self.size]}
+
+    def save(self, path):
+        """Writes the records and the time index (frames without any drones in them included) to an .npz."""
+        np.savez(path, cell_size=self.cell_size, frames=self.frames[:self.num_frames],
+                 frame_times=self.frame_times[:self.num_frames],
+                 frame_starts=self.frame_starts[:self.num_frames + 1], **self.columns())
+
+def load_trajectories(path):
+    """Reads a TrajectoryStore.save file back into a TrajectoryStore."""
+    with np.load(path) as data:
+        columns = {name: data[name] for name in data.files}
+    store = TrajectoryStore(columns["position"].shape[1], float(columns["cell_size"]), max(len(columns["track_id"]), 1))
+    frame_starts = columns["frame_starts"].tolist()
+    for frame_idx, timestamp, start, end in zip(columns["frames"].tolist(), columns["frame_times"].tolist(),
+                                                frame_starts[:-1], frame_starts[1:]):
+        store.add_frame(frame_idx, timestamp, columns["track_id"][start:end], columns["position"][start:end],
+                        columns["velocity"][start:end])
+    return store
+
+def store_tracks(tracked, store=None):
+    """Puts multitracker.track_detections output ([(frame_idx, timestamp, tracks), ...]) into a TrajectoryStore."""
+    if store is None:
+        store = TrajectoryStore()
+    for frame_idx, timestamp, tracks in tracked:
+        store.add_tracks(frame_idx, timestamp, tracks)
+    return store
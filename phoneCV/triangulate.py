@@ -0,0 +1,217 @@
+import cv2
+import os
+import numpy as np
+
+from multitracker import gated_assignment
+
+# Turns the per-phone 2D detections into 3D drone positions.
+# 1. Checkerboard calibration: intrinsics (K + lens distortion) per phone, then the stereo extrinsics
+#    (R, T of the second phone relative to the first) from views of the same board.
+# 2. Per synced frame: undistort every blob centroid, match blobs between the two phones using the
+#    epipolar constraint (a drone seen by phone A has to sit on its epipolar line in phone B), and
+#    triangulate every matched pair at once with a batched DLT (one stacked SVD, no Python loop).
+# Positions come out in the first camera's frame, in whatever unit square_size was given in.
+
+CHECKERBOARD = (9, 6)   # Inner corners per row, per column
+SQUARE_SIZE = 1.0       # Checkerboard square size (cm, m... sets the unit of the 3D output)
+
+def checkerboard_points(pattern_size=CHECKERBOARD, square_size=SQUARE_SIZE):
+    """(N, 3) float32 board corner positions on the z=0 plane."""
+    cols, rows = pattern_size
+    grid = np.zeros((rows * cols, 3), np.float32)
+    grid[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * square_size
+    return grid
+
+def find_checkerboard(frame, pattern_size=CHECKERBOARD):
+    """Sub-pixel checkerboard corners in a BGR frame, or None if the board isn't fully visible."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    found, corners = cv2.findChessboardCorners(gray, pattern_size,
+                                               cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE)
+    if not found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    return cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+
+def calibrate_intrinsics(frames, pattern_size=CHECKERBOARD, square_size=SQUARE_SIZE):
+    """Calibrates one phone from checkerboard frames. Returns (K, dist, rms reprojection error)."""
+    board = checkerboard_points(pattern_size, square_size)
+    object_points, image_points, image_size = [], [], None
+    for frame in frames:
+        corners = find_checkerboard(frame, pattern_size)
+        image_size = frame.shape[1::-1]
+        if corners is not None:
+            object_points.append(board)
+            image_points.append(corners)
+
+    if len(image_points) < 3:
+        raise ValueError(f"Only found the checkerboard in {len(image_points)} frames, need at least 3")
+
+    rms, K, dist, _, _ = cv2.calibrateCamera(object_points, image_points, image_size, None, None)
+    return K, dist, rms
+
+def calibrate_stereo(frames_a, frames_b, K_a, dist_a, K_b, dist_b, pattern_size=CHECKERBOARD,
+                     square_size=SQUARE_SIZE):
+    """Pose of phone B relative to phone A from synced checkerboard frame pairs (intrinsics kept fixed).
+
+    Returns a calibration dict: K_a, dist_a, K_b, dist_b, R, T, F and the rms reprojection error.
+    """
+    board = checkerboard_points(pattern_size, square_size)
+    object_points, points_a, points_b, image_size = [], [], [], None
+    for frame_a, frame_b in zip(frames_a, frames_b):
+        corners_a, corners_b = find_checkerboard(frame_a, pattern_size), find_checkerboard(frame_b, pattern_size)
+        image_size = frame_a.shape[1::-1]
+        if corners_a is not None and corners_b is not None:
+            object_points.append(board)
+            points_a.append(corners_a)
+            points_b.append(corners_b)
+
+    if len(object_points) < 3:
+        raise ValueError(f"Only found the checkerboard in both phones in {len(object_points)} frames, need at least 3")
+
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 1e-5)
+    rms, _, _, _, _, R, T, _, F = cv2.stereoCalibrate(object_points, points_a, points_b, K_a, dist_a, K_b, dist_b,
+                                                      image_size, criteria=criteria, flags=cv2.CALIB_FIX_INTRINSIC)
+    return {"K_a": K_a, "dist_a": dist_a, "K_b": K_b, "dist_b": dist_b, "R": R, "T": T, "F": F, "rms": rms}
+
+def save_calibration(path, calibration):
+    """Writes a calibration dict to an .npz."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(path, **calibration)
+
+def load_calibration(path):
+    """Reads a calibration dict back from an .npz."""
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+def projection_matrices(calibration):
+    """3x4 projection matrices (P_a, P_b) with phone A at the origin."""
+    P_a = calibration["K_a"] @ np.hstack([np.eye(3), np.zeros((3, 1))])
+    P_b = calibration["K_b"] @ np.hstack([calibration["R"], calibration["T"].reshape(3, 1)])
+    return P_a, P_b
+
+def fundamental_matrix(calibration):
+    """F between the undistorted pixel coordinates of phone A and phone B (x_b^T F x_a = 0)."""
+    tx, ty, tz = calibration["T"].ravel()
+    E = np.array([[0, -tz, ty], [tz, 0, -tx], [-ty, tx, 0]]) @ calibration["R"]
+    return np.linalg.inv(calibration["K_b"]).T @ E @ np.linalg.inv(calibration["K_a"])
+
+def undistort_pixels(points, K, dist):
+    """Removes lens distortion from (N, 2) pixel coordinates, keeping them in pixels."""
+    if len(points) == 0:
+        return np.empty((0, 2))
+    points = np.asarray(points, np.float64).reshape(-1, 1, 2)
+    return cv2.undistortPoints(points, K, dist, P=K).reshape(-1, 2)
+
+def epipolar_distances(points_a, points_b, F):
+    """(N, M) symmetric epipolar distance (px) between every point in A and every point in B."""
+    homogeneous_a = np.hstack([points_a, np.ones((len(points_a), 1))])
+    homogeneous_b = np.hstack([points_b, np.ones((len(points_b), 1))])
+    lines_b = homogeneous_a @ F.T   # Epipolar line in B of each point in A
+    lines_a = homogeneous_b @ F     # Epipolar line in A of each point in B
+
+    algebraic = np.abs(homogeneous_b @ lines_b.T).T  # |x_b^T F x_a| for every pair
+    norm_b = np.hypot(lines_b[:, 0], lines_b[:, 1])[:, None]
+    norm_a = np.hypot(lines_a[:, 0], lines_a[:, 1])[None, :]
+    return 0.5 * (algebraic / norm_b + algebraic / norm_a)
+
+def match_epipolar(points_a, points_b, F, max_distance=5.0):
+    """Matches points between the phones by epipolar distance. Returns (rows_a, rows_b) arrays.
+
+    Only pairs within max_distance px of each other's epipolar lines are candidates, and each blob is
+    used at most once (same gated assignment as the multitracker).
+    """
+    if len(points_a) == 0 or len(points_b) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    cost = epipolar_distances(points_a, points_b, F)
+    return gated_assignment(cost, cost <= max_distance)
+
+def triangulate_points(P_a, P_b, points_a, points_b):
+    """Batched linear (DLT) triangulation of matched (N, 2) pixel points. Returns (N, 3) positions.
+
+    Every pair gives a 4x4 system A X = 0; all of them go through one stacked SVD and X is the right
+    singular vector of the smallest singular value.
+    """
+    A = np.empty((len(points_a), 4, 4))
+    A[:, 0] = points_a[:, :1] * P_a[2] - P_a[0]
+    A[:, 1] = points_a[:, 1:2] * P_a[2] - P_a[1]
+    A[:, 2] = points_b[:, :1] * P_b[2] - P_b[0]
+    A[:, 3] = points_b[:, 1:2] * P_b[2] - P_b[1]
+    X = np.linalg.svd(A)[2][:, -1]
+    return X[:, :3] / X[:, 3:]
+
+def reprojection_errors(P, positions, points):
+    """Pixel distance between the (N, 3) positions projected with P and the (N, 2) observed points."""
+    projected = np.hstack([positions, np.ones((len(positions), 1))]) @ P.T
+    return np.hypot(*(projected[:, :2] / projected[:, 2:] - points).T)
+
+class Triangulator:
+    """Per-frame matching + triangulation for one calibrated phone pair.
+
+    max_epipolar: max symmetric epipolar distance (px) for two blobs to count as the same drone.
+    max_reprojection: matched pairs whose 3D point reprojects further than this (px) get dropped.
+    """
+
+    def __init__(self, calibration, max_epipolar=5.0, max_reprojection=10.0):
+        self.calibration = calibration
+        self.P_a, self.P_b = projection_matrices(calibration)
+        self.F = fundamental_matrix(calibration)
+        self.max_epipolar = max_epipolar
+        self.max_reprojection = max_reprojection
+
+    def triangulate(self, blobs_a, blobs_b):
+        """3D positions of the drones both phones see in one synced frame.
+
+        blobs_a / blobs_b are (N, 7) blob arrays (blobfinder layout). Returns (positions, rows_a, rows_b,
+        errors): (M, 3) positions, the blob rows they came from in each phone, and the worst reprojection
+        error of each pair.
+        """
+        points_a = undistort_pixels(blobs_a[:, 5:7], self.calibration["K_a"], self.calibration["dist_a"])
+        points_b = undistort_pixels(blobs_b[:, 5:7], self.calibration["K_b"], self.calibration["dist_b"])
+        rows_a, rows_b = match_epipolar(points_a, points_b, self.F, self.max_epipolar)
+
+        positions = triangulate_points(self.P_a, self.P_b, points_a[rows_a], points_b[rows_b])
+        errors = np.maximum(reprojection_errors(self.P_a, positions, points_a[rows_a]),
+                            reprojection_errors(self.P_b, positions, points_b[rows_b]))
+        # Points behind either phone are mismatches too
+        depth_b = positions @ self.calibration["R"][2] + self.calibration["T"].ravel()[2]
+        keep = (errors <= self.max_reprojection) & (positions[:, 2] > 0) & (depth_b > 0)
+        return positions[keep], rows_a[keep], rows_b[keep], errors[keep]
+
+def triangulate_detections(synced_detections, calibration, camera_a, camera_b, **kwargs):
+    """Runs a Triangulator over MOG2_main.track_cameras output.
+
+    Returns [(synced_idx, positions, rows_a, rows_b, errors), ...] for every synced frame both cameras
+    have detections in.
+    """
+    triangulator = Triangulator(calibration, **kwargs)
+    results = []
+    for synced_idx, cameras in synced_detections.items():
+        if camera_a in cameras and camera_b in cameras:
+            blobs_a, blobs_b = cameras[camera_a][2], cameras[camera_b][2]
+            results.append((synced_idx, *triangulator.triangulate(blobs_a, blobs_b)))
+    return results
+
+if __name__ == "__main__":
+    from videoslicer import iter_folder_frames
+
+    # Film the checkerboard with both phones at once, sync + slice those videos like a flight
+    # (framesync.py), and point these at the two synced frame folders.
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    board_nick = os.path.join(current_dir, "calibration", "frames_nick_board")
+    board_saanvi = os.path.join(current_dir, "calibration", "frames_saanvi_board")
+    calibration_path = os.path.join(current_dir, "calibration", "nick_saanvi.npz")
+
+    if not os.path.exists(board_nick) or not os.path.exists(board_saanvi):
+        print(f"Error: Need checkerboard frames in {board_nick} and {board_saanvi}")
+        exit()
+
+    frames_nick = [frame for _, _, frame in iter_folder_frames(board_nick)]
+    frames_saanvi = [frame for _, _, frame in iter_folder_frames(board_saanvi)]
+
+    K_n, dist_n, rms_n = calibrate_intrinsics(frames_nick)
+    K_s, dist_s, rms_s = calibrate_intrinsics(frames_saanvi)
+    print(f"📷 Intrinsics: nick rms {rms_n:.3f}px, saanvi rms {rms_s:.3f}px")
+
+    calibration = calibrate_stereo(frames_nick, frames_saanvi, K_n, dist_n, K_s, dist_s)
+    save_calibration(calibration_path, calibration)
+    print(f"✅ Stereo calibration (rms {calibration['rms']:.3f}px) saved to {calibration_path}")
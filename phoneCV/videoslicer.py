@@ -1,9 +1,36 @@
 import cv2
 import os
+import time
+
+from framestore import FRAME_STORE_EXT, FrameStore, FrameStoreWriter, is_frame_store
+from profiling import PROFILER
 
 # This script extracts frames from a video file and saves them as images.
 # Each image is named with its frame number and timestamp.
-def extract_frames(video_path, output_folder):
+# Or, with an output path ending in .frames, into one frame store (framestore.py) instead of a PNG per frame.
+
+STORE_FRAMES = True  # Write frames_<name>.frames stores instead of frame folders
+STORE_COMPRESSION = None  # None (raw, fastest), "png" (lossless) or "jpg" (lossy), see framestore.py
+
+def frame_filename(frame_idx, timestamp):
+    """Builds the frame_{idx}_{timestamp}.png name every frame folder uses."""
+    return f"frame_{frame_idx:06d}_{timestamp:.3f}.png"
+
+def parse_frame_filename(frame_file):
+    """Pulls (frame_idx, timestamp) back out of a frame_{idx}_{timestamp}.png name."""
+    parts = os.path.splitext(frame_file)[0].split("_")
+    return int(parts[1]), float(parts[2])
+
+def get_video_fps(cap):
+    """Reads the fps off an open capture, falling back to 30 if the container doesn't say."""
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if fps == 0 or fps is None:
+        print("Warning: FPS detection failed, assuming 30 FPS.")
+        fps = 30  # Assume 30 FPS if unknown
+    return fps
+
+def iter_video_frames(video_path):
+    """Yields (frame_idx, timestamp, frame) straight out of the video without touching disk."""
     if not os.path.exists(video_path):
         print(f"Error: No such video as {video_path} exists.")
         return
@@ -12,45 +39,103 @@ def extract_frames(video_path, output_folder):
     if not cap.isOpened():
         print(f"Error: Could not open {video_path}")
         return
-    
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    if fps == 0 or fps is None:
-        print("Warning: FPS detection failed, assuming 30 FPS.")
-        fps = 30  # Assume 30 FPS if unknown
 
-    os.makedirs(output_folder, exist_ok=True)
+    fps = get_video_fps(cap)
 
     frame_idx = 0
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
+    try:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
 
-        timestamp = frame_idx / fps  # Time in seconds
-        frame_filename = os.path.join(output_folder, f"frame_{frame_idx:06d}_{timestamp:.3f}.png")
-        
-        # if frame_idx % 10 == 0:  # Save every 10th frame
-        cv2.imwrite(frame_filename, frame)
-        
-        if frame_idx % 100 == 0:
-            print(f"Processing frame {frame_idx}...")
+            timestamp = frame_idx / fps  # Time in seconds
+            yield frame_idx, timestamp, frame
+            frame_idx += 1
+    finally:
+        cap.release()
 
-        frame_idx += 1
+def iter_folder_frames(folder):
+    """Yields (frame_idx, timestamp, frame) from a folder of frame_{idx}_{timestamp}.png files."""
+    for frame_file in sorted(os.listdir(folder)):
+        frame = cv2.imread(os.path.join(folder, frame_file))
 
-    cap.release()
-    print(f"Frames saved in {output_folder}")
+        if frame is None:
+            print(f"Error loading frame: {frame_file}")
+            continue
 
+        frame_idx, timestamp = parse_frame_filename(frame_file)
+        yield frame_idx, timestamp, frame
 
-# Frame Extraction
+def iter_frames(source):
+    """(frame_idx, timestamp, frame) from a frame store, a folder of frame PNGs or a video file."""
+    if is_frame_store(source):
+        return FrameStore(source).iter_frames()
+    if os.path.isdir(source):
+        return iter_folder_frames(source)
+    return iter_video_frames(source)
+
+class FrameFolderWriter:
+    """FrameStoreWriter's interface for the old folder of frame_{idx}_{timestamp}.png files."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, frame_idx, timestamp, frame):
+        cv2.imwrite(os.path.join(self.path, frame_filename(frame_idx, timestamp)), frame)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-# Define input and output folders
-input_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "videos")
-output_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frames_saanvi_one")
+def open_frame_writer(path, compression=STORE_COMPRESSION):
+    """FrameStoreWriter if path ends in .frames, otherwise a FrameFolderWriter writing PNGs."""
+    if path.endswith(FRAME_STORE_EXT):
+        return FrameStoreWriter(path, compression)
+    return FrameFolderWriter(path)
 
-if not os.path.exists(input_folder):
-    print(f"Error: The input folder {input_folder} does not exist.")
-    exit()
-# Extract frames from the video
-video = os.path.join(input_folder, "flight1_saanviphone.MOV")
-extract_frames(video, output_folder)
+def save_frames(frames, output_folder):
+    """Pass-through stage that also writes each frame to output_folder as a PNG."""
+    os.makedirs(output_folder, exist_ok=True)
+    for frame_idx, timestamp, frame in frames:
+        cv2.imwrite(os.path.join(output_folder, frame_filename(frame_idx, timestamp)), frame)
+        yield frame_idx, timestamp, frame
+
+def extract_frames(video_path, output_folder, compression=STORE_COMPRESSION):
+    """Writes every frame of the video to output_folder (PNGs, or a frame store if it ends in .frames)."""
+    frame_idx = -1
+    with open_frame_writer(output_folder, compression) as writer:
+        t = time.perf_counter()
+        for frame_idx, timestamp, frame in iter_video_frames(video_path):
+            PROFILER.record("decode", time.perf_counter() - t)
+            with PROFILER.stage("write"):
+                writer.append(frame_idx, timestamp, frame)
+
+            if frame_idx % 100 == 0:
+                print(f"Processing frame {frame_idx}...")
+            t = time.perf_counter()
+
+    if frame_idx >= 0:
+        print(f"Frames saved in {output_folder}")
+
+
+# Frame Extraction
+if __name__ == "__main__":
+    # Define input and output folders
+    input_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "videos")
+    output_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frames_saanvi_one")
+    if STORE_FRAMES:
+        output_folder += FRAME_STORE_EXT
 
+    if not os.path.exists(input_folder):
+        print(f"Error: The input folder {input_folder} does not exist.")
+        exit()
+    # Extract frames from the video
+    video = os.path.join(input_folder, "flight1_saanviphone.MOV")
+    extract_frames(video, output_folder)